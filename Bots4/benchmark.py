@@ -0,0 +1,198 @@
+import os
+import json
+import time
+import shutil
+import socket
+import argparse
+import datetime
+import platform
+import tempfile
+import itertools
+import contextlib
+import subprocess
+import numpy as np
+import bot
+import brain
+import reward
+import engine
+import streams
+
+Default_results_file = "benchmark_results.ndjson" # every benchmark is added to this, one JSON object per line
+Script_dir = os.path.dirname(os.path.abspath(__file__))
+
+def parseList(text, convert):
+    return [convert(value) for value in text.split(",")]
+
+def parseBrainSize(text):
+    """
+    "30x10" is 30 neurons with 10 connections each
+    """
+    num_of_neurons, num_of_connections = text.lower().split("x")
+    return int(num_of_neurons), int(num_of_connections)
+
+def parseSwitch(text):
+    return text.lower() in ("on", "true", "1", "yes")
+
+def session():
+    """
+    Where and on what the benchmarks were run, so results from different runs can be compared
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=Script_dir, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"started": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "commit": commit,
+            "host": socket.gethostname(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "python": platform.python_version(),
+            "numpy": np.__version__}
+
+@contextlib.contextmanager
+def workspace(num_of_neurons, num_of_connections, seed):
+    """
+    A folder with random starter brains of the given size (and the usual starter attributes) to run the benchmarks in,
+    the bots load their brains from files relative to the folder they are run in
+    """
+    start_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder:
+        shutil.copytree(os.path.join(Script_dir, "attributes"), os.path.join(folder, "attributes"))
+        os.makedirs(os.path.join(folder, "brains"))
+        streams.seed(seed)
+        for file_name in ("starter_brain.txt", "starter_brain_yellow.txt", "starter_brain_blue.txt"):
+            random_brain = brain.Brain(num_of_neurons, num_of_connections, num_of_inputs=bot.Num_of_brain_inputs)
+            random_brain.saveBrain(os.path.join(folder, "brains", file_name))
+        os.chdir(folder)
+        try:
+            with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(quiet):
+                yield
+        finally:
+            os.chdir(start_dir)
+
+def benchmarkSimulation(num_of_bots, world_size, enable_collisions, num_of_rewards, ticks, warmup_ticks, seed):
+    """
+    Runs the simulation headless, starting with the given number of bots (which is also the most there can be),
+    and times the ticks after the warm up
+    """
+    sim = engine.Simulation(world_size, world_size, enable_collisions=enable_collisions, num_of_rewards=num_of_rewards, seed=seed)
+    sim.max_num_of_bots = num_of_bots
+    sim.initial_number_of_bots = num_of_bots
+    sim.setup()
+
+    i = 0
+    while i < warmup_ticks and not sim.isFinished():
+        sim.step((sim.number_of_steps + 1)*engine.Time_step)
+        i+=1
+
+    # every bot alive at the start of a tick is updated and has its brain run once
+    bot_updates = 0
+    ticks_run = 0
+    start_time = time.perf_counter()
+    while ticks_run < ticks and not sim.isFinished():
+        bot_updates += sim.number_of_bots_alive
+        sim.step((sim.number_of_steps + 1)*engine.Time_step)
+        ticks_run += 1
+    elapsed = time.perf_counter() - start_time
+
+    return {"ticks": ticks_run,
+            "seconds": elapsed,
+            "ticks_per_second": ticks_run/elapsed if elapsed > 0 else None,
+            "bot_updates_per_second": bot_updates/elapsed if elapsed > 0 else None,
+            "brain_evaluations_per_second": bot_updates/elapsed if elapsed > 0 else None,
+            "mean_bots": bot_updates/ticks_run if ticks_run > 0 else 0}
+
+def timeCalls(function, calls, prepare=None):
+    """
+    Seconds per call of the function, prepare is run before each call and is not timed
+    """
+    total = 0.0
+    i = 0
+    while i < calls:
+        if prepare != None:
+            prepare()
+        start_time = time.perf_counter()
+        function()
+        total += time.perf_counter() - start_time
+        i+=1
+    return total/calls
+
+def benchmarkParts(calls):
+    """
+    Times the parts of the simulation on their own, with the brains of the workspace.
+    Returns the seconds per call of each part.
+    """
+    brain_file = "brains/starter_brain_yellow.txt"
+    net = brain.Brain(file_name=brain_file)
+
+    seeing_bot = bot.Bot(0, world_width=engine.World_width, world_height=engine.World_height, brain_file=brain_file)
+    target = reward.Reward(engine.World_width, engine.World_height)
+
+    parents = [bot.Bot(0, "parent"+str(i), world_width=engine.World_width, world_height=engine.World_height, brain_file=brain_file) for i in range(2)]
+    def readyToBreed():
+        # puts both parents back over every threshold Bot.breed checks
+        for parent in parents:
+            parent.breeding_points = 1
+            parent.energy_level = parent.max_energy
+            parent.time_since_last_child = bot.Min_breed_delay
+            parent.time_since_birth = bot.Min_age_to_breed
+    def forgetTemplates():
+        brain.Templates.clear()
+
+    return {"Brain.calculateOutputs": timeCalls(net.calculateOutputs, calls),
+            "Bot.see": timeCalls(lambda: seeing_bot.see(target), calls),
+            "Bot.breed": timeCalls(lambda: parents[0].breed(parents[1], "child", 0), calls, readyToBreed),
+            "Brain.loadBrain": timeCalls(lambda: net.loadBrain(brain_file), calls),
+            "Brain.loadBrain (file read)": timeCalls(lambda: net.loadBrain(brain_file), calls, forgetTemplates)}
+
+def main():
+    """
+    Benchmarks the simulation over every combination of the given sizes and settings, and the parts of it on their own.
+    Each result is printed and added to the results file with when, where and on which commit it was run.
+    """
+    parser = argparse.ArgumentParser(description="Measures how fast the simulation runs headless")
+    parser.add_argument("--bots", default="250,1000,10000", help="numbers of bots, separated by commas")
+    parser.add_argument("--brains", default=str(bot.Num_of_neurons)+"x"+str(bot.Num_of_connections), help="brain sizes as neuronsxconnections, separated by commas")
+    parser.add_argument("--world-sizes", default=str(engine.World_width), help="widths (and heights) of the world, separated by commas")
+    parser.add_argument("--collisions", default="off,on", help="collisions off and/or on, separated by commas")
+    parser.add_argument("--rewards", default=str(engine.Num_of_rewards), help="numbers of rewards, separated by commas")
+    parser.add_argument("--ticks", type=int, default=200, help="ticks timed for each combination")
+    parser.add_argument("--warmup", type=int, default=20, help="ticks run before the timing starts")
+    parser.add_argument("--calls", type=int, default=1000, help="calls timed for each part on its own")
+    parser.add_argument("--seed", type=int, default=1, help="seed of every benchmark, so they all start the same")
+    parser.add_argument("--skip-simulation", action="store_true", help="only time the parts on their own")
+    parser.add_argument("--skip-parts", action="store_true", help="only time the whole simulation")
+    parser.add_argument("--output", default=Default_results_file, help="file the results are added to")
+    args = parser.parse_args()
+
+    run_session = session()
+    results = []
+    for num_of_neurons, num_of_connections in parseList(args.brains, parseBrainSize):
+        brain_size = {"neurons": num_of_neurons, "connections": num_of_connections}
+
+        if not args.skip_parts:
+            with workspace(num_of_neurons, num_of_connections, args.seed):
+                parts = benchmarkParts(args.calls)
+            for name, seconds in parts.items():
+                result = dict(kind="part", part=name, calls=args.calls, seconds_per_call=seconds, calls_per_second=1/seconds, **brain_size)
+                results.append(result)
+                print(name+" "+str(brain_size)+": "+format(seconds*1e6, ".1f")+" us per call")
+
+        if not args.skip_simulation:
+            for num_of_bots, world_size, enable_collisions, num_of_rewards in itertools.product(parseList(args.bots, int), parseList(args.world_sizes, float),
+                                                                                                parseList(args.collisions, parseSwitch), parseList(args.rewards, int)):
+                settings = dict(bots=num_of_bots, world_size=world_size, collisions=enable_collisions, rewards=num_of_rewards, **brain_size)
+                with workspace(num_of_neurons, num_of_connections, args.seed):
+                    measured = benchmarkSimulation(num_of_bots, world_size, enable_collisions, num_of_rewards, args.ticks, args.warmup, args.seed)
+                result = dict(kind="simulation", **settings, **measured)
+                results.append(result)
+                print(json.dumps(settings)+": "+format(measured["ticks_per_second"], ".1f")+" ticks/s, "
+                      +format(measured["bot_updates_per_second"], ".0f")+" bot updates/s ("+format(measured["mean_bots"], ".0f")+" bots on average)")
+
+    with open(args.output, "a") as results_file:
+        for result in results:
+            results_file.write(json.dumps(dict(session=run_session, **result))+"\n")
+    print("results added to "+args.output)
+
+if __name__ == "__main__":
+    main()
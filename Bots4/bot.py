@@ -1,6 +1,9 @@
 import math
 import brain
-import random
+import population
+import vision
+import streams
+import genetics
 
 #bot simulation constants
 #breeding
@@ -37,6 +40,7 @@ Max_speed = 3 # units per second
 Num_of_neurons = 30
 Num_of_connections = 10
 Num_of_brain_inputs = 7
+Child_brain_file = "brains/starter_brain.txt" # the brain every child is built from, before its weights are bred
 
 # ouput neurons
 O_neuron_eat = "n0"
@@ -55,8 +59,40 @@ I_neuron_Clock = "i6" # internal clock (0 to 1 each simulated second)
 internal_clock_range = 10.0 # how long it takes for the clock input neuron go from 0 to 1 (simulated seconds)
 
 class Bot:
-    """ Defines a Bot with all its attributes """
-    def __init__(self, initial_time, name = "exampleBot", max_speed=Max_speed,max_view_angle=Max_view_angle,max_energy=Max_energy_reserve, world_width=10, world_height=10, colour = Colour):
+    """
+    Defines a Bot with all its attributes.
+    The numeric state is held in a row of a population.Population (see the Column attributes below),
+    the bot starts with a population of its own and is moved into the simulation's population when it is added.
+    """
+    # the state held in the population columns
+    direction = population.Column()
+    energy_level = population.Column()
+    max_energy = population.Column()
+    max_speed = population.Column()
+    max_turn_speed = population.Column()
+    max_view_angle = population.Column()
+    max_view_distance = population.Column()
+    velocity_factor = population.Column()
+    angular_velocity_factor = population.Column()
+    eat_action = population.Column()
+    energy_percent = population.Column()
+    right_angle_percent = population.Column()
+    left_angle_percent = population.Column()
+    view_distance_percent = population.Column()
+    birth_time = population.Column()
+    time_since_birth = population.Column()
+    time_last = population.Column()
+    time_interval = population.Column()
+    time_since_last_child = population.Column()
+    time_since_last_meal = population.Column()
+    generation = population.Column(int)
+    breeding_points = population.Column(int)
+    total_rewards_collected = population.Column(int)
+
+    def __init__(self, initial_time, name = "exampleBot", max_speed=Max_speed,max_view_angle=Max_view_angle,max_energy=Max_energy_reserve, world_width=10, world_height=10, colour = Colour, brain_file = None):
+        # the row which holds the state of the bot
+        population.Unowned.reserve(self)
+
         # bot attributes
         self.name = name
         self.max_speed = max_speed
@@ -66,6 +102,8 @@ class Bot:
         self.max_energy = max_energy
         self.generation = 0
         self.family_history = "None"
+        # the names of the bots which bred this one, None for a bot which was not bred
+        self.parent_names = (None, None)
         self.colour = colour
         
 
@@ -106,7 +144,46 @@ class Bot:
         self.eat_success= False # tells the simulator if the bot was successful at eating in the last simulation run
 
         #brain
-        self.net = brain.Brain(Num_of_neurons,Num_of_connections,num_of_inputs=Num_of_brain_inputs)
+        # only made when it is first used, from the brain file (through the template cache) or randomly if there is none
+        self.brain_file = brain_file
+        self._net = None
+        # set once the brain is thrown away after the bot died (see dropBrain), it is never made again
+        self.brain_dropped = False
+
+    @property
+    def position(self):
+        """
+        The [x,y] position of the bot, a view of the population's position column so it can be changed in place.
+        Use it straight away and do not hold on to it, the columns are replaced when the population grows
+        and the bot's row changes when other bots are removed.
+        """
+        return self.population.position[:, self.row]
+
+    @position.setter
+    def position(self, new_position):
+        self.population.position[:, self.row] = new_position
+
+    @property
+    def net(self):
+        if self._net == None:
+            if self.brain_dropped:
+                raise ValueError("the brain of "+self.name+" was dropped when it died")
+            if self.brain_file != None:
+                self._net = brain.Brain(file_name=self.brain_file)
+            else:
+                self._net = brain.Brain(Num_of_neurons,Num_of_connections,num_of_inputs=Num_of_brain_inputs)
+        return self._net
+
+    @net.setter
+    def net(self, new_net):
+        self._net = new_net
+
+    def dropBrain(self):
+        """
+        Throws away the brain of a dead bot which will not be saved, so the dead bots kept for the results stay small
+        """
+        self._net = None
+        self.brain_dropped = True
 
     def setAngularVelocity(self,a_velocity):
         self.angular_velocity_factor = a_velocity
@@ -127,12 +204,30 @@ class Bot:
         self.time_since_last_meal += self.time_interval
 
     def simulate(self,simulation_time, reward):
+        self.sense(simulation_time, reward)
+        # run calculations through the brain
+        self.net.calculateOutputs()
+        self.act(reward)
+
+    def sense(self, simulation_time, reward = None):
+        """
+        The first half of simulate, everything before the brain is run.
+        When the brains are run together in a brain_batch.BrainBatch this is called for every bot first.
+        If no reward is given the bot is taken to have already seen (eg. through vision.see for the whole population).
+        """
         # determine the elapsed time
         self.calculateTimeInterval(simulation_time)
         # see the enviroment
-        self.see(reward)
-        # run calculations through the brain
-        self.think()
+        if reward != None:
+            self.see(reward)
+        # give the brain what was seen
+        self.assign_brain_inputs()
+
+    def act(self, reward):
+        """
+        The second half of simulate, everything after the brain has been run
+        """
+        self.read_brain_outputs()
         # move bot accoringly
         self.move()
         # attempts to eat if the eat_action neuron is triggered
@@ -150,8 +245,10 @@ class Bot:
         # find the displacement along the axis
         x_displacement = math.cos(self.direction)*displacement
         y_displacement = -math.sin(self.direction)*displacement
-        # update the position
-        self.position = [self.position[0]+x_displacement,self.position[1]+y_displacement]
+        # update the position (in place)
+        position = self.position
+        position[0] += x_displacement
+        position[1] += y_displacement
 
     def get_position_percent(self):
         #calculates and returns the percent indicators of the position of the bot within the world
@@ -162,6 +259,9 @@ class Bot:
         self.assign_brain_inputs()
         # think
         self.net.calculateOutputs()
+        self.read_brain_outputs()
+
+    def read_brain_outputs(self):
         # assign to outputs
         self.angular_velocity_factor = (self.net.dict_all_values[O_neuron_RFactor]*2) - 1
         self.velocity_factor = (self.net.dict_all_values[O_neuron_VFactor]*2)-1
@@ -189,53 +289,19 @@ class Bot:
         '''
         self.energy_percent = self.energy_level/self.max_energy
         self.net.dict_all_values[I_neuron_Energy] = self.energy_percent
-        self.net.dict_all_values[I_neuron_Xpos,I_neuron_YPos] = self.get_position_percent()
+        # the position inputs have never reached the brain (they were written to a single tuple key)
+        # so they are left at 0 to keep the evolved brains behaving the same
+        self.get_position_percent()
         self.net.dict_all_values[I_neuron_SightCWA] = self.right_angle_percent
         self.net.dict_all_values[I_neuron_SightACWA] = self.left_angle_percent
         self.net.dict_all_values[I_neuron_SightDis] = self.view_distance_percent
         self.net.dict_all_values[I_neuron_Clock] = (self.time_since_birth%internal_clock_range)/internal_clock_range
 
     def see(self, obj):
-        #determine the angle to the reward
-        x_displacement = obj.position[0] - self.position[0]
-        y_displacement = self.position[1] - obj.position[1]
-        angle_to_obj = math.atan2(y_displacement, x_displacement)
-
-        # find out where in the field of view it is
-        #angle
-        angle_to_turn_to_reward = angle_to_obj - self.direction
-        if angle_to_turn_to_reward > math.pi:
-            angle_to_turn_to_reward = -2*math.pi + angle_to_turn_to_reward
-        elif angle_to_turn_to_reward < - math.pi:
-            angle_to_turn_to_reward = 2*math.pi + angle_to_turn_to_reward
-        
-        if angle_to_turn_to_reward <= 0:
-            angle_percent = abs(angle_to_turn_to_reward / (self.max_view_angle/2.0))
-            if angle_percent > 1:
-                angle_percent=1
-            self.right_angle_percent = 1.0 - angle_percent
-        
-        if angle_to_turn_to_reward >=0:
-            angle_percent = abs(angle_to_turn_to_reward / (self.max_view_angle/2.0))
-            if angle_percent > 1:
-                angle_percent=1
-            self.left_angle_percent = 1.0 - angle_percent
-        
-        #distance
-        # check if within view
-        if self.left_angle_percent>0 and self.right_angle_percent >0:
-            distance_to_reward = math.sqrt(x_displacement**2 + y_displacement**2)
-
-            view_distance_factor = distance_to_reward / self.max_view_distance
-
-            self.view_distance_percent = 1.0 - view_distance_factor
-
-            if self.view_distance_percent < 0 :
-                self.view_distance_percent = 0
-                self.left_angle_percent = 0
-                self.right_angle_percent = 0
-        else:
-            self.view_distance_percent=0
+        """
+        Looks at the object, updating what the bot can see of it (see vision.see)
+        """
+        vision.see(self.population, obj.position, slice(self.row, self.row+1))
 
     def saveBrain(self,file_location = None):
         if file_location == None:
@@ -281,8 +347,8 @@ class Bot:
         
         self.generation = int(generation)
         self.family_history = family_history
-        self.max_speed = float(max_speed)+(random.random()*0.1-0.05)
-        self.max_turn_speed = float(max_turn_speed)+(random.random()*0.1-0.05)
+        self.max_speed = float(max_speed)+(streams.Bots.random()*0.1-0.05)
+        self.max_turn_speed = float(max_turn_speed)+(streams.Bots.random()*0.1-0.05)
 
         attributeFile.close()
     
@@ -332,47 +398,26 @@ class Bot:
                 recBot = self
                 domBot = other_bot
             # make love (generate the child bot)
-            childBot = Bot(name = child_name, initial_time = sim_time_now, world_width=self.world_width,world_height=self.world_height, colour=domBot.colour)
+            childBot = Bot(name = child_name, initial_time = sim_time_now, world_width=self.world_width,world_height=self.world_height, colour=domBot.colour, brain_file=Child_brain_file)
             # child comes from the dominate bot
             childBot.position[0] = domBot.position[0]
             childBot.position[1] = domBot.position[1]
-            childBot.direction = 6.28 * random.random()
+            childBot.direction = 6.28 * streams.Bots.random()
+            childBot.parent_names = (self.name, other_bot.name)
             # give the child a family history or genetic code
             if domBot.family_history != "None":
                 childBot.family_history = domBot.family_history + domBot.name +"~" +str(domBot.generation)+"|"
             else:
                 childBot.family_history = domBot.name +"~" +str(domBot.generation)+"|"
             
-            # create the brain for the child bot
-            childBot.net.loadBrain("brains/starter_brain.txt")
-            k=0
-            #go through each neuron
-            while k < childBot.net.num_of_neurons:
-                l=0
-                new_weights = []
-                #replace each weight
-                while l < childBot.net.num_of_connections + 1:
-                    domWeight = domBot.net.neurons[k].weights[l]
-                    recWeight = recBot.net.neurons[k].weights[l]
-                    difference = domWeight - recWeight
-                    # divided by two because the maximum potential difference is 2 (-1 to 1)
-                    differenceFactor = difference / 2.0
-                    if random.random() < Chance_of_mutation:
-                        #mutation
-                        difference = domWeight - (random.random()*2 -1)
-                        differenceFactor = difference / 2.0
-                        new_weights.append(domWeight- Mutation_neuron_max_change * differenceFactor)
-                    else:
-                        #normal adjustment
-                        new_weights.append(domWeight - Norm_neuron_max_change * differenceFactor)
-                    l+=1
-                childBot.net.neurons[k].weights = new_weights
-                childBot.net.neurons[k].calculateWeightTotals()
-                k+=1
+            # breed the weights of the parents (the topology is the same for all of them)
+            child_weights = genetics.crossover(domBot.net.weight_matrix, recBot.net.weight_matrix, Chance_of_mutation, Norm_neuron_max_change, Mutation_neuron_max_change)
+            # the totals of the starter brain are kept, as they always have been
+            childBot.net.setWeights(child_weights, keep_totals=True)
             
             childBot.generation = max(domBot.generation,recBot.generation)+1
-            childBot.max_speed = float(domBot.max_speed)+(random.random()*0.1-0.05)
-            childBot.max_turn_speed = float(domBot.max_turn_speed)+(random.random()*0.1-0.05)
+            childBot.max_speed = float(domBot.max_speed)+(streams.Bots.random()*0.1-0.05)
+            childBot.max_turn_speed = float(domBot.max_turn_speed)+(streams.Bots.random()*0.1-0.05)
             
             return childBot
 
@@ -1,18 +1,210 @@
-import neuron
-import random
 import json
+import os
+import weakref
+from collections.abc import MutableMapping
+import numpy as np
+import streams
 
 Input_expansion_factor = 2 # the number of decimal places the input will be seperated into
 # there will be additional inputs for every main input
 
-class Brain:
-    """ Handles all the neurons """
-    def __init__(self,num_of_neurons=0, num_of_connections_each=0, num_of_inputs=1, num_of_outputs=0, file_name = None):
-        self.input_expansion_factor = Input_expansion_factor
-
-        self.num_of_neurons = num_of_neurons
-        self.num_of_connections = num_of_connections_each
+Sigmoid_multiplier = 10 # the strength of the sigmoid function of every neuron (same as neuron.Neuron3)
+
+def expandInputs(input_block, expansion_factor):
+    """
+    Segments the parent inputs (first column of the block) into their child inputs (the following columns)
+    eg. input 1 = 0.9837 -> input 1_0 = 0.837 -> input 1_1 = 0.37
+    Works on the block of a single brain or the stacked blocks of a whole batch,
+    every input of every brain is done at once and the results are written straight into the block.
+    """
+    j=0
+    while j < expansion_factor:
+        # same as (value*10)-int(value*10)
+        child_inputs = input_block[..., j+1]
+        np.multiply(input_block[..., j], 10, out=child_inputs)
+        child_inputs -= np.trunc(child_inputs)
+        j+=1
+
+class BrainValues(MutableMapping):
+    """
+    Dictionary style access to the compiled value vector of a brain, keyed by the input and neuron names
+    """
+    def __init__(self, owner):
+        self.owner = owner
+
+    def __getitem__(self, name):
+        return self.owner.values[self.owner.value_index[name]]
+
+    def __setitem__(self, name, value):
+        self.owner.values[self.owner.value_index[name]] = value
+
+    def __delitem__(self, name):
+        raise TypeError("values can not be removed from a compiled brain")
+
+    def __iter__(self):
+        return iter(self.owner.value_names)
+
+    def __len__(self):
+        return len(self.owner.value_names)
+
+class Topology:
+    """
+    The connections of a brain (which inputs and neurons feed each neuron) without any of the weights.
+    Every brain built from the same connections shares one Topology (see getTopology), so it must not be changed.
+    """
+    def __init__(self, num_of_inputs, input_expansion_factor, connections):
         self.num_of_inputs = num_of_inputs
+        self.input_expansion_factor = input_expansion_factor
+        # the names each neuron takes its inputs from, one tuple per neuron
+        self.connections = connections
+        self.num_of_neurons = len(connections)
+        self.num_of_connections = len(connections[0]) if connections else 0
+
+        self.input_names = inputNames(num_of_inputs, input_expansion_factor)
+        self.neuron_names = tuple("n"+str(i) for i in range(self.num_of_neurons))
+
+        # every input (and its expansions) followed by every neuron
+        self.value_names = self.input_names + self.neuron_names
+        self.value_index = {name: i for i, name in enumerate(self.value_names)}
+        self.neuron_slice = slice(len(self.input_names), len(self.value_names))
+
+        # the position of each connection in the value vector, one row per connection and one column per neuron
+        # the last row is the baseline weight, it connects to an extra value which is always 1
+        self.source_index = np.array([[self.value_index[name] for name in x] + [len(self.value_names)] for x in connections], dtype=np.intp).T.copy()
+        self.source_index.flags.writeable = False
+        # where each weight is added in the folded weights of a brain (see Brain.foldWeights), flattened
+        self.fold_index = (self.source_index + np.arange(self.num_of_neurons) * (len(self.value_names) + 1)).ravel()
+        self.fold_index.flags.writeable = False
+
+        self.sigmoid_multipliers = np.full(self.num_of_neurons, Sigmoid_multiplier, dtype=float)
+        self.sigmoid_multipliers.flags.writeable = False
+
+    def __reduce__(self):
+        # a saved topology is shared again once it is loaded (see checkpoint.py)
+        return (getTopology, (self.num_of_inputs, self.input_expansion_factor, self.connections))
+
+def inputNames(num_of_inputs, input_expansion_factor):
+    """
+    The names of the inputs, each parent input is followed by its child inputs
+    eg. input 1_0 = 0.9837 -> input 1_1 = 0.837 -> input 1_2 = 0.37
+    """
+    input_names = []
+    i=0
+    while i < num_of_inputs:
+        input_names.append("i"+str(i))
+        j = 0
+        while j < input_expansion_factor:
+            input_names.append("i"+str(i)+"_"+str(j))
+            j+=1
+        i+=1
+    return tuple(input_names)
+
+# every topology which is in use, so brains with the same connections share one
+# (a topology is dropped once no brain holds it any more)
+Topologies = weakref.WeakValueDictionary()
+
+def getTopology(num_of_inputs, input_expansion_factor, connections):
+    """
+    Returns the shared Topology for these connections, creating it the first time it is asked for
+    """
+    connections = tuple(tuple(x) for x in connections)
+    key = (num_of_inputs, input_expansion_factor, connections)
+    topology = Topologies.get(key)
+    if topology == None:
+        topology = Topology(num_of_inputs, input_expansion_factor, connections)
+        Topologies[key] = topology
+    return topology
+
+def readBrainFile(file_name, input_expansion_factor):
+    """
+    Reads a saved brain, returns its topology and its weights (one row per connection and one column per neuron)
+    """
+    file_object = open(file_name, "r")
+    # get first two rows
+    num_of_inputs = int(file_object.readline())
+    num_of_neurons = int(file_object.readline())
+
+    # collect data about neurons
+    connections = []
+    weights = []
+    i=0
+    while i < num_of_neurons:
+        line = str(file_object.readline())
+        if line != "~":
+            connections.append(json.loads(line))
+            line = str(file_object.readline())
+            weights.append(json.loads(line))
+            file_object.readline()
+        i+=1
+    file_object.close()
+
+    topology = getTopology(num_of_inputs, input_expansion_factor, connections)
+    return topology, np.array(weights, dtype=float).T.copy()
+
+class BrainTemplate:
+    """
+    A brain read from a file, kept so that brains can be copied from it without going back to the disk.
+    The arrays are shared by everything made from the template, so they must not be changed.
+    """
+    def __init__(self, topology, weight_matrix, mtime):
+        self.topology = topology
+        self.weight_matrix = weight_matrix
+        self.sum_of_weights_pos, self.sum_of_weights_neg = weightTotals(weight_matrix)
+        self.weight_matrix.flags.writeable = False
+        self.sum_of_weights_pos.flags.writeable = False
+        self.sum_of_weights_neg.flags.writeable = False
+        # when the file was last changed, the file is read again if this no longer matches
+        self.mtime = mtime
+
+# every brain file which has been read, by path and input expansion factor
+Templates = {}
+
+def loadTemplate(file_name, input_expansion_factor):
+    """
+    Returns the BrainTemplate of a brain file, the file is only read again if it has changed since it was last read
+    """
+    mtime = os.stat(file_name).st_mtime_ns
+    key = (os.path.abspath(file_name), input_expansion_factor)
+    template = Templates.get(key)
+    if template == None or template.mtime != mtime:
+        topology, weights = readBrainFile(file_name, input_expansion_factor)
+        template = BrainTemplate(topology, weights, mtime)
+        Templates[key] = template
+    return template
+
+# the arrays a brain steps with, made from its weights by Brain.foldWeights
+# (with the values, these are the arrays which are views into its row of a brain_batch.BrainBatch)
+Folded_arrays = ("folded_weights", "scale_pos", "scale_neg")
+
+class Brain:
+    """
+    Handles all the neurons.
+    The connections are held in a shared Topology, the brain itself only holds its values and weights.
+    """
+    def __getstate__(self):
+        """
+        What is saved of the brain in a checkpoint (see checkpoint.py), a brain in a batch is given its arrays again by the batch
+        """
+        state = dict(self.__dict__)
+        # the arrays shared with the topology are taken from it again, and the folded weights are made again from the weights
+        for name in ("input_block", "source_index", "sigmoid_multipliers") + Folded_arrays:
+            state.pop(name, None)
+        if self.batch != None:
+            state.pop("values", None)
+        return state
+
+    def __setstate__(self, state):
+        # the batch may already have bound the brain, so nothing it set is replaced
+        self.__dict__.update(state)
+        self.source_index = self.topology.source_index
+        self.sigmoid_multipliers = self.topology.sigmoid_multipliers
+        if self.batch == None and "values" in state:
+            self.input_block = self.values[:len(self.input_names)].reshape(self.num_of_inputs, self.input_expansion_factor + 1)
+            self.allocateFolded()
+            self.foldWeights()
+
+    def __init__(self,num_of_neurons=0, num_of_connections_each=0, num_of_inputs=1, num_of_outputs=0, file_name = None, input_expansion_factor = Input_expansion_factor):
+        self.input_expansion_factor = input_expansion_factor
         self.num_of_outputs = num_of_outputs
 
         self.chance_of_neuron_connection = 0.8
@@ -20,209 +212,136 @@ class Brain:
         if num_of_connections_each > num_of_neurons:
             print('There are too many connections for the number of neurons!')
 
-        self.neuron_names = []
-        self.input_names = []
-        self.neurons = []
-
         self.dict_all_values = {}
+
+        # set when the brain is stepped as part of a brain_batch.BrainBatch
+        self.batch = None
+        self.batch_row = None
         
         if file_name == None:
+            neuron_names = ["n"+str(i) for i in range(num_of_neurons)]
+            input_names = inputNames(num_of_inputs, input_expansion_factor)
 
-            # create the names of the neurons
-            i=0
-            while i < self.num_of_neurons:
-                self.neuron_names.append("n"+str(i))
-                self.dict_all_values[self.neuron_names[i]] = 0
-                i+=1
-        
-            # create the neurons
-            for x in self.neuron_names:
-                self.neurons.append(neuron.Neuron3(x))
-        
-            # create the inputs
-            i=0
-            while i < self.num_of_inputs:
-                # for each input
-                name = "i"+str(i)
-                self.input_names.append(name)
-                self.dict_all_values[name] = 0
-                j = 0
-                while j < self.input_expansion_factor:
-                    #expand the input by this factor
-                    #segmetents the input values so that there is a larger array of inputs
-                    # eg. input 1_0 = 0.9837 -> input 1_1 = 0.837 -> input 1_2 = 0.37
-                    # this, in theory, allows the brain to have higher precision with the inputs
-                    name = "i"+str(i)+"_"+str(j)
-                    self.input_names.append(name)
-                    self.dict_all_values[name] = 0
-                    j+=1
-                i+=1
-        
             # link the neurons to each other
+            connections = []
+            weights = []
             i=0
-            while i < self.num_of_neurons:
+            while i < num_of_neurons:
                 # for each neuron
                 j=0
-                connections = []
-                while j < self.num_of_connections:
+                neuron_connections = []
+                while j < num_of_connections_each:
                     # connect to either, another neuron, or an input
 
                     #chance of connecting to another neuron
-                    rand = random.random()
+                    rand = streams.Brains.random()
 
                     # randomises which input/neuron to connect to
-                    rand2 = random.random()
+                    rand2 = streams.Brains.random()
 
 
                     if rand <= self.chance_of_neuron_connection:
-                        connections.append(self.neuron_names[int((self.num_of_neurons-1)*rand2)])
+                        neuron_connections.append(neuron_names[int((num_of_neurons-1)*rand2)])
                     else:
-                        connections.append(self.input_names[int((self.num_of_inputs*(self.input_expansion_factor+1))*rand2)])
+                        neuron_connections.append(input_names[int((num_of_inputs*(input_expansion_factor+1))*rand2)])
                     j += 1
 
-                # assigns this list of inputs to the neuron
-                self.neurons[i].input_names = connections
-                # makes the neuron generate weights for each of these connections
-                self.neurons[i].createWeights(self.num_of_connections)
+                connections.append(neuron_connections)
+                # generate weights for each of these connections
+                weights.append(randomWeights(num_of_connections_each))
                 i+=1
 
+            self.topology = getTopology(num_of_inputs, input_expansion_factor, connections)
+            self.compile()
+            self.setWeights(np.array(weights, dtype=float).T.reshape(self.weight_matrix.shape))
+
         else:
             # creates a brain from a file
-            # open file
-            file_object = open(file_name, "r")
-            # get first two rows
-            self.num_of_inputs = int(file_object.readline())
-            # create the inputs
-            i=0
-            while i < self.num_of_inputs:
-                name = "i"+str(i)
-                self.input_names.append(name)
-                self.dict_all_values[name] = 0
-                j = 0
-                while j < self.input_expansion_factor:
-                    name = "i"+str(i)+"_"+str(j)
-                    self.input_names.append(name)
-                    self.dict_all_values[name] = 0
-                    j+=1
-                i+=1
-
-            # create the names of the neurons
-            self.num_of_neurons = int(file_object.readline())
-            i=0
-            while i < self.num_of_neurons:
-                self.neuron_names.append("n"+str(i))
-                self.dict_all_values[self.neuron_names[i]] = 0
-                i+=1
-
-            # collect data about neurons
-            i=0
-            while i < self.num_of_neurons:
-                neuron_name = "n"+str(i)
-                line = str(file_object.readline())
-                if line != "~":
-                    connections = json.loads(line)
-                    line = str(file_object.readline())
-                    weights = json.loads(line)
-                    file_object.readline()
-                    self.neurons.append(neuron.Neuron3(neuron_name, connections, weights))
-                i+=1
+            self.useTemplate(loadTemplate(file_name, input_expansion_factor))
 
-    def buildFromFile(self,file_name):
-        # creates a brain from a file
+    # the layout of the brain comes from its topology
+    @property
+    def num_of_inputs(self):
+        return self.topology.num_of_inputs
 
-        # wipe any previous values
-        self.input_expansion_factor = 5
+    @property
+    def num_of_neurons(self):
+        return self.topology.num_of_neurons
 
-        self.num_of_neurons = 0
-        self.num_of_connections = 0
-        self.num_of_inputs = 0
-        self.num_of_outputs = 0
+    @property
+    def num_of_connections(self):
+        return self.topology.num_of_connections
 
-        self.chance_of_neuron_connection = 0.8
+    @property
+    def input_names(self):
+        return self.topology.input_names
 
-        self.neuron_names = []
-        self.input_names = []
-        self.neurons = []
+    @property
+    def neuron_names(self):
+        return self.topology.neuron_names
 
-        self.dict_all_values = {}
+    @property
+    def value_names(self):
+        return self.topology.value_names
 
-        # open file
-        file_object = open(file_name, "r")
-        # get first two rows
-        self.num_of_inputs = int(file_object.readline())
-        # create the inputs
-        i=0
-        while i < self.num_of_inputs:
-            name = "i"+str(i)
-            self.input_names.append(name)
-            self.dict_all_values[name] = 0
-            j = 0
-            while j < self.input_expansion_factor:
-                name = "i"+str(i)+"_"+str(j)
-                self.input_names.append(name)
-                self.dict_all_values[name] = 0
-                j+=1
-            i+=1
+    @property
+    def value_index(self):
+        return self.topology.value_index
 
-        # find how many neurons there are
-        self.num_of_neurons = int(file_object.readline())
+    @property
+    def neuron_slice(self):
+        return self.topology.neuron_slice
 
-        # create the names of the neurons
-        i=0
-        while i < self.num_of_neurons:
-            self.neuron_names.append("n"+str(i))
-            self.dict_all_values[self.neuron_names[i]] = 0
-            i+=1
-        # collect data about neurons
-        i=0
-        while i < self.num_of_neurons:
-            neuron_name = "n"+str(i)
-            line = str(file_object.readline())
-            if line != "~":
-                connections = json.loads(line)
-                line = str(file_object.readline())
-                weights = json.loads(line)
-                file_object.readline()
-                #build the neuron
-                self.neurons.append(neuron.Neuron3(neuron_name, connections, weights))
-            i+=1
+    def buildFromFile(self,file_name, input_expansion_factor = 5):
+        # creates a brain from a file, wiping any previous values
+        self.input_expansion_factor = input_expansion_factor
+        self.num_of_outputs = 0
+        self.useTemplate(loadTemplate(file_name, input_expansion_factor))
 
 
     def calculateInputs(self):
         #segmetents the input values so that there is a larger array of inputs
-        # eg. input 1_0 = 0.9837 -> input 1_1 = 0.837 -> input 1_2 = 0.37
         # this, in theory, allows the brain to have higher precision with the inputs
-        i=0
-        while i < self.num_of_inputs:
-            # cycle through each parent input
-            input_name = 'i'+str(i)
-            # get the value from the list of outputs (this should have been reassinged externaly)
-            input_value = self.dict_all_values[input_name]
-            j=0
-            while j < self.input_expansion_factor:
-                # calculate each of the child inputs
-                input_name = 'i'+str(i)+"_"+str(j)
-                input_value = (input_value*10)-int(input_value*10)
-                # assing the results to the list of outputs
-                self.dict_all_values[input_name] = input_value
-                j+=1
-            i+=1
+        # each row holds a parent input (assigned externaly) followed by its child inputs
+        expandInputs(self.input_block, self.input_expansion_factor)
 
     def calculateOutputs(self):
+        values = self.values
         self.calculateInputs()
 
-        # each neuron collects its inputs from the dictionary of all output values
-        i=0
-        while i < self.num_of_neurons:
-            self.neurons[i].getInputs(self.dict_all_values)
-            i+=1
-
-        # each neuron calculates its output and assigns it back to the dictionary
-        i=0
-        while i < self.num_of_neurons:
-            self.neurons[i].calculateOutput()
-            self.dict_all_values[self.neuron_names[i]] = self.neurons[i].output
-            i+=1
+        # each neuron takes the size of the values of the last step (same as Neuron3.getInputs)
+        # and adds them up with its weights, the last value is the 1 the baseline weights connect to
+        total = self.folded_weights.dot(np.abs(values))
+
+        # pulls the total back into the range of -1 to 1 (same as Neuron3.calculateOutput) and applies the sigmoid multiplier
+        total *= np.where(total >= 0, self.scale_pos, self.scale_neg)
+
+        # the sigmoid function, assigned back to the neuron values
+        np.exp2(total, out=total)
+        total += 1
+        np.reciprocal(total, out=values[self.neuron_slice])
+
+    def allocateFolded(self):
+        """
+        Creates the (empty) arrays foldWeights fills in
+        """
+        self.folded_weights = np.zeros((self.num_of_neurons, len(self.values)))
+        self.scale_pos = np.zeros(self.num_of_neurons)
+        self.scale_neg = np.zeros(self.num_of_neurons)
+
+    def foldWeights(self):
+        """
+        Gathers the weights into the form calculateOutputs uses: one row per neuron and one column per value,
+        with the weights of connections to the same value added together,
+        and the weight totals divided into the sigmoid multipliers.
+        This is redone whenever the weights change through the brain (setWeights and useTemplate).
+        The arrays are written in place, so a brain in a batch steps with its new weights there too.
+        """
+        # the weights are added up one connection at a time
+        folded_weights = np.bincount(self.topology.fold_index, self.weight_matrix.ravel(), self.folded_weights.size)
+        self.folded_weights[...] = folded_weights.reshape(self.folded_weights.shape)
+        np.divide(self.sigmoid_multipliers, self.sum_of_weights_pos, out=self.scale_pos)
+        np.divide(self.sigmoid_multipliers, self.sum_of_weights_neg, out=self.scale_neg)
     
     def saveBrain(self,file_location):
         brainFile = open(file_location,"w")
@@ -231,67 +350,123 @@ class Brain:
         
         i=0
         while i<self.num_of_neurons:
-            brainFile.write(json.dumps(self.neurons[i].input_names)+"\n")
-            brainFile.write(json.dumps(self.neurons[i].weights)+"\n")
+            brainFile.write(json.dumps(list(self.topology.connections[i]))+"\n")
+            brainFile.write(json.dumps(self.weight_matrix[:, i].tolist())+"\n")
             brainFile.write(".\n")
             i+=1
         brainFile.write("~")
         brainFile.close()
+
+        # any template of the file is now out of date
+        path = os.path.abspath(file_location)
+        for key in [key for key in Templates if key[0] == path]:
+            del Templates[key]
     
     def loadBrain(self, file_name):
-        # creates a brain from a file
-
-        #wipe previous brain
-        self.neurons = []
-        self.neuron_names = []
-        self.input_names = []
-        self.num_of_connections = 10
-
-        # open file
-        file_object = open(file_name, "r")
-        # get first two rows
-        self.num_of_inputs = int(file_object.readline())
-        # create the inputs
-        i=0
-        while i < self.num_of_inputs:
-            name = "i"+str(i)
-            self.input_names.append(name)
-            self.dict_all_values[name] = 0
-            j = 0
-            while j < self.input_expansion_factor:
-                name = "i"+str(i)+"_"+str(j)
-                self.input_names.append(name)
-                self.dict_all_values[name] = 0
-                j+=1
-            i+=1
-
-        # create the names of the neurons
-        self.num_of_neurons = int(file_object.readline())
-        i=0
-        while i < self.num_of_neurons:
-            self.neuron_names.append("n"+str(i))
-            self.dict_all_values[self.neuron_names[i]] = 0
-            i+=1
-
-        # collect data about neurons
-        i=0
-        while i < self.num_of_neurons:
-            neuron_name = "n"+str(i)
-            line = str(file_object.readline())
-            if line != "~":
-                connections = json.loads(line)
-                line = str(file_object.readline())
-                weights = json.loads(line)
-                file_object.readline()
-                self.neurons.append(neuron.Neuron3(neuron_name, connections, weights))
-                self.num_of_connections = len(connections)
-            i+=1
+        # creates a brain from a file (only read from the disk if it has changed), the values start again from 0
+        self.useTemplate(loadTemplate(file_name, self.input_expansion_factor))
     
     def randomiseNeuronWeights(self):
-        i=0
-        while i < self.num_of_neurons:
-            self.neurons[i].createWeights(self.num_of_connections)
-            i+=1
+        weights = [randomWeights(self.num_of_connections) for i in range(self.num_of_neurons)]
+        self.setWeights(np.array(weights, dtype=float).T.reshape(self.weight_matrix.shape), keep_totals=True)
+
+    def compile(self):
+        """
+        Creates the value vector and the (empty) weights for the topology of the brain,
+        so that a step of the brain is a handful of array operations.
+        Needs to be rerun if the topology changes.
+        """
+        previous_values = self.dict_all_values
+
+        # one extra value which is always 1, the baseline weight of each neuron connects to it
+        self.values = np.zeros(len(self.value_names) + 1)
+        self.values[-1] = 1
+        # carry over any values which were already assigned
+        for name in previous_values:
+            if name in self.value_index:
+                self.values[self.value_index[name]] = previous_values[name]
+        self.dict_all_values = BrainValues(self)
+
+        # each parent input is followed by its child inputs
+        self.input_block = self.values[:len(self.input_names)].reshape(self.num_of_inputs, self.input_expansion_factor + 1)
+
+        # shared with every other brain of this topology
+        self.source_index = self.topology.source_index
+        self.sigmoid_multipliers = self.topology.sigmoid_multipliers
+
+        # the weights of each connection (plus the baseline), one row per connection and one column per neuron
+        self.weight_matrix = np.zeros(self.source_index.shape)
+        # the negative sum is stored flipped so both sides of the range are a single division (-t / s == t / -s)
+        # a total of 0 has nowhere to be scaled to, so empty sums are held as infinity (see weightTotals)
+        self.sum_of_weights_pos = np.full(self.num_of_neurons, np.inf)
+        self.sum_of_weights_neg = np.full(self.num_of_neurons, np.inf)
+        self.allocateFolded()
+
+        # keep the batch in step with the new arrays
+        if self.batch != None:
+            self.batch.refresh(self)
+
+    def setWeights(self, weight_matrix, keep_totals = False):
+        """
+        Copies the given weights (one row per connection and one column per neuron) into the brain.
+        The weight totals which limit the inputs are recalculated,
+        unless keep_totals is set in which case the new totals are added onto the ones already held
+        (the same as Neuron3.setWeights, which the bred and mutated brains have always relied on).
+        The arrays are written in place so a brain in a batch does not need to be refreshed.
+        """
+        self.weight_matrix[...] = weight_matrix
+        if keep_totals:
+            sum_pos, sum_neg = weightTotals(weight_matrix, self.sum_of_weights_pos, self.sum_of_weights_neg)
+        else:
+            sum_pos, sum_neg = weightTotals(weight_matrix)
+        self.sum_of_weights_pos[...] = sum_pos
+        self.sum_of_weights_neg[...] = sum_neg
+        self.foldWeights()
+
+    def useTemplate(self, template):
+        """
+        Makes the brain a copy of a BrainTemplate, the values start again from 0
+        """
+        self.dict_all_values = {}
+        self.topology = template.topology
+        self.compile()
+        self.weight_matrix[...] = template.weight_matrix
+        self.sum_of_weights_pos[...] = template.sum_of_weights_pos
+        self.sum_of_weights_neg[...] = template.sum_of_weights_neg
+        self.foldWeights()
+
+def weightTotals(weight_matrix, kept_pos = None, kept_neg = None):
+    """
+    Returns the positive and (flipped) negative totals of the weights of each neuron, in the form held by a Brain.
+    If totals are given the new totals are added onto them.
+    """
+    # the totals are added up one weight at a time (after any totals which are kept) to round the same as Neuron3
+    pos_weights = np.where(weight_matrix >= 0, weight_matrix, 0)
+    neg_weights = np.where(weight_matrix < 0, -weight_matrix, 0)
+    if kept_pos is not None:
+        pos_weights = np.vstack((np.where(np.isinf(kept_pos), 0, kept_pos), pos_weights))
+        neg_weights = np.vstack((np.where(np.isinf(kept_neg), 0, kept_neg), neg_weights))
+    num_of_neurons = weight_matrix.shape[-1] if weight_matrix.ndim == 2 else 0
+    sum_pos = np.zeros(num_of_neurons)
+    sum_neg = np.zeros(num_of_neurons)
+    for row in range(len(pos_weights)):
+        sum_pos += pos_weights[row]
+        sum_neg += neg_weights[row]
+    # a total of 0 has nowhere to be scaled to, so empty sums are held as infinity to leave it at 0
+    return np.where(sum_pos == 0, np.inf, sum_pos), np.where(sum_neg == 0, np.inf, sum_neg)
+
+def randomWeights(number_of_weights):
+    """
+    Weights between -1 and 1 for each connection plus the baseline weight (same as Neuron3.createWeights)
+    """
+    weights = []
+    i=0
+    while i < number_of_weights:
+        weights.append(streams.Brains.random()*2-1)
+        i+=1
+    # This baseline is less and less effective the more inputs are present
+    weights.append((streams.Brains.random()*2-1)/(number_of_weights+1))
+    return weights
 
 
 def main():
@@ -313,7 +488,7 @@ def main():
 
                 text ="{:2.0f} neuron 0 : {:.3f} neuron 50 : {:.3f} neuron 51 : {:.3f}"
         
-                print(text.format(i,net.neurons[0].output,net.neurons[24].output,net.neurons[49].output))
+                print(text.format(i,net.dict_all_values["n0"],net.dict_all_values["n24"],net.dict_all_values["n49"]))
             i+=1
 
 if __name__ == '__main__':
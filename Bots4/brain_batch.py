@@ -0,0 +1,281 @@
+import numpy as np
+import brain
+import shared_arrays
+
+Initial_capacity = 64 # number of brains the batch has room for before it needs to grow
+
+class BrainBatch:
+    """
+    Stacks the compiled arrays of many brains so that all of them can be calculated in one step.
+    Every brain in the batch must have the same layout (inputs, expansion factor, neurons and connections).
+    The arrays of each added brain are swapped for views into its row of the batch,
+    so values written to the brain (eg. through dict_all_values) are seen by the batch and the other way round.
+    A shared batch keeps its arrays in shared memory, so other processes can attach to them and calculate some of the rows.
+    """
+    # the arrays needed to calculate the brains (each brain's values and folded weights, see Brain.foldWeights),
+    # which are what another process attaches to
+    Shared_arrays = ("values",) + brain.Folded_arrays
+
+    def __init__(self, capacity=Initial_capacity, shared=False):
+        self.capacity = capacity
+        self.size = 0
+        # the brain held in each row
+        self.brains = []
+        # the arrays are created when the first brain is added, as that decides the layout
+        self.layout = None
+        self.shared = shared
+        # the blocks of shared memory holding the arrays, by the name of the array
+        self.blocks = {}
+
+    def _full(self, name, shape, value, dtype=float):
+        """
+        Creates one of the stacked arrays, in shared memory if the batch is shared
+        """
+        if not self.shared:
+            return np.full(shape, value, dtype=dtype)
+        array, self.blocks[name] = shared_arrays.zeros(shape, dtype)
+        array[...] = value
+        return array
+
+    def _allocate(self, capacity):
+        """
+        Creates (or grows) the stacked arrays so there is room for the given number of brains.
+        The brains already held are copied across and rebound to their new rows.
+        """
+        num_of_values, num_of_neurons = self.layout[0], self.layout[2]
+        old_blocks = list(self.blocks.values())
+
+        values = self._full("values", (capacity, num_of_values), 0)
+        values[:, -1] = 1
+        folded_weights = self._full("folded_weights", (capacity, num_of_neurons, num_of_values), 0)
+        scale_pos = self._full("scale_pos", (capacity, num_of_neurons), 0)
+        scale_neg = self._full("scale_neg", (capacity, num_of_neurons), 0)
+
+        if self.size > 0:
+            values[:self.size] = self.values[:self.size]
+            folded_weights[:self.size] = self.folded_weights[:self.size]
+            scale_pos[:self.size] = self.scale_pos[:self.size]
+            scale_neg[:self.size] = self.scale_neg[:self.size]
+
+        self.capacity = capacity
+        self.values = values
+        self.folded_weights = folded_weights
+        self.scale_pos = scale_pos
+        self.scale_neg = scale_neg
+
+        # each parent input followed by its child inputs, for every brain
+        num_of_inputs, expansion_factor = self.layout[3], self.layout[4]
+        self.input_block = self.values[:, :num_of_inputs*(expansion_factor+1)].reshape(capacity, num_of_inputs, expansion_factor+1)
+
+        row = 0
+        while row < self.size:
+            self._bind(row)
+            row += 1
+
+        for block in old_blocks:
+            shared_arrays.free(block)
+
+    def __getstate__(self):
+        """
+        What is saved of the batch in a checkpoint (see checkpoint.py), only the rows in use are kept
+        """
+        state = dict(self.__dict__)
+        state["shared"] = False
+        state["blocks"] = {}
+        state.pop("attached_blocks", None)
+        state.pop("input_block", None)
+        if self.layout != None:
+            for name in self.Shared_arrays:
+                state[name] = getattr(self, name)[:self.size].copy()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # rebuilds the arrays at full capacity and binds the brains to their rows
+        if self.layout != None:
+            self._allocate(self.capacity)
+
+    def sharedLayout(self):
+        """
+        What another process needs to attach to the arrays of a shared batch
+        """
+        layout = {"layout": self.layout, "value_index": self.value_index, "neuron_slice": self.neuron_slice}
+        for name in self.Shared_arrays:
+            layout[name] = shared_arrays.describe(getattr(self, name), self.blocks[name])
+        return layout
+
+    @classmethod
+    def attach(cls, layout):
+        """
+        Opens the arrays of a shared batch created by another process.
+        The attached batch holds no brains and can only calculate, its size is set by whoever uses it.
+        """
+        attached = cls(shared=False)
+        attached.layout = layout["layout"]
+        attached.value_index = layout["value_index"]
+        attached.neuron_slice = layout["neuron_slice"]
+        attached.attached_blocks = []
+        for name in cls.Shared_arrays:
+            array, block = shared_arrays.attach(layout[name])
+            setattr(attached, name, array)
+            attached.attached_blocks.append(block)
+        attached.capacity = attached.values.shape[0]
+        num_of_inputs, expansion_factor = attached.layout[3], attached.layout[4]
+        attached.input_block = attached.values[:, :num_of_inputs*(expansion_factor+1)].reshape(attached.capacity, num_of_inputs, expansion_factor+1)
+        return attached
+
+    def detach(self):
+        """
+        Closes the arrays of an attached batch, it can not be used afterwards
+        """
+        attached_blocks = self.attached_blocks
+        # the arrays must be gone before the blocks can be closed
+        self.__dict__.clear()
+        for block in attached_blocks:
+            block.close()
+
+    def release(self):
+        """
+        Frees the shared memory of a shared batch, once it is no longer needed by any process
+        """
+        for block in self.blocks.values():
+            shared_arrays.free(block)
+        self.blocks = {}
+
+    def reorder(self, order):
+        """
+        Moves the brains so the brain in row order[i] is now in row i
+        """
+        n = self.size
+        for name in self.Shared_arrays:
+            array = getattr(self, name)
+            array[:n] = array[order]
+        self.brains = [self.brains[row] for row in order]
+        row = 0
+        while row < n:
+            self._bind(row)
+            row += 1
+
+    def _bind(self, row):
+        """
+        Points the arrays of the brain in this row at the batch
+        """
+        net = self.brains[row]
+        net.batch = self
+        net.batch_row = row
+        net.values = self.values[row]
+        net.input_block = self.input_block[row]
+        net.folded_weights = self.folded_weights[row]
+        net.scale_pos = self.scale_pos[row]
+        net.scale_neg = self.scale_neg[row]
+
+    def _copyIn(self, net, row):
+        """
+        Copies the compiled arrays of a brain into the given row
+        """
+        self.values[row] = net.values
+        self.copyWeights(net, row)
+
+    def refresh(self, net):
+        """
+        Copies a brain back into its row and rebinds it, used after the brain has been recompiled
+        """
+        layout = (len(net.values), net.source_index.shape[0], net.source_index.shape[1], net.num_of_inputs, net.input_expansion_factor)
+        if layout != self.layout:
+            raise ValueError("the brain no longer has the same layout as the rest of the batch")
+        self._copyIn(net, net.batch_row)
+        self._bind(net.batch_row)
+
+    def copyWeights(self, net, row):
+        """
+        Copies the (folded) weights of a brain into the given row
+        """
+        self.folded_weights[row] = net.folded_weights
+        self.scale_pos[row] = net.scale_pos
+        self.scale_neg[row] = net.scale_neg
+
+    def add(self, net):
+        """
+        Adds a compiled brain to the end of the batch and returns the row it was given
+        """
+        if net.batch != None:
+            raise ValueError("the brain is already part of a batch")
+
+        layout = (len(net.values), net.source_index.shape[0], net.source_index.shape[1], net.num_of_inputs, net.input_expansion_factor)
+        if self.layout == None:
+            self.layout = layout
+            # where each input and neuron is in the values of every brain
+            self.value_index = net.value_index
+            self.neuron_slice = net.neuron_slice
+            self._allocate(self.capacity)
+        elif layout != self.layout:
+            raise ValueError("the brain does not have the same layout as the rest of the batch")
+
+        if self.size == self.capacity:
+            self._allocate(self.capacity * 2)
+
+        row = self.size
+        self.brains.append(net)
+        self._copyIn(net, row)
+        self._bind(row)
+        self.size += 1
+        return row
+
+    def remove(self, net):
+        """
+        Removes a brain from the batch.
+        The last brain is moved into the empty row so no other rows need to shift.
+        The removed brain keeps a copy of its arrays so it can still be used on its own.
+        """
+        row = net.batch_row
+        last = self.size - 1
+
+        # give the removed brain its own arrays
+        net.values = net.values.copy()
+        net.input_block = net.values[:len(net.input_names)].reshape(net.num_of_inputs, net.input_expansion_factor + 1)
+        net.folded_weights = net.folded_weights.copy()
+        net.scale_pos = net.scale_pos.copy()
+        net.scale_neg = net.scale_neg.copy()
+        net.batch = None
+        net.batch_row = None
+
+        if row != last:
+            # move the last brain into the empty row
+            moved = self.brains[last]
+            self.brains[row] = moved
+            self._copyIn(moved, row)
+            self._bind(row)
+        self.brains.pop()
+        self.size -= 1
+
+    def calculateInputs(self, rows=None):
+        """
+        Expands the parent inputs of every brain into their child inputs (the same as Brain.calculateInputs)
+        """
+        if rows == None:
+            rows = slice(0, self.size)
+        brain.expandInputs(self.input_block[rows], self.layout[4])
+
+    def calculateOutputs(self, rows=None):
+        """
+        Steps every brain in the batch at once (the same as Brain.calculateOutputs for each brain, bit for bit)
+        rows limits which brains are stepped (a slice of the batch), by default every brain is.
+        """
+        if self.size == 0:
+            return
+        if rows == None:
+            rows = slice(0, self.size)
+        self.calculateInputs(rows)
+
+        # each neuron takes the size of the values of the last step and adds them up with its folded weights,
+        # one matrix-vector product per brain (the last value is the 1 the baseline weights connect to)
+        total = np.matmul(self.folded_weights[rows], np.abs(self.values[rows])[:, :, None])[:, :, 0]
+
+        # pulls the total back into the range of -1 to 1 and applies the sigmoid multiplier
+        total *= np.where(total >= 0, self.scale_pos[rows], self.scale_neg[rows])
+
+        # the sigmoid function, assigned back to the neuron values
+        np.exp2(total, out=total)
+        total += 1
+        np.reciprocal(total, out=total)
+        self.values[rows, self.neuron_slice] = total
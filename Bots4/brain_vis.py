@@ -26,7 +26,7 @@ class Display:
 
         # how many neurons in the brain
         self.num_of_neurons = input_brain.num_of_neurons
-        self.num_of_inputs = input_brain.num_of_inputs * input_brain.input_expansion_factor
+        self.num_of_inputs = len(input_brain.input_names)
         self.total_num_of_neurons = self.num_of_neurons + self.num_of_inputs
 
         # work out how much space is required to show all the neurons
@@ -74,7 +74,7 @@ class Display:
         num_of_neuron_check=0
         while y < self.upper_index and num_of_neuron_check < self.num_of_neurons:
             while x < self.upper_index and num_of_neuron_check < self.num_of_neurons:
-                self.neurons.append({"name":input_brain.neuron_names[num_of_neuron_check],"circle":self._createCircle(x,y,0.2,"orange"),"x":x,"y":y,"connection list":input_brain.neurons[num_of_neuron_check].input_names,"weights":input_brain.neurons[num_of_neuron_check].weights})
+                self.neurons.append({"name":input_brain.neuron_names[num_of_neuron_check],"circle":self._createCircle(x,y,0.2,"orange"),"x":x,"y":y,"connection list":input_brain.topology.connections[num_of_neuron_check],"weights":input_brain.weight_matrix[:, num_of_neuron_check]})
                 x+=1
                 num_of_neuron_check+=1
             x=self.lower_index
@@ -0,0 +1,56 @@
+import numpy as np
+import bot
+
+def willingToBreed(population):
+    """
+    Returns which bots of the population are eligable to breed (same as the checks in Bot.breed, for all of the bots at once)
+    """
+    n = population.size
+    return ((population.breeding_points[:n] >= 1) & (population.energy_level[:n] >= bot.Min_energy_to_breed)
+            & (population.time_since_last_child[:n] >= bot.Min_breed_delay) & (population.time_since_birth[:n] >= bot.Min_age_to_breed))
+
+class BreedingPool:
+    """
+    The bots which are eligable to breed, kept per species (colour) so that bots are only ever paired with willing bots of their own kind.
+    Almost no bot is eligable at any moment, so pairing them is far less work than trying every pair of bots.
+    """
+    def __init__(self):
+        # the eligable bots of each species, in the order of their rows
+        self.species = {}
+        # the eligable bots in the order of their rows
+        self.members = []
+
+    def update(self, population):
+        """
+        Rebuilds the pool from the population, this is done every step rather than following the bots which cross the thresholds.
+        The thresholds are checked for the whole population at once (see willingToBreed), so only the few eligable bots are visited one by one.
+        """
+        self.species = {}
+        self.members = []
+        for row in np.flatnonzero(willingToBreed(population)):
+            member = population[row]
+            self.members.append(member)
+            self.species.setdefault(member.colour, []).append(member)
+
+    def remove(self, member):
+        """
+        Takes a bot out of the pool (eg. after it has bred)
+        """
+        self.members.remove(member)
+        self.species[member.colour].remove(member)
+
+    def pairs(self):
+        """
+        Yields pairs of eligable bots of the same species.
+        Each bot is paired with the first eligable bot of its species which is still in the pool,
+        in the same order as trying every pair of bots row by row.
+        The bots are taken out of the pool as they are paired.
+        """
+        while len(self.members) > 0:
+            member = self.members[0]
+            self.remove(member)
+            same_species = self.species[member.colour]
+            if len(same_species) > 0:
+                partner = same_species[0]
+                self.remove(partner)
+                yield member, partner
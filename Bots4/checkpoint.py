@@ -0,0 +1,39 @@
+import os
+import pickle
+import struct
+import streams
+
+Magic = b"BOTSCKPT" # the start of every checkpoint file
+Version = 6 # changed whenever what is saved changes, older checkpoints are then refused
+Header = struct.Struct("<8sI")
+
+def save(sim, file_name):
+    """
+    Saves everything needed to carry on the simulation exactly where it is: the bots and their brains, the rewards, the world,
+    the counters and the state of the random number generators.
+    The checkpoint is written next to the file and renamed over it once complete, so a crash never leaves half a checkpoint.
+    """
+    state = {"simulation": sim,
+             "streams": streams.getState()}
+    temporary_file_name = file_name + ".tmp"
+    with open(temporary_file_name, "wb") as checkpoint_file:
+        checkpoint_file.write(Header.pack(Magic, Version))
+        pickle.dump(state, checkpoint_file, protocol=pickle.HIGHEST_PROTOCOL)
+        checkpoint_file.flush()
+        os.fsync(checkpoint_file.fileno())
+    os.replace(temporary_file_name, file_name)
+
+def load(file_name):
+    """
+    Loads a checkpoint made with save, the random number generators carry on from where they were.
+    Returns the simulation.
+    """
+    with open(file_name, "rb") as checkpoint_file:
+        magic, version = Header.unpack(checkpoint_file.read(Header.size))
+        if magic != Magic:
+            raise ValueError(file_name+" is not a checkpoint")
+        if version != Version:
+            raise ValueError(file_name+" is a version "+str(version)+" checkpoint, only version "+str(Version)+" can be loaded")
+        state = pickle.load(checkpoint_file)
+    streams.setState(state["streams"])
+    return state["simulation"]
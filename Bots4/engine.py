@@ -0,0 +1,650 @@
+import os
+import math
+import argparse
+import numpy as np
+import bot
+import reward
+import genetics
+import brain_batch
+import population
+import vision
+import thinking
+import physics
+import breeding
+import spatial
+import environment
+import checkpoint
+import eventlog
+import profiling
+import telemetry
+import results
+import streams
+
+# Global Variables
+# World
+World_width = 100
+World_height = 100
+# Collisions
+EnableCollisions = False
+# the tiles of the world (food, scent and occupancy, see environment.py) are kept up to date each step
+# nothing reads them yet, so they are off unless asked for
+EnableWorld = False
+# damage taken by a bot which reaches the boundry of the world
+Boundry_damage = 8
+# Number of bots
+Bots_per_square_unit = 5/100
+# Number of rewards in the world at once
+Num_of_rewards = 1
+
+total_number_of_connections_per_bot = bot.Num_of_neurons*bot.Num_of_connections
+
+# the brains of all the alive bots are run together (brain_batch), so this can be much higher than
+# when each brain was stepped on its own
+max_num_of_connections = 250000
+
+Absolute_max_num_of_bots = max_num_of_connections/total_number_of_connections_per_bot
+
+# the starting population is this fraction of the maximum number of bots
+Initial_fraction_of_bots = 0.5
+
+#breeding conditions of the starting population
+initiation_max_change = [0.5, 1]
+
+# simulated seconds per step when the simulation is run headless
+Time_step = 0.05
+
+# simulated seconds between checkpoints when the simulation is run headless with a checkpoint file
+Checkpoint_interval = 300
+
+def botCollisionCheck(bot1:bot.Bot, bot2:bot.Bot):
+    """
+    This function checks if the two bots have overlapped eachother,
+    if they have then the first bot will be bumped back from the second bot.
+    """
+    # make sure not checking that the bot is coliding with itself
+    if bot1.name != bot2.name:
+        # get distances between bots on the two axis ( bot 1 from bot 2 )
+        X_Displacement = bot1.getPosition()[0] - bot2.getPosition()[0]
+        Y_Displacement = bot1.getPosition()[1] - bot2.getPosition()[1]
+
+        # if this distance is less than the combined radius of the two bots then they must be coliding
+        distance = math.sqrt(X_Displacement**2 +Y_Displacement**2)
+
+        if distance < bot.Radius*2:
+            if X_Displacement < 0:
+                #bot 1 is to the left
+                bot1.position[0] -= bot.Radius*2.0 + X_Displacement
+            else:
+                #bot 1 is to the right
+                bot1.position[0] += bot.Radius*2.0 - X_Displacement
+
+            if Y_Displacement < 0:
+                #bot 1 is above
+                bot1.position[1] -= bot.Radius*2.0 + Y_Displacement
+            else:
+                #bot 1 is below
+                bot1.position[1] += bot.Radius*2.0 - Y_Displacement
+
+class Simulation:
+    """
+    A single run of the simulation, from the starting bots until the end conditions are met.
+    The simulation only moves forward when step is called with a new simulated time,
+    so it can be driven by the real time (simulator.py) or by a fixed time step as fast as possible (run).
+    Nothing here is drawn, a display can follow the bots through botAdded and botRemoved.
+    """
+    def __init__(self, world_width=World_width, world_height=World_height, enable_collisions=EnableCollisions, num_of_rewards=Num_of_rewards, seed=None, output_dir=".", results_file=None,
+                 enable_world=EnableWorld):
+        self.world_width = world_width
+        self.world_height = world_height
+        self.enable_collisions = enable_collisions
+        # where the record and the new starter brains and attributes are written
+        self.output_dir = output_dir
+        # where every bot is saved at the end (see results.py), by default in the output folder
+        if results_file == None:
+            results_file = os.path.join(output_dir, results.Default_results_file)
+        self.results_file = results_file
+
+        self.max_num_of_bots = min(world_width*world_height*Bots_per_square_unit,Absolute_max_num_of_bots)
+        self.initial_number_of_bots = int(self.max_num_of_bots*Initial_fraction_of_bots)
+
+        # every random number is drawn from streams seeded by the run seed, so the same seed gives the same run
+        # without a seed one is picked, it is kept so the run can be repeated
+        self.seed = streams.seed(seed)
+
+        self.simulation_time = 0.0
+        self.number_of_steps = 0
+        # the simulated time the next checkpoint is due at (see run)
+        self.next_checkpoint = None
+        # the settings the simulation was last run with (see run), saved with the results
+        self.time_step = None
+        self.time_limit = None
+        self.generation_limit = None
+        # where births, deaths, meals and rewards moving are recorded, if anywhere (see logEvents)
+        self.event_log = None
+        # where samples of the population are written, if anywhere (see recordTelemetry)
+        self.telemetry = None
+        # times the phases of each step, disabled unless it is switched on
+        self.profiler = profiling.Profiler()
+
+        # list of all the bots that where generated, a bot is added when they die
+        self.all_bots = []
+        self.total_number_of_bots = 0
+        # the dead bot of each colour which finish would save so far, only its brain is kept of all the dead bots
+        self.best_dead_bots = {}
+
+        #rewards
+        self.rewards = reward.RewardField(world_width,world_height)
+        i = 0
+        while i < num_of_rewards:
+            reward.Reward(world_width,world_height,self.rewards)
+            i+=1
+
+        # the brains of all the alive bots, run together each step
+        self.brains = brain_batch.BrainBatch()
+
+        # the state of all the alive bots
+        self.alive_bots = population.Population()
+
+        # the alive bots which are eligable to breed
+        self.breeding_pool = breeding.BreedingPool()
+
+        # the grid used to find the bots near a point, a cell is as wide as two touching bots
+        self.spatial_hash = spatial.SpatialHash(bot.Radius*2)
+
+        # the tiles of the world, with the food, scent and bots on each (None unless enabled)
+        self.world = None
+        if enable_world:
+            self.world = environment.World(world_width, world_height)
+            self.world.update(0.0, self.rewards, self.alive_bots)
+
+    @property
+    def number_of_bots_alive(self):
+        return self.alive_bots.size
+
+    def setup(self):
+        """
+        Creates the starting bots from the starter brains and attributes
+        """
+        # genereate the initial group of bots
+        initialising_time = 0
+        initial_bots = []
+        i = 0
+        while i < self.initial_number_of_bots:
+            brainNum ="_yellow"
+            colour = 'yellow'
+            if i%2 == 0:
+                brainNum = "_blue"
+                colour = 'blue'
+
+            initial_bot = bot.Bot(initialising_time,"bot"+str(i),world_width=self.world_width,world_height=self.world_height,colour=colour,brain_file="brains/starter_brain"+brainNum+".txt")
+            initial_bot.loadAttributes("attributes/starter_attributes"+brainNum+".txt")
+            initial_bot.position[1] = self.world_height/2.0 + self.world_height*0.1*(streams.Placement.random()*2-1)
+            initial_bot.position[0] = self.world_width/2.0 + self.world_width*0.1*(streams.Placement.random()*2-1)
+            initial_bot.direction = 6.28 * streams.Placement.random()
+            initial_bots.append(initial_bot)
+            i+=1
+
+        self.initial_generation = initial_bots[0].generation
+
+        # randomises the weights in the bots brains slightly
+        # first 10 are left normal
+        first_weights = initial_bots[0].net.weight_matrix
+        jittered_weights = genetics.jitter(first_weights, max(len(initial_bots) - 9, 0), len(initial_bots)/(self.max_num_of_bots*2.0), initiation_max_change)
+        j=9
+        while j < len(initial_bots):
+            initial_bots[j].net.setWeights(jittered_weights[j-9], keep_totals=True)
+            j+=1
+
+        for initial_bot in initial_bots:
+            self.addBot(initial_bot)
+        self.total_number_of_bots = len(initial_bots)
+
+    def logEvents(self, file_name):
+        """
+        Starts recording the events of the simulation to an event log (see eventlog.py),
+        beginning with where the rewards are and the bots which are already alive
+        """
+        self.event_log = eventlog.EventLog(file_name, {"seed": self.seed,
+                                                       "world_width": self.world_width,
+                                                       "world_height": self.world_height,
+                                                       "enable_collisions": self.enable_collisions,
+                                                       "num_of_rewards": self.rewards.size})
+        row = 0
+        while row < self.rewards.size:
+            self.event_log.rewardMoved(self.simulation_time, row, self.rewards.x[row], self.rewards.y[row])
+            row += 1
+        for alive_bot in self.alive_bots:
+            self.event_log.birth(self.simulation_time, alive_bot)
+
+    def recordTelemetry(self, file_name, sample_interval=telemetry.Sample_interval):
+        """
+        Starts sampling the population every sample interval (simulated seconds) to a telemetry file (see telemetry.py)
+        """
+        self.telemetry = telemetry.Telemetry(file_name, sample_interval, start_time=self.simulation_time)
+
+    def addBot(self, new_bot, parent1=None, parent2=None):
+        """
+        Adds a bot to the alive bots and its brain to the brain batch
+        """
+        self.alive_bots.add(new_bot)
+        self.brains.add(new_bot.net)
+        if self.event_log != None:
+            self.event_log.birth(self.simulation_time, new_bot, parent1, parent2)
+        if self.telemetry != None:
+            self.telemetry.births += 1
+        self.botAdded(new_bot)
+
+    def removeBot(self, dead_bot):
+        """
+        Moves a bot from the alive bots to all_bots
+        """
+        self.all_bots.append(dead_bot)
+        if self.event_log != None:
+            self.event_log.death(self.simulation_time, dead_bot)
+        if self.telemetry != None:
+            self.telemetry.deaths += 1
+        self.brains.remove(dead_bot.net)
+        self.alive_bots.remove(dead_bot)
+        self.keepBestBrain(dead_bot)
+        self.botRemoved(dead_bot)
+
+    def keepBestBrain(self, dead_bot):
+        """
+        Drops the brain of a dead bot unless finish could still save it, the same way finish chooses the best bot of a colour
+        (at least one reward and at least as many as the best before it, born after the starter bots)
+        """
+        best_bot = self.best_dead_bots.get(dead_bot.colour)
+        least_rewards = 1 if best_bot == None else best_bot.total_rewards_collected
+        if dead_bot.total_rewards_collected >= least_rewards and dead_bot.generation > self.initial_generation:
+            if best_bot != None:
+                best_bot.dropBrain()
+            self.best_dead_bots[dead_bot.colour] = dead_bot
+        else:
+            dead_bot.dropBrain()
+
+    def botAdded(self, new_bot):
+        """
+        Called after a bot has been added, for a display to follow the bots
+        """
+        pass
+
+    def botRemoved(self, dead_bot):
+        """
+        Called after a bot has died, for a display to follow the bots
+        """
+        pass
+
+    def step(self, simulation_time):
+        """
+        Moves the simulation forward to the given simulated time
+        """
+        time_interval = simulation_time - self.simulation_time
+        self.simulation_time = simulation_time
+        self.number_of_steps += 1
+        alive_bots = self.alive_bots
+        rewards = self.rewards
+        profiler = self.profiler
+
+        # bots born during this step have not thought yet, they are added after these
+        number_of_bots_thinking = self.think(simulation_time)
+        profiler.count("brain_evaluations", number_of_bots_thinking)
+        lap_time = profiler.start()
+        self.spatial_hash.build(alive_bots)
+        lap_time = profiler.lap("grid", lap_time)
+
+        # each bot which thought this step attempts to eat the reward
+        self.feedBots(number_of_bots_thinking)
+        lap_time = profiler.lap("feeding", lap_time)
+
+        # only the bots which are eligable to breed are paired up
+        self.breeding_pool.update(alive_bots)
+        breed_attempts = 0
+        for bot1, bot2 in self.breeding_pool.pairs():
+            # see if there is room for new bots
+            if alive_bots.size >= self.max_num_of_bots:
+                break
+            breed_attempts += 1
+            child_bot = bot1.breed(bot2, "bot"+str(self.total_number_of_bots+1),simulation_time)
+
+            #check if breeding was successful
+            if child_bot != None:
+                self.total_number_of_bots += 1
+                self.addBot(child_bot, bot1, bot2)
+        profiler.count("breed_attempts", breed_attempts)
+        lap_time = profiler.lap("breeding", lap_time)
+
+        if self.enable_collisions:
+            # children have been added since the grid was built, the grid is kept up to date as bots are bumped
+            self.spatial_hash.build(alive_bots)
+            self.collideBots()
+            lap_time = profiler.lap("collisions", lap_time)
+
+        # every bot attempts to eat the reward
+        # without collisions the children are not in the grid, they are born next to their parents and cannot eat yet anyway
+        self.feedBots(alive_bots.size)
+        lap_time = profiler.lap("feeding", lap_time)
+
+        # cycles through each of the bots
+        dead_bots = []
+        i = 0
+        while i < alive_bots.size:
+            #bot dies
+            if alive_bots[i].energy_level <= 0:
+                dead_bots.append(alive_bots[i])
+            i+=1
+
+        # bots which died are removed once every bot has had its turn
+        # the last bot takes the place of each dead bot, so no bot is skipped and nothing is shifted
+        for dead_bot in dead_bots:
+            self.removeBot(dead_bot)
+        lap_time = profiler.lap("deaths", lap_time)
+
+        # the tiles pick up where the food and bots are now
+        if self.world != None:
+            self.world.update(time_interval, rewards, alive_bots)
+            lap_time = profiler.lap("world", lap_time)
+        if self.telemetry != None:
+            self.telemetry.tick(self)
+            profiler.lap("telemetry", lap_time)
+        profiler.tick()
+
+    def think(self, simulation_time):
+        """
+        Every bot looks, thinks and moves, each bot only works on its own row so the rows can be split up between processes (see strips.py).
+        Returns the number of bots which thought.
+        """
+        alive_bots = self.alive_bots
+        rewards = self.rewards
+        profiler = self.profiler
+        lap_time = profiler.start()
+
+        # every bot looks at the nearest reward it can see, then all of the brains are run at once
+        nearest_rewards = rewards.nearestVisible(alive_bots)
+        vision.see(alive_bots, reward.targetPositions(rewards.x, rewards.y, nearest_rewards), visible=nearest_rewards >= 0)
+        lap_time = profiler.lap("vision", lap_time)
+        thinking.updateClocks(alive_bots, simulation_time)
+        thinking.assignBrainInputs(alive_bots, self.brains)
+        self.brains.calculateOutputs()
+        thinking.readBrainOutputs(alive_bots, self.brains)
+        lap_time = profiler.lap("brains", lap_time)
+        # every bot moves and uses energy, then bots which reached the boundry are put back in the world (same as physics.integrate)
+        physics.move(alive_bots)
+        physics.calculateEnergy(alive_bots)
+        lap_time = profiler.lap("movement", lap_time)
+        physics.applyBoundaries(alive_bots, self.world_width, self.world_height, Boundry_damage)
+        profiler.lap("boundaries", lap_time)
+        return alive_bots.size
+
+    def collideBots(self):
+        """
+        Bumps apart every pair of overlapping bots.
+        Each bot is only checked against the bots in the grid cells around it, in the same order as checking every bot.
+        """
+        alive_bots = self.alive_bots
+        spatial_hash = self.spatial_hash
+        collision_checks = 0
+        i = 0
+        while i < alive_bots.size:
+            bot1 = alive_bots[i]
+            last_j = -1
+            bumped = True
+            while bumped:
+                bumped = False
+                bot1_position = list(bot1.position)
+                # the bots after the last one checked, which are near where the bot is now
+                near_rows = spatial_hash.candidates(bot1_position[0], bot1_position[1], bot.Radius*2)
+                for j in near_rows[near_rows > last_j].tolist():
+                    last_j = j
+                    #prevent from checking if coliding with itself
+                    if i != j:
+                        botCollisionCheck(bot1,alive_bots[j])
+                        collision_checks += 1
+                    # once the bot has been bumped, different bots may be near it
+                    if list(bot1.position) != bot1_position:
+                        spatial_hash.move(i, bot1.position[0], bot1.position[1])
+                        bumped = True
+                        break
+            i+=1
+        self.profiler.count("collision_checks", collision_checks)
+
+    def feedBots(self, number_of_bots):
+        """
+        The first number_of_bots bots attempt to eat, in order, each from the nearest reward within its reach.
+        Only the bots within reach of a reward can eat, the rest just use the energy from trying.
+        """
+        alive_bots = self.alive_bots
+        rewards = self.rewards
+        reach = bot.Radius + 1
+        tried = np.zeros(number_of_bots, dtype=bool)
+
+        # the rewards within reach of each bot which is yet to eat
+        within_reach = {}
+        last_row = -1
+        # only the rewards with bots in the cells around them need to be checked
+        rewards_to_check = np.nonzero(self.spatial_hash.anyNear(rewards.x[:rewards.size], rewards.y[:rewards.size], reach))[0].tolist()
+        while True:
+            # the bots after the last one which ate, which are within reach of where the rewards are now
+            for reward_row in rewards_to_check:
+                near_rows = self.spatial_hash.query(rewards.x[reward_row], rewards.y[reward_row], reach)
+                for row in near_rows[(near_rows > last_row) & (near_rows < number_of_bots)].tolist():
+                    within_reach.setdefault(row, []).append(reward_row)
+            if len(within_reach) == 0:
+                break
+
+            row = min(within_reach)
+            reward_rows = within_reach.pop(row)
+            last_row = row
+            hungry_bot = alive_bots[row]
+            # the closest of the rewards, they may have moved since they were checked
+            reward_row = min(reward_rows, key=lambda k: (math.sqrt((rewards.x[k]-hungry_bot.position[0])**2 + (rewards.y[k]-hungry_bot.position[1])**2), k))
+            reward_position = (rewards.x[reward_row], rewards.y[reward_row])
+
+            hungry_bot.eat(rewards[reward_row])
+            if hungry_bot.eat_success:
+                if self.event_log != None:
+                    self.event_log.meal(self.simulation_time, hungry_bot, reward_row)
+                if self.telemetry != None:
+                    self.telemetry.meals += 1
+            tried[row] = True
+
+            # once a reward has been finished off it is somewhere else, and may be in reach of other bots
+            rewards_to_check = []
+            if (rewards.x[reward_row], rewards.y[reward_row]) != reward_position:
+                rewards_to_check = [reward_row]
+                if self.event_log != None:
+                    self.event_log.rewardMoved(self.simulation_time, reward_row, rewards.x[reward_row], rewards.y[reward_row])
+
+        # the same energy eat() takes from a bot which is out of reach
+        alive_bots.energy_level[:number_of_bots][~tried] -= 0.001
+
+    def generationsBred(self):
+        """
+        How many generations have been bred since the start of the simulation
+        """
+        if self.alive_bots.size == 0:
+            return 0
+        return int(self.alive_bots.generation[:self.alive_bots.size].max()) - self.initial_generation
+
+    def isFinished(self, time_limit=None, generation_limit=None):
+        """
+        Checks the end of simulation conditions
+        """
+        if self.alive_bots.size <= 1:
+            return True
+        if time_limit != None and self.simulation_time >= time_limit:
+            return True
+        if generation_limit != None and self.generationsBred() >= generation_limit:
+            return True
+        return False
+
+    def run(self, time_limit=None, generation_limit=None, time_step=Time_step, checkpoint_file=None, checkpoint_interval=Checkpoint_interval):
+        """
+        Runs the simulation headless with a fixed time step, as fast as possible, until it is finished.
+        The steps are counted rather than added up so the simulated time does not drift,
+        which also lets a simulation loaded from a checkpoint carry on with exactly the same times.
+        With a checkpoint file, a checkpoint is saved to it every checkpoint interval (simulated seconds).
+        """
+        self.time_step = time_step
+        self.time_limit = time_limit
+        self.generation_limit = generation_limit
+        if checkpoint_file != None and self.next_checkpoint == None:
+            self.next_checkpoint = self.simulation_time + checkpoint_interval
+        while not self.isFinished(time_limit, generation_limit):
+            self.step((self.number_of_steps + 1)*time_step)
+            if checkpoint_file != None and self.simulation_time >= self.next_checkpoint:
+                self.next_checkpoint += checkpoint_interval
+                checkpoint.save(self, checkpoint_file)
+
+    def finish(self):
+        """
+        Ends the simulation, prints the results and saves the best yellow and blue bots as the new starter bots.
+        Returns the best yellow and blue bots (None if no bot passed the requirements for improvement).
+        """
+        simulation_time = self.simulation_time
+        all_bots = self.all_bots
+        initial_generation = self.initial_generation
+        if self.event_log != None:
+            self.event_log.close()
+        if self.telemetry != None:
+            self.telemetry.close()
+
+        #move rest of bots into the all bots list
+        num_of_dead_bots = len(all_bots)
+        for bots in self.alive_bots:
+            bots.time_since_birth = simulation_time - bots.birth_time
+            all_bots.append(bots)
+
+        # every bot which lived is saved with the run, to be looked at with SQL
+        run_id = results.saveRun(self.results_file, self, num_of_dead_bots)
+        print("saved as run "+str(run_id)+" in "+self.results_file)
+
+        print("all bots results:")
+        for thisBot in all_bots:
+            print(thisBot.name+ "  Rewards collected: "+ str(thisBot.total_rewards_collected) + " Gen: "+str(thisBot.generation))
+
+        #find the best bot (yellow)
+        i=0
+        max_carry_factor = 1
+        index_yellow = -1
+        while i < len(all_bots):
+            # the bot with the highest carry factor will go onto the next simulation
+            #carry_factor = all_bots[i].total_rewards_collected/(all_bots[i].time_since_birth*1.0)
+            carry_factor = all_bots[i].total_rewards_collected
+            if carry_factor >= max_carry_factor and all_bots[i].generation > initial_generation and all_bots[i].colour == "yellow":
+                max_carry_factor = carry_factor
+                index_yellow = i
+            i+=1
+
+        i=0
+        max_carry_factor = 1
+        index_blue = -1
+        while i < len(all_bots):
+            # the bot with the highest carry factor will go onto the next simulation
+            #carry_factor = all_bots[i].total_rewards_collected/(all_bots[i].time_since_birth*1.0)
+            carry_factor = all_bots[i].total_rewards_collected
+            if carry_factor >= max_carry_factor and all_bots[i].generation > initial_generation and all_bots[i].colour == "blue":
+                max_carry_factor = carry_factor
+                index_blue = i
+            i+=1
+
+        #record the results of the simulation
+        if index_yellow != -1:
+            record = open(os.path.join(self.output_dir, "record.txt"),"a")
+            record.write("the yellow bot which colllected the most rewards was "+all_bots[index_yellow].name + " RPM: "+str(all_bots[index_yellow].total_rewards_collected/(all_bots[index_yellow].time_since_birth/60.0))+" Gen: "+ str(all_bots[index_yellow].generation)+" with "+str(all_bots[index_yellow].total_rewards_collected)+" Max Speed: "+str(all_bots[index_yellow].max_speed)+"\n")
+            record.close()
+            #show results to the screen
+            print("the yellow bot which colllected the most rewards was "+all_bots[index_yellow].name + " RPM: "+str(all_bots[index_yellow].total_rewards_collected/(all_bots[index_yellow].time_since_birth/60.0))+" Gen: "+ str(all_bots[index_yellow].generation)+" with "+str(all_bots[index_yellow].total_rewards_collected))
+            all_bots[index_yellow].saveBrain(os.path.join(self.output_dir, 'brains/starter_brain_yellow.txt'))
+            all_bots[index_yellow].saveAttributes(os.path.join(self.output_dir, 'attributes/starter_attributes_yellow.txt'))
+        else:
+            print("no yellow bots passed the initial requirements for improvement")
+
+        if index_blue != -1:
+                print("the blue bot which colllected the most rewards was "+all_bots[index_blue].name + " RPM: "+str(all_bots[index_blue].total_rewards_collected/(all_bots[index_blue].time_since_birth/60.0))+" Gen: "+ str(all_bots[index_blue].generation)+" with "+str(all_bots[index_blue].total_rewards_collected))
+                all_bots[index_blue].saveBrain(os.path.join(self.output_dir, 'brains/starter_brain_blue.txt'))
+                all_bots[index_blue].saveAttributes(os.path.join(self.output_dir, 'attributes/starter_attributes_blue.txt'))
+
+        print("End of simulation, the total number of bots was " +str(self.total_number_of_bots))
+
+        best_yellow = all_bots[index_yellow] if index_yellow != -1 else None
+        best_blue = all_bots[index_blue] if index_blue != -1 else None
+        return best_yellow, best_blue
+
+def sameFile(file_name, other_file_name):
+    return os.path.abspath(file_name) == os.path.abspath(other_file_name)
+
+def resumeRecording(sim, event_log_file=None, telemetry_file=None, telemetry_interval=None):
+    """
+    Points a simulation loaded from a checkpoint at the event log and telemetry files given when resuming.
+    A file the checkpoint was already recording to is carried on with, any other file is started from the resumed state.
+    Without a file the checkpoint's own recording (if any) carries on.
+    """
+    if event_log_file != None and (sim.event_log == None or not sameFile(sim.event_log.file_name, event_log_file)):
+        if sim.event_log != None:
+            sim.event_log.close()
+        sim.logEvents(event_log_file)
+    if telemetry_file != None and (sim.telemetry == None or not sameFile(sim.telemetry.file_name, telemetry_file)):
+        if sim.telemetry != None:
+            sim.telemetry.close()
+        sim.recordTelemetry(telemetry_file, telemetry_interval or telemetry.Sample_interval)
+    elif telemetry_interval != None and sim.telemetry != None:
+        sim.telemetry.sample_interval = telemetry_interval
+
+def main():
+    """
+    Runs the simulations headless, each with a fixed time step, as fast as the computer allows.
+    """
+    parser = argparse.ArgumentParser(description="Runs the simulation without any windows")
+    parser.add_argument("--runs", type=int, default=5, help="number of simulations, each carries its best bots on to the next")
+    parser.add_argument("--time-limit", type=float, default=1200, help="simulated seconds per simulation")
+    parser.add_argument("--generation-limit", type=int, default=None, help="stop a simulation once this many generations have been bred")
+    parser.add_argument("--time-step", type=float, default=Time_step, help="simulated seconds per step")
+    parser.add_argument("--collisions", action="store_true", default=EnableCollisions, help="bump apart bots which overlap")
+    parser.add_argument("--rewards", type=int, default=Num_of_rewards, help="number of rewards in the world at once")
+    parser.add_argument("--world", action="store_true", default=EnableWorld, help="keep the food, scent and occupancy tiles of the world up to date")
+    parser.add_argument("--world-width", type=float, default=World_width, help="width of the world in units")
+    parser.add_argument("--world-height", type=float, default=World_height, help="height of the world in units")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the first simulation, each following simulation uses the next seed")
+    parser.add_argument("--checkpoint", default=None, help="file the simulation is saved to every checkpoint interval, so it can be resumed")
+    parser.add_argument("--checkpoint-interval", type=float, default=Checkpoint_interval, help="simulated seconds between checkpoints")
+    parser.add_argument("--resume", default=None, help="checkpoint file the first simulation carries on from, instead of starting a new one")
+    parser.add_argument("--event-log", default=None, help="file the births, deaths, meals and reward moves of the first simulation are recorded to")
+    parser.add_argument("--telemetry", default=None, help="file samples of the population are written to, one JSON object per line (every simulation adds to it)")
+    parser.add_argument("--telemetry-interval", type=float, default=None, help="simulated seconds between telemetry samples (default "+str(telemetry.Sample_interval)+")")
+    parser.add_argument("--profile", action="store_true", help="time each phase of the steps and print the rates every few seconds")
+    parser.add_argument("--profile-interval", type=float, default=profiling.Report_interval, help="real seconds between the profile reports")
+    parser.add_argument("--cprofile", default=None, metavar="FIRST:COUNT", help="run COUNT steps from step FIRST under cProfile and print the slowest functions")
+    parser.add_argument("--cprofile-file", default=None, help="file the cProfile stats are saved to")
+    args = parser.parse_args()
+
+    num_of_simulations = 0
+    while num_of_simulations < args.runs:
+        if num_of_simulations == 0 and args.resume != None:
+            sim = checkpoint.load(args.resume)
+            print("resumed at "+str(sim.simulation_time)+" simulated seconds")
+            resumeRecording(sim, args.event_log, args.telemetry, args.telemetry_interval)
+        else:
+            seed = None
+            if args.seed != None:
+                seed = args.seed + num_of_simulations
+            sim = Simulation(args.world_width, args.world_height, enable_collisions=args.collisions, num_of_rewards=args.rewards, seed=seed,
+                             enable_world=args.world)
+            print("seed "+str(sim.seed))
+            if num_of_simulations == 0 and args.event_log != None:
+                sim.logEvents(args.event_log)
+            sim.setup()
+            if args.telemetry != None:
+                sim.recordTelemetry(args.telemetry, args.telemetry_interval or telemetry.Sample_interval)
+        sim.profiler.enabled = args.profile
+        sim.profiler.report_interval = args.profile_interval
+        if args.cprofile != None:
+            first_step, num_of_steps = args.cprofile.split(":")
+            sim.profiler.profileTicks(int(first_step), int(num_of_steps), args.cprofile_file)
+        sim.run(args.time_limit, args.generation_limit, args.time_step, args.checkpoint, args.checkpoint_interval)
+        sim.finish()
+        num_of_simulations += 1
+
+if __name__ == "__main__":
+    # run from the imported module, so checkpoints refer to engine.Simulation and can be loaded from anywhere
+    import engine
+    engine.main()
@@ -1 +1,318 @@
-size = 1000
+import math
+import numpy as np
+
+Tile_size = 1.0 # units along each side of a tile
+Chunk_size = 32 # tiles along each side of a chunk
+Initial_capacity = 16 # number of chunks the world has room for before it needs to grow
+Chunk_idle_time = 10 # seconds a chunk with nothing on it is kept before it is freed
+Min_scent = 1e-6 # scent below this on every tile of a chunk counts as nothing
+Scent_per_slice = 1.0 # scent given off each second by each slice of reward on a tile
+Scent_decay_rate = 0.5 # fraction of the scent which fades each second
+Scent_diffusion_rate = 0.4 # fraction of a tile's scent which spreads to the tiles beside it each second
+
+# the type held by each layer
+Layers = {"food": np.int64, "scent": float, "occupancy": np.int64}
+Key_shift = 2**32 # a chunk's key is its x times this plus its y
+
+class Chunk:
+    """
+    A square block of tiles. Its part of each layer is its slot of the world's layer arrays,
+    indexed by [tile along x, tile along y] within the chunk.
+    """
+    def __init__(self, world, chunk_x, chunk_y, slot):
+        self.world = world
+        self.chunk_x = chunk_x
+        self.chunk_y = chunk_y
+        self.slot = slot
+
+    @property
+    def food(self):
+        return self.world.food[self.slot]
+
+    @property
+    def scent(self):
+        return self.world.scent[self.slot]
+
+    @property
+    def occupancy(self):
+        return self.world.occupancy[self.slot]
+
+    @property
+    def idle_time(self):
+        # how long the chunk has had nothing on it
+        return float(self.world.idle_time[self.slot])
+
+class World:
+    """
+    The world the bots live in, split into square tiles.
+    Information is held by the tiles in layers (food, scent and occupancy), so a bot picks up what is on its tile by indexing with its position.
+    The tiles are grouped into chunks which are only created where there are bots or food and are freed once they have been empty for a while,
+    so a large world with few bots only uses memory where they are. A tile in a chunk which does not exist holds nothing.
+    The chunks are stacked in the layer arrays (one slot per chunk) so each layer is updated for every chunk at once.
+    """
+    def __init__(self, world_width, world_height, tile_size=Tile_size, chunk_size=Chunk_size):
+        self.world_width = world_width
+        self.world_height = world_height
+        self.tile_size = tile_size
+        self.chunk_size = chunk_size
+        self.num_of_columns = max(math.ceil(world_width/tile_size), 1)
+        self.num_of_rows = max(math.ceil(world_height/tile_size), 1)
+
+        self.size = 0
+        # the chunk in each slot, and the chunks which exist by key
+        self.chunk_list = []
+        self.chunks = {}
+        self._allocate(Initial_capacity)
+        # the slots beside each chunk, worked out again when chunks are created or freed
+        self.neighbours = None
+
+    def _allocate(self, capacity):
+        """
+        Creates (or grows) the layer arrays so there is room for the given number of chunks, the chunks already held are copied across
+        """
+        for layer, layer_type in Layers.items():
+            values = np.zeros((capacity, self.chunk_size, self.chunk_size), dtype=layer_type)
+            if self.size > 0:
+                values[:self.size] = getattr(self, layer)[:self.size]
+            setattr(self, layer, values)
+        idle_time = np.zeros(capacity)
+        if self.size > 0:
+            idle_time[:self.size] = self.idle_time[:self.size]
+        self.idle_time = idle_time
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.size
+
+    def tileOf(self, x_positions, y_positions):
+        """
+        The tile each position is on, positions beyond the edge of the world are on the edge tiles.
+        Works on single positions and arrays of positions.
+        """
+        tile_x = np.clip(np.floor(np.asarray(x_positions) / self.tile_size).astype(np.int64), 0, self.num_of_columns-1)
+        tile_y = np.clip(np.floor(np.asarray(y_positions) / self.tile_size).astype(np.int64), 0, self.num_of_rows-1)
+        return tile_x, tile_y
+
+    def chunkAt(self, chunk_x, chunk_y):
+        """
+        Returns the chunk, creating it if it does not exist yet
+        """
+        key = chunk_x*Key_shift + chunk_y
+        chunk = self.chunks.get(key)
+        if chunk == None:
+            if self.size == self.capacity:
+                self._allocate(self.capacity * 2)
+            chunk = Chunk(self, chunk_x, chunk_y, self.size)
+            self.chunks[key] = chunk
+            self.chunk_list.append(chunk)
+            self.size += 1
+            self.neighbours = None
+        return chunk
+
+    def freeChunk(self, chunk):
+        """
+        Frees a chunk. The last chunk is moved into the empty slot so no other slots need to shift.
+        """
+        slot = chunk.slot
+        last = self.size - 1
+        if slot != last:
+            moved = self.chunk_list[last]
+            for layer in Layers:
+                getattr(self, layer)[slot] = getattr(self, layer)[last]
+            self.idle_time[slot] = self.idle_time[last]
+            self.chunk_list[slot] = moved
+            moved.slot = slot
+        # the free slot is left empty for the next chunk
+        for layer in Layers:
+            getattr(self, layer)[last] = 0
+        self.idle_time[last] = 0
+        self.chunk_list.pop()
+        del self.chunks[chunk.chunk_x*Key_shift + chunk.chunk_y]
+        self.size -= 1
+        self.neighbours = None
+
+    def _tiles(self, x_positions, y_positions, create=False):
+        """
+        Returns the slot of the chunk each position is in (-1 if the chunk does not exist) and the tile of each position within its chunk.
+        With create, the chunks which do not exist are created.
+        """
+        tile_x, tile_y = self.tileOf(np.atleast_1d(x_positions), np.atleast_1d(y_positions))
+        chunk_x = tile_x // self.chunk_size
+        chunk_y = tile_y // self.chunk_size
+        unique_keys, first, inverse = np.unique(chunk_x*Key_shift + chunk_y, return_index=True, return_inverse=True)
+
+        slots = np.full(len(unique_keys), -1, dtype=np.intp)
+        i = 0
+        for key in unique_keys.tolist():
+            chunk = self.chunks.get(key)
+            if chunk == None and create:
+                chunk = self.chunkAt(int(chunk_x[first[i]]), int(chunk_y[first[i]]))
+            if chunk != None:
+                slots[i] = chunk.slot
+            i+=1
+        return slots[inverse.reshape(-1)], tile_x % self.chunk_size, tile_y % self.chunk_size
+
+    def read(self, layer, x_positions, y_positions):
+        """
+        Returns what the layer (one of Layers, by name) holds on the tile at each position
+        """
+        slots, local_x, local_y = self._tiles(x_positions, y_positions)
+        exists = slots >= 0
+        values = np.zeros(len(slots), dtype=Layers[layer])
+        values[exists] = getattr(self, layer)[slots[exists], local_x[exists], local_y[exists]]
+        if np.ndim(x_positions) == 0:
+            return values[0]
+        return values
+
+    def readPopulation(self, layer, population):
+        """
+        Returns what the layer holds on the tile each bot of the population is on
+        """
+        return self.read(layer, population.x[:population.size], population.y[:population.size])
+
+    def _place(self, layer, x_positions, y_positions, weights=None):
+        """
+        Fills the layer with the number of positions (or the total of their weights) on each tile,
+        creating the chunks they are in
+        """
+        slots, local_x, local_y = self._tiles(x_positions, y_positions, create=True)
+        tiles_per_chunk = self.chunk_size**2
+        tiles = slots*tiles_per_chunk + local_x*self.chunk_size + local_y
+        totals = np.bincount(tiles, weights, minlength=self.size*tiles_per_chunk)
+        getattr(self, layer)[:self.size] = totals.reshape(self.size, self.chunk_size, self.chunk_size)
+
+    def placeFood(self, rewards):
+        """
+        Fills the food layer from the slices left on each reward of a reward.RewardField
+        """
+        self._place("food", rewards.x[:rewards.size], rewards.y[:rewards.size], rewards.slices[:rewards.size])
+
+    def placeBots(self, population):
+        """
+        Fills the occupancy layer from the positions of the bots in the population
+        """
+        self._place("occupancy", population.x[:population.size], population.y[:population.size])
+
+    def _findNeighbours(self):
+        """
+        Works out the slot of the chunk on each side of every chunk (-1 if there is none),
+        and where the far edges of the world cut through the chunks
+        """
+        neighbours = {}
+        for side, offset in (("left", -Key_shift), ("right", Key_shift), ("below", -1), ("above", 1)):
+            slots = np.full(self.size, -1, dtype=np.intp)
+            for chunk in self.chunk_list:
+                other = self.chunks.get(chunk.chunk_x*Key_shift + chunk.chunk_y + offset)
+                if other != None:
+                    slots[chunk.slot] = other.slot
+            neighbours[side] = slots
+
+        # the last tile of each chunk which is inside the world
+        chunk_x = np.array([chunk.chunk_x for chunk in self.chunk_list], dtype=np.int64)
+        chunk_y = np.array([chunk.chunk_y for chunk in self.chunk_list], dtype=np.int64)
+        neighbours["last_x"] = np.minimum(self.num_of_columns - 1 - chunk_x*self.chunk_size, self.chunk_size - 1)
+        neighbours["last_y"] = np.minimum(self.num_of_rows - 1 - chunk_y*self.chunk_size, self.chunk_size - 1)
+        self.neighbours = neighbours
+
+    def _extend(self, layer):
+        """
+        Creates the chunks beside the edges of chunks which the layer has reached (Min_scent or more on an edge tile),
+        so it can spread on across the world as it would if every tile existed
+        """
+        if self.neighbours == None:
+            self._findNeighbours()
+        values = getattr(self, layer)[:self.size]
+        num_of_chunks_x = math.ceil(self.num_of_columns/self.chunk_size)
+        num_of_chunks_y = math.ceil(self.num_of_rows/self.chunk_size)
+        beside = []
+        for side, edge, offset_x, offset_y in (("left", values[:, 0, :], -1, 0), ("right", values[:, -1, :], 1, 0),
+                                               ("below", values[:, :, 0], 0, -1), ("above", values[:, :, -1], 0, 1)):
+            reached = np.nonzero((self.neighbours[side] < 0) & (np.abs(edge) >= Min_scent).any(axis=1))[0]
+            for slot in reached.tolist():
+                chunk_x = self.chunk_list[slot].chunk_x + offset_x
+                chunk_y = self.chunk_list[slot].chunk_y + offset_y
+                # there are no chunks beyond the edges of the world
+                if 0 <= chunk_x < num_of_chunks_x and 0 <= chunk_y < num_of_chunks_y:
+                    beside.append((chunk_x, chunk_y))
+        for chunk_x, chunk_y in beside:
+            self.chunkAt(chunk_x, chunk_y)
+        if self.neighbours == None:
+            self._findNeighbours()
+
+    def diffuse(self, layer, time_interval, rate):
+        """
+        Spreads part of the layer on each tile evenly to the four tiles beside it.
+        Chunks are created where the layer reaches the edge of a chunk with none beside it (see _extend), so it spreads the same as without chunks.
+        What would spread beyond the edge of the world, or into a missing chunk (less than Min_scent on the edge tile), stays on its tile so nothing is lost.
+        """
+        if self.size == 0:
+            return
+        self._extend(layer)
+        neighbours = self.neighbours
+
+        values = getattr(self, layer)[:self.size]
+        spreading = values * min(rate*time_interval, 1.0)
+        share = spreading / 4.0
+        values -= spreading
+
+        # within each chunk
+        values[:, 1:, :] += share[:, :-1, :]
+        values[:, :-1, :] += share[:, 1:, :]
+        values[:, :, 1:] += share[:, :, :-1]
+        values[:, :, :-1] += share[:, :, 1:]
+
+        # across the edges to the chunks beside, or back onto the edge tiles where there is no chunk
+        # each chunk is beside at most one other on each side, so no slot is added to twice
+        for side, share_edge, other_edge in (("left", (slice(None), 0, slice(None)), (slice(None), -1, slice(None))),
+                                             ("right", (slice(None), -1, slice(None)), (slice(None), 0, slice(None))),
+                                             ("below", (slice(None), slice(None), 0), (slice(None), slice(None), -1)),
+                                             ("above", (slice(None), slice(None), -1), (slice(None), slice(None), 0))):
+            slots = neighbours[side]
+            has_neighbour = slots >= 0
+            edge_share = share[share_edge]
+            values[other_edge][slots[has_neighbour]] += edge_share[has_neighbour]
+            kept = values[share_edge]
+            kept[~has_neighbour] += edge_share[~has_neighbour]
+
+        # the far edges of the world cut through some chunks, what spread past them goes back
+        cut = np.nonzero(neighbours["last_x"] < self.chunk_size - 1)[0]
+        for slot, last_x in zip(cut.tolist(), neighbours["last_x"][cut].tolist()):
+            values[slot, last_x, :] += share[slot, last_x, :]
+            values[slot, last_x+1, :] -= share[slot, last_x, :]
+        cut = np.nonzero(neighbours["last_y"] < self.chunk_size - 1)[0]
+        for slot, last_y in zip(cut.tolist(), neighbours["last_y"][cut].tolist()):
+            values[slot, :, last_y] += share[slot, :, last_y]
+            values[slot, :, last_y+1] -= share[slot, :, last_y]
+
+    def decay(self, layer, time_interval, rate):
+        """
+        Fades the layer on every tile by the fraction each second
+        """
+        getattr(self, layer)[:self.size] *= (1.0 - rate)**time_interval
+
+    def freeIdleChunks(self, time_interval):
+        """
+        Frees the chunks which have had nothing on them for Chunk_idle_time
+        """
+        n = self.size
+        empty = ~(self.food[:n].any(axis=(1, 2)) | self.occupancy[:n].any(axis=(1, 2)) | (self.scent[:n] >= Min_scent).any(axis=(1, 2)))
+        self.idle_time[:n] = np.where(empty, self.idle_time[:n] + time_interval, 0.0)
+
+        # freed from the last slot back, so the slots still to be freed are not moved
+        idle_slots = np.nonzero(self.idle_time[:n] >= Chunk_idle_time)[0]
+        for slot in idle_slots[::-1].tolist():
+            self.freeChunk(self.chunk_list[slot])
+
+    def update(self, time_interval, rewards, population):
+        """
+        Moves every layer forward by the time interval, from the rewards (a reward.RewardField) and the bots
+        """
+        self.placeFood(rewards)
+        self.placeBots(population)
+
+        # the food gives off scent, which spreads and then fades
+        self.scent[:self.size] += self.food[:self.size] * (Scent_per_slice*time_interval)
+        self.diffuse("scent", time_interval, Scent_diffusion_rate)
+        self.decay("scent", time_interval, Scent_decay_rate)
+
+        self.freeIdleChunks(time_interval)
@@ -0,0 +1,163 @@
+import json
+import os
+import struct
+import argparse
+
+Magic = b"BOTSEVNT" # the start of every event log
+Version = 1
+Header = struct.Struct("<8sII") # magic, version, length of the run description which follows
+Buffer_size = 1 << 16 # bytes of events held before they are written
+
+# every event starts with its kind and the simulated time, followed by the fields of that kind
+Event_start = struct.Struct("<Bd")
+Birth, Death, Meal, Reward_moved = 1, 2, 3, 4
+Event_fields = {Birth: struct.Struct("<IIIBIddB"), # bot, parent 1, parent 2, colour, generation, x, y, length of the name (the name follows)
+                Death: struct.Struct("<Idd"), # bot, x, y
+                Meal: struct.Struct("<II"), # bot, reward
+                Reward_moved: struct.Struct("<Idd")} # reward, x, y
+Event_names = {Birth: "birth", Death: "death", Meal: "meal", Reward_moved: "reward_moved"}
+No_parent = 0xFFFFFFFF
+Colours = ("yellow", "blue")
+
+class EventLog:
+    """
+    An append-only binary log of what happened in a run (births with their parents, deaths, meals and rewards moving),
+    enough to follow or check a run without simulating it again.
+    Bots are given numbers in the order they are born, the name of each bot is only written with its birth.
+    """
+    def __init__(self, file_name, description):
+        self.file_name = file_name
+        # the number of each bot which has been born, by the bot
+        self.bot_numbers = {}
+        self.buffer = bytearray()
+        text = json.dumps(description).encode()
+        self.header = Header.pack(Magic, Version, len(text)) + text
+        self.log_file = open(file_name, "wb")
+        self.log_file.write(self.header)
+
+    def __getstate__(self):
+        """
+        What is saved of the log in a checkpoint (see checkpoint.py), everything logged so far is written first
+        """
+        self.flush()
+        state = dict(self.__dict__)
+        del state["log_file"]
+        state["length"] = self.log_file.tell()
+        return state
+
+    def __setstate__(self, state):
+        # events logged after the checkpoint are dropped, the resumed run logs them again
+        length = state.pop("length")
+        self.__dict__.update(state)
+        if not os.path.exists(self.file_name):
+            # the log is started again, without the events before the checkpoint
+            print("event log "+self.file_name+" is missing, it is started again from the checkpoint")
+            self.log_file = open(self.file_name, "wb")
+            self.log_file.write(self.header)
+            return
+        self.log_file = open(self.file_name, "r+b")
+        self.log_file.truncate(length)
+        self.log_file.seek(length)
+
+    def _add(self, kind, time, *fields):
+        self.buffer += Event_start.pack(kind, time)
+        self.buffer += Event_fields[kind].pack(*fields)
+        if len(self.buffer) >= Buffer_size:
+            self.flush()
+
+    def botNumber(self, logged_bot):
+        if logged_bot == None:
+            return No_parent
+        return self.bot_numbers[logged_bot]
+
+    def birth(self, time, new_bot, parent1=None, parent2=None):
+        number = len(self.bot_numbers)
+        self.bot_numbers[new_bot] = number
+        name = new_bot.name.encode()[:255]
+        self._add(Birth, time, number, self.botNumber(parent1), self.botNumber(parent2), Colours.index(new_bot.colour),
+                  new_bot.generation, new_bot.position[0], new_bot.position[1], len(name))
+        self.buffer += name
+
+    def death(self, time, dead_bot):
+        self._add(Death, time, self.botNumber(dead_bot), dead_bot.position[0], dead_bot.position[1])
+
+    def meal(self, time, hungry_bot, reward_row):
+        self._add(Meal, time, self.botNumber(hungry_bot), reward_row)
+
+    def rewardMoved(self, time, reward_row, x_pos, y_pos):
+        self._add(Reward_moved, time, reward_row, x_pos, y_pos)
+
+    def flush(self):
+        """
+        Writes the events held so far to the file
+        """
+        self.log_file.write(self.buffer)
+        self.log_file.flush()
+        self.buffer = bytearray()
+
+    def close(self):
+        self.flush()
+        self.log_file.close()
+
+def readEvents(file_name):
+    """
+    Reads an event log, returns the description of the run and a list of its events.
+    Each event is a dict with its kind, time and fields, bots are referred to by their numbers (the order they were born in).
+    """
+    with open(file_name, "rb") as log_file:
+        data = log_file.read()
+    magic, version, description_length = Header.unpack_from(data, 0)
+    if magic != Magic:
+        raise ValueError(file_name+" is not an event log")
+    if version != Version:
+        raise ValueError(file_name+" is a version "+str(version)+" event log, only version "+str(Version)+" can be read")
+    offset = Header.size
+    description = json.loads(data[offset:offset+description_length])
+    offset += description_length
+
+    events = []
+    while offset < len(data):
+        kind, time = Event_start.unpack_from(data, offset)
+        offset += Event_start.size
+        fields = Event_fields[kind].unpack_from(data, offset)
+        offset += Event_fields[kind].size
+        if kind == Birth:
+            bot_number, parent1, parent2, colour, generation, x_pos, y_pos, name_length = fields
+            events.append({"kind": "birth", "time": time, "bot": bot_number, "name": data[offset:offset+name_length].decode(),
+                           "parents": [parent for parent in (parent1, parent2) if parent != No_parent],
+                           "colour": Colours[colour], "generation": generation, "x": x_pos, "y": y_pos})
+            offset += name_length
+        elif kind == Death:
+            events.append({"kind": "death", "time": time, "bot": fields[0], "x": fields[1], "y": fields[2]})
+        elif kind == Meal:
+            events.append({"kind": "meal", "time": time, "bot": fields[0], "reward": fields[1]})
+        else:
+            events.append({"kind": "reward_moved", "time": time, "reward": fields[0], "x": fields[1], "y": fields[2]})
+    return description, events
+
+def main():
+    """
+    Prints a summary of an event log, or every event in it
+    """
+    parser = argparse.ArgumentParser(description="Reads the event log of a run")
+    parser.add_argument("file", help="the event log")
+    parser.add_argument("--events", action="store_true", help="print every event, one JSON object per line")
+    args = parser.parse_args()
+
+    description, events = readEvents(args.file)
+    if args.events:
+        for event in events:
+            print(json.dumps(event))
+        return
+
+    print("run: "+json.dumps(description))
+    counts = {}
+    for event in events:
+        counts[event["kind"]] = counts.get(event["kind"], 0) + 1
+    for kind in Event_names.values():
+        print(kind+": "+str(counts.get(kind, 0)))
+    if len(events) > 0:
+        print("last event at "+str(events[-1]["time"])+" simulated seconds")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import numpy as np
+import streams
+
+# the random numbers used for breeding and mutating weights
+Rng = streams.Genetics
+
+def crossover(dom_weights, rec_weights, chance_of_mutation, norm_max_change, mutation_max_change, rng=None):
+    """
+    Breeds the weights of the dominant parent with the recessive parent (same as the weight loop Bot.breed used to have).
+    Each weight is pulled from the dominant weight towards the recessive one by norm_max_change,
+    or, by chance, towards a random weight by mutation_max_change.
+    Works on the weights of a single pair or on the stacked weights of many pairs, all of the weights are done at once.
+    """
+    if rng == None:
+        rng = Rng
+
+    # one draw for which weights mutate and one for the random weights they mutate towards
+    mutated = rng.random(dom_weights.shape) < chance_of_mutation
+    random_weights = rng.random(dom_weights.shape)*2 - 1
+
+    # divided by two because the maximum potential difference is 2 (-1 to 1)
+    difference_factor = np.where(mutated, dom_weights - random_weights, dom_weights - rec_weights) / 2.0
+    max_change = np.where(mutated, mutation_max_change, norm_max_change)
+    return dom_weights - max_change*difference_factor
+
+def jitter(weights, count, chance_of_mutation, max_changes, rng=None):
+    """
+    Returns count copies of the weights, each pulled towards random weights (same as the loop the simulator seeded bots with).
+    Weights are pulled by max_changes[0], or, by chance, by max_changes[1].
+    """
+    if rng == None:
+        rng = Rng
+
+    shape = (count,) + weights.shape
+    difference = weights - (rng.random(shape)*2 - 1)
+    mutated = rng.random(shape) < chance_of_mutation
+    return weights - np.where(mutated, max_changes[1], max_changes[0])*difference
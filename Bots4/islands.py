@@ -0,0 +1,262 @@
+import os
+import queue
+import random
+import argparse
+import contextlib
+import multiprocessing
+import bot
+import engine
+import runner
+import streams
+import results
+
+Default_output_dir = "islands" # each island gets a folder of its own in here
+Default_migration_interval = 60 # simulated seconds between migrations
+Default_num_of_migrants = 2 # bots of each colour sent to each neighbouring island
+Topologies = ("ring", "full")
+Poll_interval = 1.0 # real seconds between checks that the other processes are still running while waiting on a queue
+
+def islandOutputDir(output_dir, island):
+    """
+    The folder an island writes its record, log and new starter brains and attributes to
+    """
+    return os.path.join(output_dir, "island_"+str(island))
+
+def destinations(island, num_of_islands, topology):
+    """
+    The islands which an island sends its migrants to.
+    In a ring each island sends to the next one, fully connected every island sends to every other island.
+    """
+    if num_of_islands <= 1:
+        return []
+    if topology == "ring":
+        return [(island + 1) % num_of_islands]
+    return [other for other in range(num_of_islands) if other != island]
+
+def genome(chosen_bot, island):
+    """
+    Everything of a bot which is passed on to another island, as plain data so it can be sent between processes
+    """
+    return {"name": chosen_bot.name,
+            "island": island,
+            "colour": chosen_bot.colour,
+            "weights": chosen_bot.net.weight_matrix.copy(),
+            "max_speed": chosen_bot.max_speed,
+            "max_turn_speed": chosen_bot.max_turn_speed,
+            "generation": chosen_bot.generation,
+            "family_history": chosen_bot.family_history}
+
+def topBots(alive_bots, colour, count):
+    """
+    The bots of the colour which have collected the most rewards (then have the most breeding points), best first
+    """
+    bots_of_colour = [bots for bots in alive_bots if bots.colour == colour]
+    bots_of_colour.sort(key=lambda bots: (bots.total_rewards_collected, bots.breeding_points), reverse=True)
+    return bots_of_colour[:count]
+
+def worstBot(alive_bots, colour):
+    """
+    The bot of the colour (or of any colour if there are none) which has collected the fewest rewards (then has the fewest breeding points)
+    """
+    bots_of_colour = [bots for bots in alive_bots if bots.colour == colour]
+    if len(bots_of_colour) == 0:
+        bots_of_colour = list(alive_bots)
+    return min(bots_of_colour, key=lambda bots: (bots.total_rewards_collected, bots.breeding_points))
+
+def botFromGenome(migrant, sim):
+    """
+    Creates a bot on this island from a genome sent by another island.
+    The brain is built the same way as a child's, from the child brain file with the migrant's weights.
+    """
+    new_bot = bot.Bot(sim.simulation_time, "bot"+str(sim.total_number_of_bots+1), world_width=sim.world_width, world_height=sim.world_height,
+                      colour=migrant["colour"], brain_file=bot.Child_brain_file)
+    new_bot.net.setWeights(migrant["weights"], keep_totals=True)
+    new_bot.max_speed = migrant["max_speed"]
+    new_bot.max_turn_speed = migrant["max_turn_speed"]
+    new_bot.generation = migrant["generation"]
+    family_history = migrant["family_history"]
+    if family_history == "None":
+        family_history = ""
+    new_bot.family_history = family_history + "island"+str(migrant["island"])+":"+migrant["name"]+"~"+str(migrant["generation"])+"|"
+
+    # the migrant arrives somewhere in the world
+    new_bot.position[0] = streams.Migration.random()*sim.world_width
+    new_bot.position[1] = streams.Migration.random()*sim.world_height
+    new_bot.direction = 6.28 * streams.Migration.random()
+    return new_bot
+
+def checkCoordinator(island):
+    """
+    Stops the island if the coordinator has gone, nothing would collect its summary.
+    If another island fails the coordinator stops this one, so only the coordinator itself needs checking.
+    """
+    if not multiprocessing.parent_process().is_alive():
+        raise RuntimeError("island "+str(island)+" lost its coordinator")
+
+def migrate(sim, island, settings, inboxes, epoch, pending):
+    """
+    Sends this island's best bots to its destinations, then waits for the bots sent to it this epoch and adds them.
+    Every island migrates at the same simulated times, so the islands stay in step with each other.
+    Migrants are added in order of the island they came from, so a run can be repeated with the same seeds.
+    If there is no room for a migrant it replaces the worst bot of its colour.
+    """
+    checkCoordinator(island)
+    num_of_islands = settings["num_of_islands"]
+    migrants = []
+    for colour in ("yellow", "blue"):
+        for best_bot in topBots(sim.alive_bots, colour, settings["num_of_migrants"]):
+            migrants.append(genome(best_bot, island))
+    for destination in destinations(island, num_of_islands, settings["topology"]):
+        inboxes[destination].put((epoch, island, migrants))
+
+    # the islands which send to this one, a faster island may already have sent its next epoch
+    expected = len([source for source in range(num_of_islands) if island in destinations(source, num_of_islands, settings["topology"])])
+    arrived = [message for message in pending if message[0] == epoch]
+    pending[:] = [message for message in pending if message[0] != epoch]
+    while len(arrived) < expected:
+        try:
+            message = inboxes[island].get(timeout=Poll_interval)
+        except queue.Empty:
+            checkCoordinator(island)
+            continue
+        if message[0] == epoch:
+            arrived.append(message)
+        else:
+            pending.append(message)
+
+    arrived.sort(key=lambda message: message[1])
+    for message in arrived:
+        for migrant in message[2]:
+            if sim.alive_bots.size >= sim.max_num_of_bots:
+                sim.removeBot(worstBot(sim.alive_bots, migrant["colour"]))
+            sim.total_number_of_bots += 1
+            sim.addBot(botFromGenome(migrant, sim))
+
+    print("island "+str(island)+" epoch "+str(epoch)+": sent "+str(len(migrants))+" bots, received "+str(sum(len(message[2]) for message in arrived)))
+
+def runIsland(island, settings, inboxes, summaries):
+    """
+    Evolves one island in its own process, migrating every migration interval, and puts a summary of it on the summaries queue.
+    An island whose bots have all died keeps taking part in the migrations, so migrants can start it again.
+    Everything it prints goes to log.txt in its folder.
+    """
+    run_dir = islandOutputDir(settings["output_dir"], island)
+    os.makedirs(os.path.join(run_dir, "brains"), exist_ok=True)
+    os.makedirs(os.path.join(run_dir, "attributes"), exist_ok=True)
+    seed = settings["seed"] + island
+
+    with open(os.path.join(run_dir, "log.txt"), "w") as log, contextlib.redirect_stdout(log):
+        sim = engine.Simulation(settings["world_width"], settings["world_height"], enable_collisions=settings["collisions"],
+                                num_of_rewards=settings["rewards"], seed=seed, output_dir=run_dir,
+                                results_file=os.path.join(settings["output_dir"], results.Default_results_file))
+        sim.setup()
+
+        time_step = settings["time_step"]
+        steps_per_migration = max(round(settings["migration_interval"]/time_step), 1)
+        step_number = 0
+        epoch = 0
+        pending = []
+        while sim.simulation_time < settings["time_limit"]:
+            step_number += 1
+            if sim.alive_bots.size > 0:
+                sim.step(step_number*time_step)
+            else:
+                # nothing is left to simulate until migrants arrive
+                sim.simulation_time = step_number*time_step
+            if step_number % steps_per_migration == 0:
+                migrate(sim, island, settings, inboxes, epoch, pending)
+                epoch += 1
+
+        best_yellow, best_blue = sim.finish()
+
+    summaries.put({"run_number": island,
+                   "seed": seed,
+                   "output_dir": run_dir,
+                   "simulation_time": sim.simulation_time,
+                   "number_of_steps": sim.number_of_steps,
+                   "total_number_of_bots": sim.total_number_of_bots,
+                   "generations_bred": sim.generationsBred(),
+                   "yellow": runner.botSummary(best_yellow),
+                   "blue": runner.botSummary(best_blue)})
+
+def runIslands(settings):
+    """
+    Runs every island in a process of its own and returns their summaries in island order.
+    If an island fails the others are stopped (they would wait for its migrants forever) and a RuntimeError is raised.
+    """
+    num_of_islands = settings["num_of_islands"]
+    inboxes = [multiprocessing.Queue() for island in range(num_of_islands)]
+    summaries = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=runIsland, args=(island, settings, inboxes, summaries)) for island in range(num_of_islands)]
+    for process in processes:
+        process.start()
+    # the summaries are taken before joining, a process does not end until what it put on a queue has been taken
+    island_summaries = []
+    while len(island_summaries) < num_of_islands:
+        try:
+            island_summaries.append(summaries.get(timeout=Poll_interval))
+        except queue.Empty:
+            failed = [island for island in range(num_of_islands) if processes[island].exitcode not in (None, 0)]
+            if len(failed) > 0:
+                for process in processes:
+                    if process.is_alive():
+                        process.terminate()
+                    process.join()
+                raise RuntimeError("island "+str(failed[0])+" failed with exit code "+str(processes[failed[0]].exitcode)
+                                   +", see "+os.path.join(islandOutputDir(settings["output_dir"], failed[0]), "log.txt")+" and the output above")
+    for process in processes:
+        process.join()
+    island_summaries.sort(key=lambda summary: summary["run_number"])
+    return island_summaries
+
+def main():
+    """
+    Evolves several islands at the same time, one process per island, which swap their best bots every migration interval.
+    Every island starts from the same starter bots and gets its own seed and folder, afterwards the results are merged as in runner.py.
+    """
+    parser = argparse.ArgumentParser(description="Evolves islands of bots in parallel which regularly swap their best bots")
+    parser.add_argument("--islands", type=int, default=os.cpu_count(), help="number of islands, each runs in its own process")
+    parser.add_argument("--topology", choices=Topologies, default="ring", help="which islands send their migrants to which")
+    parser.add_argument("--migration-interval", type=float, default=Default_migration_interval, help="simulated seconds between migrations")
+    parser.add_argument("--migrants", type=int, default=Default_num_of_migrants, help="bots of each colour sent to each neighbouring island")
+    parser.add_argument("--time-limit", type=float, default=1200, help="simulated seconds the islands evolve for")
+    parser.add_argument("--time-step", type=float, default=engine.Time_step, help="simulated seconds per step")
+    parser.add_argument("--collisions", action="store_true", default=engine.EnableCollisions, help="bump apart bots which overlap")
+    parser.add_argument("--rewards", type=int, default=engine.Num_of_rewards, help="number of rewards in each island at once")
+    parser.add_argument("--world-width", type=float, default=engine.World_width, help="width of each island in units")
+    parser.add_argument("--world-height", type=float, default=engine.World_height, help="height of each island in units")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the first island, each following island uses the next seed")
+    parser.add_argument("--output-dir", default=Default_output_dir, help="folder the islands are written to")
+    parser.add_argument("--no-merge", action="store_true", help="leave the starter bots as they are")
+    args = parser.parse_args()
+
+    # the seeds are always chosen up front so that the whole run can be repeated
+    seed = args.seed
+    if seed == None:
+        seed = random.randrange(2**31)
+
+    settings = {"num_of_islands": args.islands,
+                "topology": args.topology,
+                "migration_interval": args.migration_interval,
+                "num_of_migrants": args.migrants,
+                "seed": seed,
+                "output_dir": args.output_dir,
+                "world_width": args.world_width,
+                "world_height": args.world_height,
+                "collisions": args.collisions,
+                "rewards": args.rewards,
+                "time_limit": args.time_limit,
+                "time_step": args.time_step}
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    summaries = runIslands(settings)
+
+    for summary in summaries:
+        print("island "+str(summary["run_number"])+" (seed "+str(summary["seed"])+"): "+str(summary["total_number_of_bots"])+" bots, "
+              +str(summary["generations_bred"])+" generations bred")
+
+    if not args.no_merge:
+        runner.mergeResults(summaries, args.output_dir)
+
+if __name__ == "__main__":
+    main()
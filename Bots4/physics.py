@@ -0,0 +1,76 @@
+import math
+import numpy as np
+import bot
+
+def move(population, rows=None):
+    """
+    Turns and moves every bot in the population (same as Bot.move, for all of the bots at once)
+    rows limits which bots move (a slice of the population), by default every bot does.
+    """
+    if rows == None:
+        rows = slice(0, population.size)
+    direction = population.direction[rows]
+    time_interval = population.time_interval[rows]
+
+    # find out the direction which the bot is facing (added onto the current direction)
+    direction += population.angular_velocity_factor[rows]*population.max_turn_speed[rows]*time_interval
+    #limit the angle to be within 2*Pi radians or 360 degrees
+    np.mod(direction, 2*math.pi, out=direction)
+    # find out how far the bot has traveled
+    displacement = population.velocity_factor[rows]*population.max_speed[rows]*time_interval
+    # update the position along each axis
+    population.x[rows] += np.cos(direction)*displacement
+    population.y[rows] += -np.sin(direction)*displacement
+
+def calculateEnergy(population, rows=None):
+    """
+    Takes the energy used over the last time interval from every bot (same as Bot.calculate_energy, for all of the bots at once)
+    """
+    if rows == None:
+        rows = slice(0, population.size)
+    time_interval = population.time_interval[rows]
+    energy_level = population.energy_level[rows]
+
+    # how much energy was used
+    movement_energy_consumption = population.max_speed[rows] * np.abs(population.velocity_factor[rows]) * bot.Movement_energy_loss_rate * time_interval
+    base_energy_consumption = bot.Base_energy_loss_rate*time_interval
+
+    # take from resoviour, limited to 0 and the maximum
+    energy_level -= movement_energy_consumption + base_energy_consumption
+    np.maximum(energy_level, 0, out=energy_level)
+    np.minimum(energy_level, population.max_energy[rows], out=energy_level)
+
+def applyBoundaries(population, world_width, world_height, boundary_damage, rows=None):
+    """
+    Bots which have reached the edge of the world take damage and are put back inside it
+    """
+    if rows == None:
+        rows = slice(0, population.size)
+    x = population.x[rows]
+    y = population.y[rows]
+    energy_level = population.energy_level[rows]
+
+    # Right boundry
+    hit = x > world_width - bot.Radius
+    energy_level[hit] -= boundary_damage
+    x[hit] = world_width - 1
+    # Bottom boundry
+    hit = y > world_height - bot.Radius
+    energy_level[hit] -= boundary_damage
+    y[hit] = world_height - 1
+    # Left boundry
+    hit = x < bot.Radius
+    energy_level[hit] -= boundary_damage
+    x[hit] = 1
+    # Top boundry
+    hit = y < bot.Radius
+    energy_level[hit] -= boundary_damage
+    y[hit] = 1
+
+def integrate(population, world_width, world_height, boundary_damage, rows=None):
+    """
+    One step of the physics for every bot: moving, using energy and hitting the edges of the world
+    """
+    move(population, rows)
+    calculateEnergy(population, rows)
+    applyBoundaries(population, world_width, world_height, boundary_damage, rows)
@@ -0,0 +1,298 @@
+import weakref
+import numpy as np
+import shared_arrays
+
+Initial_capacity = 64 # number of bots the population has room for before it needs to grow
+
+# the state of every bot, each is a column with one entry per bot
+# x and y must stay together at the front, they make up the position column
+Float_columns = ("x", "y", "direction",
+                 "energy_level", "max_energy", "max_speed", "max_turn_speed", "max_view_angle", "max_view_distance",
+                 "velocity_factor", "angular_velocity_factor", "eat_action",
+                 "energy_percent", "right_angle_percent", "left_angle_percent", "view_distance_percent",
+                 "birth_time", "time_since_birth", "time_last", "time_interval", "time_since_last_child", "time_since_last_meal")
+Int_columns = ("generation", "breeding_points", "total_rewards_collected")
+
+class Column:
+    """
+    An attribute of a bot which is held in the column of the same name in the bot's population
+    """
+    def __init__(self, convert=float):
+        self.convert = convert
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, bot, owner=None):
+        if bot is None:
+            return self
+        return self.convert(getattr(bot.population, self.name)[bot.row])
+
+    def __set__(self, bot, value):
+        getattr(bot.population, self.name)[bot.row] = value
+
+class Population:
+    """
+    Holds the state of many bots in columns (one row per bot) so that it can be worked on for every bot at once.
+    The bots themselves read and write their row through their Column attributes.
+    A bot which is not part of a population is held in the shared pool of such bots (see Pool).
+    A shared population keeps its columns in shared memory, so other processes can attach to them and work on some of the rows.
+    """
+    def __init__(self, capacity=Initial_capacity, shared=False):
+        self.size = 0
+        # the bot held in each row
+        self.bots = []
+        self.shared = shared
+        # the blocks of shared memory holding the columns, by the name of the block of columns
+        self.blocks = {}
+        self._allocate(capacity)
+
+    def _zeros(self, name, shape, dtype):
+        """
+        Creates a block of columns, in shared memory if the population is shared
+        """
+        if not self.shared:
+            return np.zeros(shape, dtype=dtype)
+        array, self.blocks[name] = shared_arrays.zeros(shape, dtype)
+        return array
+
+    def _allocate(self, capacity):
+        """
+        Creates (or grows) the columns so there is room for the given number of bots, the rows already held are copied across
+        """
+        old_blocks = list(self.blocks.values())
+        floats = self._zeros("floats", (len(Float_columns), capacity), float)
+        ints = self._zeros("ints", (len(Int_columns), capacity), np.int64)
+        if self.size > 0:
+            floats[:, :self.size] = self.floats[:, :self.size]
+            ints[:, :self.size] = self.ints[:, :self.size]
+        self._setColumns(floats, ints)
+        for block in old_blocks:
+            shared_arrays.free(block)
+
+    def _setColumns(self, floats, ints):
+        """
+        Points the columns at the blocks of floats and ints
+        """
+        self.capacity = floats.shape[1]
+        self.floats = floats
+        self.ints = ints
+        # each column is a row of the blocks, so every column is contiguous
+        for i, name in enumerate(Float_columns):
+            setattr(self, name, floats[i])
+        for i, name in enumerate(Int_columns):
+            setattr(self, name, ints[i])
+        # the x and y of each bot
+        self.position = floats[0:2]
+
+    def __getstate__(self):
+        """
+        What is saved of the population in a checkpoint (see checkpoint.py), only the rows in use are kept
+        """
+        return {"size": self.size, "bots": self.bots, "capacity": self.capacity,
+                "floats": self.floats[:, :self.size].copy(), "ints": self.ints[:, :self.size].copy()}
+
+    def __setstate__(self, state):
+        self.size = state["size"]
+        self.bots = state["bots"]
+        self.shared = False
+        self.blocks = {}
+        self.floats = state["floats"]
+        self.ints = state["ints"]
+        self._allocate(state["capacity"])
+
+    def sharedLayout(self):
+        """
+        What another process needs to attach to the columns of a shared population
+        """
+        return {"floats": shared_arrays.describe(self.floats, self.blocks["floats"]),
+                "ints": shared_arrays.describe(self.ints, self.blocks["ints"])}
+
+    @classmethod
+    def attach(cls, layout):
+        """
+        Opens the columns of a shared population created by another process.
+        The attached population holds no bots, its size is set by whoever uses it.
+        """
+        attached = cls.__new__(cls)
+        attached.size = 0
+        attached.bots = []
+        attached.shared = False
+        floats, floats_block = shared_arrays.attach(layout["floats"])
+        ints, ints_block = shared_arrays.attach(layout["ints"])
+        attached.blocks = {}
+        attached.attached_blocks = [floats_block, ints_block]
+        attached._setColumns(floats, ints)
+        return attached
+
+    def detach(self):
+        """
+        Closes the columns of an attached population, it can not be used afterwards
+        """
+        attached_blocks = self.attached_blocks
+        # the columns must be gone before the blocks can be closed
+        self.__dict__.clear()
+        for block in attached_blocks:
+            block.close()
+
+    def release(self):
+        """
+        Frees the shared memory of a shared population, once it is no longer needed by any process
+        """
+        for block in self.blocks.values():
+            shared_arrays.free(block)
+        self.blocks = {}
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return iter(self.bots)
+
+    def __getitem__(self, row):
+        return self.bots[row]
+
+    def _copyRow(self, other, other_row, row):
+        """
+        Copies a row of another population into the given row
+        """
+        self.floats[:, row] = other.floats[:, other_row]
+        self.ints[:, row] = other.ints[:, other_row]
+
+    def reserve(self, bot):
+        """
+        Gives a new bot the next row, without copying anything into it
+        """
+        if self.size == self.capacity:
+            self._allocate(self.capacity * 2)
+        row = self.size
+        self.bots.append(bot)
+        bot.population = self
+        bot.row = row
+        self.size += 1
+        return row
+
+    def add(self, bot):
+        """
+        Moves a bot (and its state) into the population and returns the row it was given
+        """
+        if bot.population is self:
+            raise ValueError("the bot is already part of this population")
+        previous, previous_row = bot.population, bot.row
+        row = self.reserve(bot)
+        self._copyRow(previous, previous_row, row)
+        previous._free(previous_row)
+        return row
+
+    def reorder(self, order):
+        """
+        Moves the bots so the bot in row order[i] is now in row i
+        """
+        n = self.size
+        self.floats[:, :n] = self.floats[:, order]
+        self.ints[:, :n] = self.ints[:, order]
+        self.bots = [self.bots[row] for row in order]
+        for row, moved in enumerate(self.bots):
+            moved.row = row
+
+    def remove(self, bot):
+        """
+        Removes a bot from the population, it keeps its state in the pool of bots which are not part of a population
+        """
+        Unowned.add(bot)
+
+    def _free(self, row):
+        """
+        Empties a row, the last bot is moved into it so no other rows need to shift
+        """
+        last = self.size - 1
+        if row != last:
+            # move the last bot into the empty row
+            moved = self.bots[last]
+            self.bots[row] = moved
+            self._copyRow(self, last, row)
+            moved.row = row
+        self.bots.pop()
+        self.size -= 1
+
+class _Reference(weakref.ref):
+    """
+    A weak reference to a bot in the pool, which remembers the bot's row so it can be freed once the bot has gone
+    """
+    __slots__ = ("row",)
+
+class Pool(Population):
+    """
+    The population of the bots which are not part of any other population:
+    new bots until they are added to one, and bots which have been removed from one.
+    The pool only holds weak references to its bots, so the row of a bot which is no longer used anywhere is freed.
+    """
+    def __init__(self, capacity=Initial_capacity):
+        # the references of the bots which have gone, their rows are freed before the pool is next changed
+        self.collected = []
+        super().__init__(capacity)
+
+    def _reference(self, bot, row):
+        reference = _Reference(bot, self.collected.append)
+        reference.row = row
+        return reference
+
+    def __getstate__(self):
+        self._sweep()
+        state = super().__getstate__()
+        state["bots"] = [reference() for reference in self.bots]
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self.collected = []
+        self.bots = [self._reference(bot, row) for row, bot in enumerate(self.bots)]
+
+    def __iter__(self):
+        return (reference() for reference in self.bots)
+
+    def __getitem__(self, row):
+        return self.bots[row]()
+
+    def _sweep(self):
+        """
+        Frees the rows of the bots which have gone.
+        This is not done by the weak references themselves, they can be called part way through changing the pool.
+        """
+        while len(self.collected) > 0:
+            self._free(self.collected.pop().row)
+
+    def reserve(self, bot):
+        """
+        Gives a bot the next row, cleared of whatever was left in it by the bot which had it before
+        """
+        self._sweep()
+        if self.size == self.capacity:
+            self._allocate(self.capacity * 2)
+        row = self.size
+        self.bots.append(self._reference(bot, row))
+        bot.population = self
+        bot.row = row
+        self.size += 1
+        self.floats[:, row] = 0
+        self.ints[:, row] = 0
+        return row
+
+    def reorder(self, order):
+        raise NotImplementedError("the bots in the pool are not kept in any order")
+
+    def _free(self, row):
+        last = self.size - 1
+        if row != last:
+            moved = self.bots[last]
+            self.bots[row] = moved
+            self._copyRow(self, last, row)
+            moved.row = row
+            moved_bot = moved()
+            if moved_bot != None:
+                moved_bot.row = row
+        self.bots.pop()
+        self.size -= 1
+
+# the pool every bot which is not part of a population is held in
+Unowned = Pool()
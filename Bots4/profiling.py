@@ -0,0 +1,141 @@
+import time
+import cProfile
+import pstats
+
+Report_interval = 5.0 # real seconds between the reports of a profiler
+Profile_lines = 25 # functions printed at the end of a cProfile window
+
+class Profiler:
+    """
+    Adds up the time spent in each phase of a tick and counts the work done (brain evaluations, collision checks, ...),
+    printing the rates of both every report interval.
+    A phase is timed with start and lap, eg.
+        lap_time = profiler.start()
+        ...
+        lap_time = profiler.lap("feeding", lap_time)
+    While disabled these return straight away, so they can be left in the main loop.
+    Independently of that, a window of ticks can be run under cProfile (see profileTicks).
+    """
+    def __init__(self, enabled=False, report_interval=Report_interval):
+        self.enabled = enabled
+        self.report_interval = report_interval
+        self.ticks = 0
+        # the seconds spent in each phase and the count of each counter since the start
+        self.totals = {}
+        self.counts = {}
+        # the same, since the last report
+        self.window_totals = {}
+        self.window_counts = {}
+        self.window_ticks = 0
+        self.window_start = None
+
+        # the ticks to run under cProfile
+        self.profile_first_tick = None
+        self.profile_last_tick = None
+        self.profile_file = None
+        self.profile = None
+
+    def __getstate__(self):
+        # a cProfile window in progress is not saved with a checkpoint
+        state = dict(self.__dict__)
+        state["profile"] = None
+        return state
+
+    def start(self):
+        """
+        The time the first phase starts at
+        """
+        if not self.enabled:
+            return 0.0
+        now = time.perf_counter()
+        if self.window_start == None:
+            self.window_start = now
+        return now
+
+    def lap(self, phase, start_time):
+        """
+        Adds the time since start_time to the phase, returns the time now for the next phase to start from
+        """
+        if not self.enabled:
+            return 0.0
+        now = time.perf_counter()
+        self.window_totals[phase] = self.window_totals.get(phase, 0.0) + now - start_time
+        return now
+
+    def count(self, counter, amount=1):
+        if self.enabled:
+            self.window_counts[counter] = self.window_counts.get(counter, 0) + amount
+
+    def profileTicks(self, first_tick, num_of_ticks, file_name=None):
+        """
+        Runs the ticks from first_tick (counting from 0) under cProfile, then prints the most expensive functions
+        and saves the stats to the file (to look at with pstats or snakeviz)
+        """
+        self.profile_first_tick = first_tick
+        self.profile_last_tick = first_tick + num_of_ticks
+        self.profile_file = file_name
+        if first_tick <= self.ticks:
+            self.profile_first_tick = self.ticks
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    def tick(self):
+        """
+        Called at the end of every tick, reports once every report interval and starts and stops the cProfile window
+        """
+        self.ticks += 1
+        if self.profile_first_tick != None:
+            if self.ticks == self.profile_first_tick:
+                self.profile = cProfile.Profile()
+                self.profile.enable()
+            elif self.ticks == self.profile_last_tick and self.profile != None:
+                self.profile.disable()
+                self.printProfile()
+        if not self.enabled:
+            return
+
+        self.window_ticks += 1
+        now = time.perf_counter()
+        if now - self.window_start >= self.report_interval:
+            self.report(now - self.window_start)
+            self.window_start = now
+
+    def printProfile(self):
+        print("cProfile of ticks "+str(self.profile_first_tick)+" to "+str(self.profile_last_tick - 1)+":")
+        stats = pstats.Stats(self.profile)
+        stats.sort_stats("cumulative").print_stats(Profile_lines)
+        if self.profile_file != None:
+            stats.dump_stats(self.profile_file)
+        self.profile = None
+
+    def report(self, elapsed):
+        """
+        Prints the time spent in each phase (milliseconds per real second) and the counters per second since the last report,
+        then adds them to the totals
+        """
+        text = "profile: {:.1f} ticks/s".format(self.window_ticks/elapsed)
+        for phase, seconds in self.window_totals.items():
+            text += " | {} {:.0f} ms/s ({:.0f}%)".format(phase, seconds/elapsed*1000, seconds/elapsed*100)
+        for counter, amount in self.window_counts.items():
+            text += " | {} {:.0f}/s".format(counter, amount/elapsed)
+        print(text)
+
+        for phase, seconds in self.window_totals.items():
+            self.totals[phase] = self.totals.get(phase, 0.0) + seconds
+        for counter, amount in self.window_counts.items():
+            self.counts[counter] = self.counts.get(counter, 0) + amount
+        self.window_totals = {}
+        self.window_counts = {}
+        self.window_ticks = 0
+
+    def summary(self):
+        """
+        The seconds spent in each phase and the count of each counter since the start
+        """
+        totals = dict(self.totals)
+        for phase, seconds in self.window_totals.items():
+            totals[phase] = totals.get(phase, 0.0) + seconds
+        counts = dict(self.counts)
+        for counter, amount in self.window_counts.items():
+            counts[counter] = counts.get(counter, 0) + amount
+        return totals, counts
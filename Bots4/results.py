@@ -0,0 +1,103 @@
+import json
+import sqlite3
+import datetime
+import importlib
+
+Default_results_file = "results.sqlite" # the runs and every bot of them, added to at the end of each run
+Batch_size = 1000 # bots written at a time
+Timeout = 60 # seconds to wait for another process which is writing to the same file
+
+# the constants of these modules are saved with each run, so runs with different settings can be told apart
+# (engine imports this module, so they are only imported once the parameters are asked for)
+Parameter_modules = ("bot", "engine", "genetics")
+
+Schema = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    finished TEXT,
+    output_dir TEXT,
+    seed TEXT,
+    world_width REAL,
+    world_height REAL,
+    enable_collisions INTEGER,
+    num_of_rewards INTEGER,
+    simulation_time REAL,
+    number_of_steps INTEGER,
+    total_number_of_bots INTEGER,
+    parameters TEXT
+);
+CREATE TABLE IF NOT EXISTS bots (
+    run_id INTEGER REFERENCES runs(run_id),
+    name TEXT,
+    colour TEXT,
+    generation INTEGER,
+    rewards INTEGER,
+    birth_time REAL,
+    lifespan REAL,
+    alive_at_end INTEGER,
+    max_speed REAL,
+    max_turn_speed REAL,
+    max_energy REAL,
+    parent1 TEXT,
+    parent2 TEXT,
+    family_history TEXT
+);
+CREATE INDEX IF NOT EXISTS bots_by_run ON bots (run_id, generation);
+CREATE INDEX IF NOT EXISTS bots_by_generation ON bots (generation);
+"""
+
+def connect(file_name):
+    """
+    Opens the results file, creating the tables the first time
+    """
+    connection = sqlite3.connect(file_name, timeout=Timeout)
+    connection.executescript(Schema)
+    return connection
+
+def parameters(sim=None):
+    """
+    The constants of the simulation as they are now (the numbers, strings and switches at the top of each module),
+    and if a simulation is given the settings it was run with (see Simulation.run) as run.time_step, run.time_limit and run.generation_limit
+    """
+    values = {}
+    for module_name in Parameter_modules:
+        module = importlib.import_module(module_name)
+        for name, value in vars(module).items():
+            if name[:1].isupper() and isinstance(value, (bool, int, float, str)):
+                values[module_name+"."+name] = value
+    if sim != None:
+        values["run.time_step"] = sim.time_step
+        values["run.time_limit"] = sim.time_limit
+        values["run.generation_limit"] = sim.generation_limit
+    return values
+
+def botRow(run_id, saved_bot, alive_at_end):
+    parent1, parent2 = saved_bot.parent_names
+    return (run_id, saved_bot.name, saved_bot.colour, saved_bot.generation, saved_bot.total_rewards_collected,
+            saved_bot.birth_time, saved_bot.time_since_birth, int(alive_at_end),
+            saved_bot.max_speed, saved_bot.max_turn_speed, saved_bot.max_energy, parent1, parent2, saved_bot.family_history)
+
+def saveRun(file_name, sim, num_of_dead_bots):
+    """
+    Adds a finished simulation and every bot which lived in it to the results file, in one transaction.
+    The first num_of_dead_bots of sim.all_bots died, the rest were still alive at the end.
+    Returns the id of the run.
+    """
+    connection = connect(file_name)
+    try:
+        with connection:
+            cursor = connection.execute("INSERT INTO runs (finished, output_dir, seed, world_width, world_height, enable_collisions, num_of_rewards,"
+                                        " simulation_time, number_of_steps, total_number_of_bots, parameters) VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+                                        (datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"), sim.output_dir, str(sim.seed),
+                                         sim.world_width, sim.world_height, int(sim.enable_collisions), sim.rewards.size,
+                                         sim.simulation_time, sim.number_of_steps, sim.total_number_of_bots, json.dumps(parameters(sim))))
+            run_id = cursor.lastrowid
+            start = 0
+            while start < len(sim.all_bots):
+                batch = sim.all_bots[start:start+Batch_size]
+                connection.executemany("INSERT INTO bots VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                                       [botRow(run_id, saved_bot, start+i >= num_of_dead_bots) for i, saved_bot in enumerate(batch)])
+                start += Batch_size
+    finally:
+        connection.close()
+    return run_id
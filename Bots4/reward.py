@@ -1,33 +1,217 @@
-import random
-import tkinter as tk
 import math
+import numpy as np
+import spatial
+import streams
 
 Radius = 1.0 #units
 Colour = "red"
 Boarder_width = 2 #units
 Max_slices = 10
+Initial_capacity = 16 # number of rewards a field has room for before it needs to grow
 
 
-class Reward:
-    def __init__(self, w_width, w_height):
-        self.position = [0,0]
-        self.slices = Max_slices
+class RewardField:
+    """
+    Holds many rewards in columns (one row per reward), with a spatial.SpatialHash over them
+    so the reward a bot can see is found without checking every reward.
+    The rewards themselves read and write their row, a reward which is not part of a field has a field of its own with a single row.
+    The grid is built once it is needed after rewards have been added, so adding many rewards does not rebuild it each time.
+    """
+    def __init__(self, w_width, w_height, capacity=Initial_capacity):
+        self.w_width = w_width
+        self.w_height = w_height
+        self.size = 0
+        # the reward held in each row
+        self.rewards = []
+        self._allocate(capacity)
 
+        # the area the rewards are placed in, away from the boarder
         self.x_max = w_width - (Boarder_width + Radius)
         self.y_max = w_height - (Boarder_width + Radius)
-
         self.x_min = Boarder_width + Radius
         self.y_min = self.x_min
 
+        self.spatial_hash = spatial.SpatialHash(max(w_width, w_height))
+        # whether the grid holds every reward
+        self.indexed = False
+
+    def _allocate(self, capacity):
+        """
+        Creates (or grows) the columns so there is room for the given number of rewards, the rows already held are copied across
+        """
+        position = np.zeros((2, capacity))
+        slices = np.zeros(capacity, dtype=np.int64)
+        if self.size > 0:
+            position[:, :self.size] = self.position[:, :self.size]
+            slices[:self.size] = self.slices[:self.size]
+
+        self.capacity = capacity
+        self.position = position
+        self.x = position[0]
+        self.y = position[1]
+        self.slices = slices
+
+    def __getstate__(self):
+        # the x and y columns are views of the positions, they are made again when loaded (see checkpoint.py)
+        state = dict(self.__dict__)
+        del state["x"], state["y"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.x = self.position[0]
+        self.y = self.position[1]
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return iter(self.rewards)
+
+    def __getitem__(self, row):
+        return self.rewards[row]
+
+    def index(self):
+        """
+        Builds the grid over the rewards if rewards have been added since it was built, with cells sized so there is about one reward in each
+        """
+        if self.indexed:
+            return
+        if self.size > 0:
+            self.spatial_hash.cell_size = max(math.sqrt(self.w_width*self.w_height/self.size), Radius*2)
+        self.spatial_hash.build(self)
+        self.indexed = True
+
+    def reserve(self, new_reward):
+        """
+        Gives a new reward the next row, without copying anything into it
+        """
+        if self.size == self.capacity:
+            self._allocate(self.capacity * 2)
+        row = self.size
+        self.rewards.append(new_reward)
+        new_reward.field = self
+        new_reward.row = row
+        self.size += 1
+        self.indexed = False
+        return row
+
+    def add(self, new_reward):
+        """
+        Moves a reward (and its state) into the field and returns the row it was given
+        """
+        if new_reward.field is self:
+            raise ValueError("the reward is already part of this field")
+        previous, previous_row = new_reward.field, new_reward.row
+        row = self.reserve(new_reward)
+        self.position[:, row] = previous.position[:, previous_row]
+        self.slices[row] = previous.slices[previous_row]
+        return row
+
+    def move(self, row):
+        """
+        moves the reward in the row to a new random location
+        """
+        print("the reward moved")
+        self.x[row] = streams.Rewards.random()*(self.x_max-self.x_min) + self.x_min
+        self.y[row] = streams.Rewards.random()*(self.y_max-self.y_min) + self.y_min
+        if self.indexed:
+            self.spatial_hash.move(row, self.x[row], self.y[row])
+
+    def consumed(self, row):
+        '''
+        removes a slice from the reward in the row.
+        if there are no more slices the reward will move and the slices reset 
+        '''
+        self.slices[row] -= 1
+        print(str(self.slices[row])+" slices left")
+        if self.slices[row] <= 0:
+            self.move(row)
+            self.slices[row] = Max_slices
+
+    def nearestVisible(self, population, rows=None):
+        """
+        Returns the row of the reward each bot of the population looks at (see SpatialHash.nearestInView): the nearest one in its field of view,
+        otherwise the nearest one within its view distance. A bot with no reward within its view distance looks at the first reward,
+        vision.see clears what it sees of a reward that far away whichever reward it is.
+        With no rewards at all every bot is given -1, nothing to look at (see targetPositions).
+        rows limits which bots look (a slice of the population), by default every bot does.
+        """
+        self.index()
+        return nearestVisible(self.spatial_hash, population, rows)
+
+    def within(self, x_pos, y_pos, radius):
+        """
+        Returns the rows (in order) of the rewards within the radius of the point
+        """
+        self.index()
+        return self.spatial_hash.query(x_pos, y_pos, radius)
+
+
+def nearestVisible(reward_hash, population, rows=None):
+    """
+    The reward each bot of the population looks at (see RewardField.nearestVisible), from a grid built over the positions of the rewards
+    """
+    if rows == None:
+        rows = slice(0, population.size)
+    # with no rewards there is nothing to look at
+    if len(reward_hash.x) == 0:
+        return np.full(len(population.x[rows]), -1, dtype=np.intp)
+    # with a single reward there is nothing to search
+    if len(reward_hash.x) == 1:
+        return np.zeros(len(population.x[rows]), dtype=np.intp)
+    nearest_rows = reward_hash.nearestInView(population.x[rows], population.y[rows], population.direction[rows],
+                                             population.max_view_angle[rows]/2.0, population.max_view_distance[rows])
+    nearest_rows[nearest_rows < 0] = 0
+    return nearest_rows
+
+def targetPositions(reward_x, reward_y, nearest_rows):
+    """
+    The position of the reward each bot looks at, from the rows found by nearestVisible.
+    A bot with nothing to look at (-1) is given 0,0, it must be left out with the visible argument of vision.see.
+    """
+    visible = nearest_rows >= 0
+    target_position = np.zeros((2, len(nearest_rows)))
+    target_position[0, visible] = reward_x[nearest_rows[visible]]
+    target_position[1, visible] = reward_y[nearest_rows[visible]]
+    return target_position
+
+
+class Reward:
+    """
+    A single reward, its state is held in its row of a RewardField (the given field, or one of its own)
+    """
+    def __init__(self, w_width, w_height, field=None):
+        # without a field to join the reward has one of its own
+        if field == None:
+            field = RewardField(w_width, w_height, 1)
+        field.reserve(self)
+        self.slices = Max_slices
+
         self.move()
 
+    @property
+    def position(self):
+        # a view of the reward's row of the position column
+        return self.field.position[:, self.row]
+
+    @position.setter
+    def position(self, value):
+        self.field.position[:, self.row] = value
+
+    @property
+    def slices(self):
+        return int(self.field.slices[self.row])
+
+    @slices.setter
+    def slices(self, value):
+        self.field.slices[self.row] = value
+
     def move(self):
         """
         moves the reward to a new random location
         """
-        print("the reward moved")
-        self.position[0] = random.random()*(self.x_max-self.x_min) + self.x_min
-        self.position[1] = random.random()*(self.y_max-self.y_min) + self.y_min
+        self.field.move(self.row)
     
     def isNear(self, obj):
         """
@@ -50,11 +234,7 @@ class Reward:
         removes a slice from the reward.
         if there are no more slices the reward will move and the slices reset 
         '''
-        self.slices -= 1
-        print(str(self.slices)+" slices left")
-        if self.slices <= 0:
-            self.move()
-            self.slices = Max_slices
+        self.field.consumed(self.row)
     
     def getPosition(self):
         """
@@ -66,4 +246,4 @@ def main():
     pass
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
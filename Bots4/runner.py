@@ -0,0 +1,149 @@
+import os
+import random
+import shutil
+import argparse
+import contextlib
+import multiprocessing
+import engine
+import results
+
+Default_output_dir = "runs" # each run gets a folder of its own in here
+
+def runOutputDir(output_dir, run_number):
+    """
+    The folder a run writes its record, log and new starter brains and attributes to
+    """
+    return os.path.join(output_dir, "run_"+str(run_number))
+
+def botSummary(best_bot):
+    """
+    What is kept of a run's best bot once the run is over (None if no bot passed the requirements for improvement)
+    """
+    if best_bot == None:
+        return None
+    return {"name": best_bot.name,
+            "rewards": best_bot.total_rewards_collected,
+            "generation": best_bot.generation,
+            "time_since_birth": best_bot.time_since_birth}
+
+def runSimulation(settings):
+    """
+    Runs a single simulation in the folder for its run and returns a summary of it.
+    Everything it prints goes to log.txt in its folder, its bots are added to the results file shared by every run.
+    This is called in the worker processes, so settings is a plain dict.
+    """
+    run_dir = runOutputDir(settings["output_dir"], settings["run_number"])
+    os.makedirs(os.path.join(run_dir, "brains"), exist_ok=True)
+    os.makedirs(os.path.join(run_dir, "attributes"), exist_ok=True)
+
+    with open(os.path.join(run_dir, "log.txt"), "w") as log, contextlib.redirect_stdout(log):
+        sim = engine.Simulation(settings["world_width"], settings["world_height"], enable_collisions=settings["collisions"],
+                                num_of_rewards=settings["rewards"], seed=settings["seed"], output_dir=run_dir,
+                                results_file=os.path.join(settings["output_dir"], results.Default_results_file))
+        sim.setup()
+        sim.run(settings["time_limit"], settings["generation_limit"], settings["time_step"])
+        best_yellow, best_blue = sim.finish()
+
+    return {"run_number": settings["run_number"],
+            "seed": settings["seed"],
+            "output_dir": run_dir,
+            "simulation_time": sim.simulation_time,
+            "number_of_steps": sim.number_of_steps,
+            "total_number_of_bots": sim.total_number_of_bots,
+            "generations_bred": sim.generationsBred(),
+            "yellow": botSummary(best_yellow),
+            "blue": botSummary(best_blue)}
+
+def runAll(all_settings, num_of_workers):
+    """
+    Runs every simulation across a pool of processes and returns their summaries in run order
+    """
+    if num_of_workers <= 1:
+        return [runSimulation(settings) for settings in all_settings]
+    with multiprocessing.Pool(num_of_workers) as pool:
+        return pool.map(runSimulation, all_settings, chunksize=1)
+
+def mergeResults(summaries, output_dir, starter_dir="."):
+    """
+    Puts the records of every run together in one record.txt in output_dir,
+    and copies the brain and attributes of the best yellow and blue bot of all of the runs into starter_dir as the new starter bots.
+    The bot which collected the most rewards is the best, the earliest run wins a tie.
+    Returns the summaries of the runs the best yellow and blue bots came from (None if no run had one).
+    """
+    record = open(os.path.join(output_dir, "record.txt"), "a")
+    for summary in summaries:
+        run_record = os.path.join(summary["output_dir"], "record.txt")
+        if os.path.exists(run_record):
+            with open(run_record) as run_record_file:
+                for line in run_record_file:
+                    record.write("run "+str(summary["run_number"])+" seed "+str(summary["seed"])+": "+line)
+    record.close()
+
+    best = {}
+    for colour in ("yellow", "blue"):
+        best[colour] = None
+        for summary in summaries:
+            if summary[colour] != None and (best[colour] == None or summary[colour]["rewards"] > best[colour][colour]["rewards"]):
+                best[colour] = summary
+
+        if best[colour] != None:
+            for file_name in ("brains/starter_brain_"+colour+".txt", "attributes/starter_attributes_"+colour+".txt"):
+                shutil.copyfile(os.path.join(best[colour]["output_dir"], file_name), os.path.join(starter_dir, file_name))
+            print("the best "+colour+" bot was "+best[colour][colour]["name"]+" from run "+str(best[colour]["run_number"])+" with "+str(best[colour][colour]["rewards"]))
+        else:
+            print("no "+colour+" bots passed the initial requirements for improvement in any run")
+
+    return best["yellow"], best["blue"]
+
+def main():
+    """
+    Runs independent simulations at the same time, one process per core, then merges their results.
+    Every run starts from the same starter bots and gets its own seed and folder.
+    """
+    parser = argparse.ArgumentParser(description="Runs many simulations at once without any windows and merges the results")
+    parser.add_argument("--runs", type=int, default=os.cpu_count(), help="number of simulations")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of processes to run the simulations in")
+    parser.add_argument("--time-limit", type=float, default=1200, help="simulated seconds per simulation")
+    parser.add_argument("--generation-limit", type=int, default=None, help="stop a simulation once this many generations have been bred")
+    parser.add_argument("--time-step", type=float, default=engine.Time_step, help="simulated seconds per step")
+    parser.add_argument("--collisions", action="store_true", default=engine.EnableCollisions, help="bump apart bots which overlap")
+    parser.add_argument("--rewards", type=int, default=engine.Num_of_rewards, help="number of rewards in the world at once")
+    parser.add_argument("--world-width", type=float, default=engine.World_width, help="width of the world in units")
+    parser.add_argument("--world-height", type=float, default=engine.World_height, help="height of the world in units")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the first simulation, each following simulation uses the next seed")
+    parser.add_argument("--output-dir", default=Default_output_dir, help="folder the runs are written to")
+    parser.add_argument("--no-merge", action="store_true", help="leave the starter bots as they are")
+    args = parser.parse_args()
+
+    # the seeds are always chosen up front so that any run can be repeated
+    base_seed = args.seed
+    if base_seed == None:
+        base_seed = random.randrange(2**31)
+
+    all_settings = []
+    run_number = 0
+    while run_number < args.runs:
+        all_settings.append({"run_number": run_number,
+                             "seed": base_seed + run_number,
+                             "output_dir": args.output_dir,
+                             "world_width": args.world_width,
+                             "world_height": args.world_height,
+                             "collisions": args.collisions,
+                             "rewards": args.rewards,
+                             "time_limit": args.time_limit,
+                             "generation_limit": args.generation_limit,
+                             "time_step": args.time_step})
+        run_number += 1
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    summaries = runAll(all_settings, min(args.workers, args.runs))
+
+    for summary in summaries:
+        print("run "+str(summary["run_number"])+" (seed "+str(summary["seed"])+"): "+str(summary["number_of_steps"])+" steps, "
+              +str(summary["total_number_of_bots"])+" bots, "+str(summary["generations_bred"])+" generations bred")
+
+    if not args.no_merge:
+        mergeResults(summaries, args.output_dir)
+
+if __name__ == "__main__":
+    main()
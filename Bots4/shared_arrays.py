@@ -0,0 +1,34 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+def zeros(shape, dtype=float):
+    """
+    Creates an array of zeros in a new block of shared memory, so that other processes can work on it.
+    Returns the array and the block, the block must be kept (and freed with free) by the process which created it.
+    """
+    dtype = np.dtype(dtype)
+    block = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape))*dtype.itemsize, 1))
+    array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    array[...] = 0
+    return array, block
+
+def describe(array, block):
+    """
+    What another process needs to open the array with attach (plain data, so it can be sent between processes)
+    """
+    return (block.name, array.shape, array.dtype.str)
+
+def attach(description):
+    """
+    Opens an array created by another process from its description.
+    Returns the array and the block, every array using the block must be gone before the block is closed.
+    """
+    name, shape, dtype = description
+    block = shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf), block
+
+def free(block):
+    """
+    Frees a block created with zeros. Processes which still have it open keep their copy until they close it.
+    """
+    block.unlink()
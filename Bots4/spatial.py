@@ -0,0 +1,186 @@
+import math
+import numpy as np
+
+Key_shift = 2**32 # a cell's key is its x times this plus its y
+
+class SpatialHash:
+    """
+    A uniform grid over the world which buckets the bots of a population (or anything else with x and y columns, such as a reward.RewardField)
+    by the cell their position falls in, so the bots near a point can be found without checking every bot.
+    The grid is built from the position column once the bots have moved each step, bots moved after that are moved in the grid with move().
+    """
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        # the rows of the bots in each cell, and which cell each row is in
+        self.cells = {}
+        self.keys = np.zeros(0, dtype=np.int64)
+        # the first and last cell along x and y which have held a bot
+        self.bounds = [0, -1, 0, -1]
+        # the positions of the bots as the grid knows them
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+
+    def cellKeys(self, cell_x, cell_y):
+        """
+        One number for each cell, works on single cells and arrays of cells
+        """
+        return cell_x * Key_shift + cell_y
+
+    def cellOf(self, x_pos, y_pos):
+        """
+        The x and y of the cell a position falls in, works on single positions and arrays of positions
+        """
+        if np.ndim(x_pos) == 0:
+            return math.floor(x_pos / self.cell_size), math.floor(y_pos / self.cell_size)
+        cell_x = np.floor(x_pos / self.cell_size).astype(np.int64)
+        cell_y = np.floor(y_pos / self.cell_size).astype(np.int64)
+        return cell_x, cell_y
+
+    def build(self, population):
+        """
+        Buckets every bot of the population by its cell
+        """
+        n = population.size
+        self.buildPositions(population.x[:n], population.y[:n])
+
+    def buildPositions(self, x_positions, y_positions):
+        """
+        Buckets the points by their cell, the row of each point is its place in the arrays
+        """
+        n = len(x_positions)
+        self.x = np.array(x_positions, dtype=float)
+        self.y = np.array(y_positions, dtype=float)
+        cell_x, cell_y = self.cellOf(self.x, self.y)
+        self.keys = self.cellKeys(cell_x, cell_y)
+        if n > 0:
+            self.bounds = [int(cell_x.min()), int(cell_x.max()), int(cell_y.min()), int(cell_y.max())]
+        else:
+            self.bounds = [0, -1, 0, -1]
+
+        # sorting groups the rows of each cell together
+        order = np.argsort(self.keys, kind="stable")
+        unique_keys, starts, counts = np.unique(self.keys[order], return_index=True, return_counts=True)
+        self.cells = {}
+        for key, start, count in zip(unique_keys.tolist(), starts.tolist(), counts.tolist()):
+            self.cells[key] = order[start:start+count].tolist()
+
+    def move(self, row, x_pos, y_pos):
+        """
+        Updates the position of a bot which has moved since the grid was built
+        """
+        self.x[row] = x_pos
+        self.y[row] = y_pos
+        cell_x, cell_y = self.cellOf(x_pos, y_pos)
+        key = self.cellKeys(cell_x, cell_y)
+        old_key = int(self.keys[row])
+        self.bounds = [min(self.bounds[0], cell_x), max(self.bounds[1], cell_x), min(self.bounds[2], cell_y), max(self.bounds[3], cell_y)]
+        if key != old_key:
+            self.cells[old_key].remove(row)
+            if len(self.cells[old_key]) == 0:
+                del self.cells[old_key]
+            self.cells.setdefault(key, []).append(row)
+            self.keys[row] = key
+
+    def candidates(self, x_pos, y_pos, radius):
+        """
+        Returns the rows (in order) of the bots in every cell which overlaps the square around the point, not checked for distance
+        """
+        first_x = math.floor((x_pos - radius) / self.cell_size)
+        last_x = math.floor((x_pos + radius) / self.cell_size)
+        first_y = math.floor((y_pos - radius) / self.cell_size)
+        last_y = math.floor((y_pos + radius) / self.cell_size)
+
+        cells = self.cells
+        found = []
+        cell_x = first_x
+        while cell_x <= last_x:
+            column_key = cell_x * Key_shift
+            cell_y = first_y
+            while cell_y <= last_y:
+                found.extend(cells.get(column_key + cell_y, ()))
+                cell_y += 1
+            cell_x += 1
+
+        found.sort()
+        return np.array(found, dtype=np.intp)
+
+    def anyNear(self, x_positions, y_positions, radius):
+        """
+        Returns whether any of the cells which overlap the square around each of the points hold a bot.
+        A quick check for many points at once, before query is used on the points which may have bots near.
+        """
+        first_x, first_y = self.cellOf(x_positions - radius, y_positions - radius)
+        last_x, last_y = self.cellOf(x_positions + radius, y_positions + radius)
+
+        # the most cells the square can overlap along each axis, every offset is checked for every point at once
+        span = math.ceil(2*radius / self.cell_size) + 1
+        offset_x, offset_y = np.divmod(np.arange(span*span), span)
+        cell_x = first_x + offset_x[:, np.newaxis]
+        cell_y = first_y + offset_y[:, np.newaxis]
+        overlaps = (cell_x <= last_x) & (cell_y <= last_y)
+
+        # the cells are looked up in the sorted keys of the bots (kept up to date by move)
+        occupied_keys = np.unique(self.keys)
+        keys = self.cellKeys(cell_x, cell_y)
+        found = np.minimum(np.searchsorted(occupied_keys, keys), len(occupied_keys) - 1)
+        occupied = (occupied_keys[found] == keys) if len(occupied_keys) > 0 else np.zeros(keys.shape, dtype=bool)
+        return (overlaps & occupied).any(axis=0)
+
+    def nearestInView(self, x_positions, y_positions, directions, half_view_angles, view_distances):
+        """
+        Returns the row of the nearest point each of the lookers can see, within its view distance and half its view angle either side of its direction
+        (the lowest row if several are as close). A looker which can not see any point gets the nearest point within its view distance instead,
+        and -1 if there are none.
+        Every looker is searched at once: the cells within the longest view distance of each looker are found in the sorted keys of the grid,
+        then every point in those cells is checked.
+        """
+        n = len(x_positions)
+        nearest_rows = np.full(n, -1, dtype=np.intp)
+        if n == 0 or len(self.keys) == 0:
+            return nearest_rows
+        order = np.argsort(self.keys, kind="stable")
+        sorted_keys = self.keys[order]
+
+        # the cells around each looker, only those within the cells which hold points
+        radius = float(view_distances.max())
+        first_x, first_y = self.cellOf(x_positions - radius, y_positions - radius)
+        last_x, last_y = self.cellOf(x_positions + radius, y_positions + radius)
+        first_x = np.maximum(first_x, self.bounds[0])
+        first_y = np.maximum(first_y, self.bounds[2])
+        span_x = np.maximum(np.minimum(last_x, self.bounds[1]) - first_x + 1, 0)
+        span_y = np.maximum(np.minimum(last_y, self.bounds[3]) - first_y + 1, 0)
+        cells_per_looker = span_x*span_y
+        looker_of_cell = np.repeat(np.arange(n), cells_per_looker)
+        cell_number = np.arange(len(looker_of_cell)) - np.repeat(np.cumsum(cells_per_looker) - cells_per_looker, cells_per_looker)
+        cell_x = first_x[looker_of_cell] + cell_number // span_y[looker_of_cell]
+        cell_y = first_y[looker_of_cell] + cell_number % span_y[looker_of_cell]
+        keys = self.cellKeys(cell_x, cell_y)
+        starts = np.searchsorted(sorted_keys, keys, side="left")
+        counts = np.searchsorted(sorted_keys, keys, side="right") - starts
+
+        # every point in those cells, paired with the looker
+        looker = np.repeat(looker_of_cell, counts)
+        rows = order[np.arange(len(looker)) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(starts, counts)]
+        # worked out the same way as vision.see, so a point counted as seen here is seen there
+        x_displacement = self.x[rows] - x_positions[looker]
+        y_displacement = y_positions[looker] - self.y[rows]
+        distance = np.sqrt(x_displacement**2 + y_displacement**2)
+        angle = np.arctan2(y_displacement, x_displacement) - directions[looker]
+        angle = np.where(angle > np.pi, angle - 2*np.pi, np.where(angle < -np.pi, angle + 2*np.pi, angle))
+        in_range = distance <= view_distances[looker]
+        looker, rows, distance, angle = looker[in_range], rows[in_range], distance[in_range], angle[in_range]
+        out_of_view = np.abs(angle) >= half_view_angles[looker]
+
+        # the first pair of each looker, seen before unseen then nearest first
+        pairs = np.lexsort((rows, distance, out_of_view, looker))
+        lookers, firsts = np.unique(looker[pairs], return_index=True)
+        nearest_rows[lookers] = rows[pairs[firsts]]
+        return nearest_rows
+
+    def query(self, x_pos, y_pos, radius):
+        """
+        Returns the rows (in order) of the bots within the radius of the point
+        """
+        rows = self.candidates(x_pos, y_pos, radius)
+        close = np.sqrt((self.x[rows] - x_pos)**2 + (self.y[rows] - y_pos)**2) <= radius
+        return rows[close]
@@ -0,0 +1,53 @@
+import zlib
+import random
+import numpy as np
+
+# every part of the simulation which draws random numbers has a stream of its own,
+# so a change in how often one part draws does not change what any other part draws
+Placement = random.Random() # where the starting bots are put (engine.py)
+Bots = random.Random() # the attributes and direction of new bots (bot.py)
+Brains = random.Random() # the connections and weights of random brains (brain.py)
+Rewards = random.Random() # where the rewards are put (reward.py)
+Migration = random.Random() # where migrants arrive (islands.py)
+Genetics = np.random.default_rng() # breeding and jittering the weights of brains (genetics.py)
+
+Streams = {"placement": Placement, "bots": Bots, "brains": Brains, "rewards": Rewards, "migration": Migration, "genetics": Genetics}
+
+def streamSeed(run_seed, name):
+    """
+    The seed of one stream, taken from the run seed and the name of the stream (so adding a stream does not change the others)
+    """
+    return np.random.SeedSequence(run_seed, spawn_key=(zlib.crc32(name.encode()),))
+
+def seed(run_seed=None):
+    """
+    Seeds every stream from the run seed, the streams are reseeded in place so anything holding one keeps using it.
+    Without a run seed one is picked at random. Returns the run seed, which is all that is needed to repeat the run.
+    """
+    if run_seed == None:
+        run_seed = np.random.SeedSequence().entropy
+    for name, stream in Streams.items():
+        if name == "genetics":
+            stream.bit_generator.state = np.random.PCG64(streamSeed(run_seed, name)).state
+        else:
+            stream.seed(int(streamSeed(run_seed, name).generate_state(1, np.uint64)[0]))
+    return run_seed
+
+def getState():
+    """
+    The state of every stream, to carry on from later with setState (see checkpoint.py)
+    """
+    state = {}
+    for name, stream in Streams.items():
+        if name == "genetics":
+            state[name] = stream.bit_generator.state
+        else:
+            state[name] = stream.getstate()
+    return state
+
+def setState(state):
+    for name, stream in Streams.items():
+        if name == "genetics":
+            stream.bit_generator.state = state[name]
+        else:
+            stream.setstate(state[name])
@@ -0,0 +1,195 @@
+import argparse
+import traceback
+import multiprocessing
+import numpy as np
+import engine
+import population
+import brain_batch
+import spatial
+import vision
+import reward
+import thinking
+import physics
+
+Default_num_of_strips = 2 # processes the world is split between
+
+def thinkStrip(bots, brains, rows, simulation_time, reward_hash, world_width, world_height):
+    """
+    The bots in the rows of one strip look, think and move (same as Simulation.think for those rows)
+    """
+    nearest_rewards = reward.nearestVisible(reward_hash, bots, rows)
+    vision.see(bots, reward.targetPositions(reward_hash.x, reward_hash.y, nearest_rewards), rows, nearest_rewards >= 0)
+    thinking.updateClocks(bots, simulation_time, rows)
+    thinking.assignBrainInputs(bots, brains, rows)
+    brains.calculateOutputs(rows)
+    thinking.readBrainOutputs(bots, brains, rows)
+    physics.integrate(bots, world_width, world_height, engine.Boundry_damage, rows)
+
+def workStrip(connection, world_width, world_height):
+    """
+    Runs in a worker process, working on the rows of its strip each time the coordinator sends a tick.
+    Messages:
+        ("attach", population layout, brain layout) - the shared arrays have been moved (they grew)
+        ("tick", simulation time, first row, end row, reward x positions, reward y positions, reward cell size)
+        ("stop",)
+    Every tick is answered with ("done",), or ("error", traceback) if it failed.
+    """
+    bots = None
+    brains = None
+    while True:
+        message = connection.recv()
+        if message[0] == "stop":
+            break
+        try:
+            if message[0] == "attach":
+                if bots != None:
+                    bots.detach()
+                    brains.detach()
+                bots = population.Population.attach(message[1])
+                brains = brain_batch.BrainBatch.attach(message[2])
+            elif message[0] == "tick":
+                simulation_time, start, end, reward_x, reward_y, cell_size = message[1:]
+                brains.size = end
+                if end > start:
+                    reward_hash = spatial.SpatialHash(cell_size)
+                    reward_hash.buildPositions(reward_x, reward_y)
+                    thinkStrip(bots, brains, slice(start, end), simulation_time, reward_hash, world_width, world_height)
+                connection.send(("done",))
+        except Exception:
+            connection.send(("error", traceback.format_exc()))
+    if bots != None:
+        bots.detach()
+        brains.detach()
+    connection.close()
+
+class StripSimulation(engine.Simulation):
+    """
+    A simulation with the world split into vertical strips, the bots of each strip look, think and move in a process of their own.
+    The state of the bots and their brains is kept in shared memory, with the bots of each strip in one run of rows,
+    so each process works on its rows in place and nothing is copied between processes.
+    Anything where bots affect each other (eating, breeding, collisions, deaths) crosses strips,
+    so it is done by the coordinator once every strip has finished the tick.
+    """
+    def __init__(self, num_of_strips=Default_num_of_strips, **kwargs):
+        super().__init__(**kwargs)
+        self.num_of_strips = num_of_strips
+        self.strip_width = self.world_width/num_of_strips
+        # the bots and brains are swapped for shared ones before any bot is added
+        self.brains = brain_batch.BrainBatch(shared=True)
+        self.alive_bots = population.Population(shared=True)
+        self.connections = []
+        self.processes = []
+        # the blocks the workers were last attached to
+        self.attached_blocks = None
+
+    def start(self):
+        """
+        Starts a worker process for each strip
+        """
+        i = 0
+        while i < self.num_of_strips:
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=workStrip, args=(worker_connection, self.world_width, self.world_height), daemon=True)
+            process.start()
+            worker_connection.close()
+            self.connections.append(connection)
+            self.processes.append(process)
+            i+=1
+
+    def close(self):
+        """
+        Stops the worker processes and frees the shared memory
+        """
+        for connection in self.connections:
+            connection.send(("stop",))
+        for process in self.processes:
+            process.join()
+        for connection in self.connections:
+            connection.close()
+        self.connections = []
+        self.processes = []
+        self.alive_bots.release()
+        self.brains.release()
+
+    def assignStrips(self):
+        """
+        Moves the bots so the bots of each strip are in one run of rows, then returns where each run starts and ends.
+        Bots keep their order within a strip, and nothing is moved if every bot is already in its strip's rows.
+        """
+        alive_bots = self.alive_bots
+        n = alive_bots.size
+        strip = np.clip(np.floor(alive_bots.x[:n]/self.strip_width).astype(np.intp), 0, self.num_of_strips-1)
+        if np.any(strip[1:] < strip[:-1]):
+            order = np.argsort(strip, kind="stable")
+            alive_bots.reorder(order)
+            self.brains.reorder(order)
+            strip = strip[order]
+        return np.searchsorted(strip, np.arange(self.num_of_strips+1), side="left")
+
+    def think(self, simulation_time):
+        """
+        Every strip's process works on its own bots, the tick ends once all of them are done (see Simulation.think)
+        """
+        if len(self.processes) == 0:
+            self.start()
+        bounds = self.assignStrips()
+        bounds[-1] = self.alive_bots.size
+
+        # the workers are pointed at the arrays again whenever they have grown
+        blocks = (list(self.alive_bots.blocks.values()), list(self.brains.blocks.values()))
+        if blocks != self.attached_blocks and self.brains.layout != None:
+            for connection in self.connections:
+                connection.send(("attach", self.alive_bots.sharedLayout(), self.brains.sharedLayout()))
+            self.attached_blocks = blocks
+
+        rewards = self.rewards
+        rewards.index()
+        reward_x = rewards.x[:rewards.size].copy()
+        reward_y = rewards.y[:rewards.size].copy()
+        i = 0
+        while i < self.num_of_strips:
+            self.connections[i].send(("tick", simulation_time, int(bounds[i]), int(bounds[i+1]), reward_x, reward_y, rewards.spatial_hash.cell_size))
+            i+=1
+        errors = []
+        for connection in self.connections:
+            answer = connection.recv()
+            if answer[0] == "error":
+                errors.append(answer[1])
+        if len(errors) > 0:
+            raise RuntimeError("a strip failed:\n" + errors[0])
+        return self.alive_bots.size
+
+def main():
+    """
+    Runs the simulations headless as engine.py does, with the bots of each strip of the world worked on in their own process
+    """
+    parser = argparse.ArgumentParser(description="Runs the simulation without any windows, split into strips worked on by several processes")
+    parser.add_argument("--strips", type=int, default=Default_num_of_strips, help="number of strips, each with its own process")
+    parser.add_argument("--runs", type=int, default=1, help="number of simulations, each carries its best bots on to the next")
+    parser.add_argument("--time-limit", type=float, default=1200, help="simulated seconds per simulation")
+    parser.add_argument("--generation-limit", type=int, default=None, help="stop a simulation once this many generations have been bred")
+    parser.add_argument("--time-step", type=float, default=engine.Time_step, help="simulated seconds per step")
+    parser.add_argument("--collisions", action="store_true", default=engine.EnableCollisions, help="bump apart bots which overlap")
+    parser.add_argument("--rewards", type=int, default=engine.Num_of_rewards, help="number of rewards in the world at once")
+    parser.add_argument("--world-width", type=float, default=engine.World_width, help="width of the world in units")
+    parser.add_argument("--world-height", type=float, default=engine.World_height, help="height of the world in units")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the first simulation, each following simulation uses the next seed")
+    args = parser.parse_args()
+
+    num_of_simulations = 0
+    while num_of_simulations < args.runs:
+        seed = None
+        if args.seed != None:
+            seed = args.seed + num_of_simulations
+        sim = StripSimulation(args.strips, world_width=args.world_width, world_height=args.world_height,
+                              enable_collisions=args.collisions, num_of_rewards=args.rewards, seed=seed)
+        try:
+            sim.setup()
+            sim.run(args.time_limit, args.generation_limit, args.time_step)
+            sim.finish()
+        finally:
+            sim.close()
+        num_of_simulations += 1
+
+if __name__ == "__main__":
+    main()
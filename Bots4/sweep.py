@@ -0,0 +1,347 @@
+import os
+import ast
+import json
+import time
+import socket
+import argparse
+import traceback
+import selectors
+import itertools
+import contextlib
+import collections
+import multiprocessing
+import bot
+import engine
+import genetics
+import runner
+
+Default_port = 5117
+Default_output_dir = "sweep" # each job gets a folder of its own in here, on the host that ran it
+Default_results_file = "sweep_results.ndjson"
+Retry_delay = 1 # seconds between attempts to reach the coordinator, and between asking for work when there is none yet
+Max_attempts = 3 # times a job is handed out before it is recorded as failed
+# the modules whose constants can be swept
+Sweep_modules = {"bot": bot, "engine": engine, "genetics": genetics}
+
+def parseParameter(text):
+    """
+    Turns "module.Name=value1,value2,..." into the name and the list of values to sweep it over
+    """
+    name, _, values = text.partition("=")
+    if values == "":
+        raise ValueError("a parameter is given as module.Name=value1,value2,... not "+text)
+    checkParameter(name)
+    return name, [ast.literal_eval(value.strip()) for value in values.split(",")]
+
+def checkParameter(name):
+    """
+    Makes sure the name is a constant of one of the modules which can be swept
+    """
+    module_name, _, constant = name.partition(".")
+    if module_name not in Sweep_modules or not hasattr(Sweep_modules[module_name], constant):
+        raise ValueError(name+" is not a constant of "+", ".join(Sweep_modules))
+
+@contextlib.contextmanager
+def overrides(parameters):
+    """
+    Sets the constants for the length of a job, they are put back afterwards so the next job starts from the defaults
+    """
+    originals = {}
+    try:
+        for name, value in parameters.items():
+            checkParameter(name)
+            module_name, _, constant = name.partition(".")
+            originals[name] = getattr(Sweep_modules[module_name], constant)
+            setattr(Sweep_modules[module_name], constant, value)
+        yield
+    finally:
+        for name, value in originals.items():
+            module_name, _, constant = name.partition(".")
+            setattr(Sweep_modules[module_name], constant, value)
+
+def makeJobs(parameters, repeats, base_seed, settings):
+    """
+    A job for every combination of the parameter values, repeated with each seed.
+    Every combination is run with the same seeds, so differences between them come from the parameters and not the luck of the seed.
+    """
+    names = [name for name, values in parameters]
+    jobs = []
+    for combination in itertools.product(*[values for name, values in parameters]):
+        repeat = 0
+        while repeat < repeats:
+            job = dict(settings)
+            job["job"] = len(jobs)
+            job["parameters"] = dict(zip(names, combination))
+            job["seed"] = base_seed + repeat
+            jobs.append(job)
+            repeat += 1
+    return jobs
+
+def sendMessage(connection, message):
+    """
+    Messages are JSON objects, one per line
+    """
+    connection.sendall((json.dumps(message)+"\n").encode())
+
+def runJob(job, output_dir):
+    """
+    Runs the simulation of a job in a folder of its own and returns its result record
+    """
+    settings = dict(job)
+    settings["run_number"] = job["job"]
+    settings["output_dir"] = output_dir
+    start_time = time.time()
+    with overrides(job["parameters"]):
+        result = runner.runSimulation(settings)
+    return {"job": job["job"],
+            "parameters": job["parameters"],
+            "seed": job["seed"],
+            "elapsed": round(time.time() - start_time, 3),
+            "simulation_time": result["simulation_time"],
+            "number_of_steps": result["number_of_steps"],
+            "total_number_of_bots": result["total_number_of_bots"],
+            "generations_bred": result["generations_bred"],
+            "yellow": result["yellow"],
+            "blue": result["blue"]}
+
+def work(host, port, output_dir, name=None):
+    """
+    A worker: asks the coordinator for jobs, runs them one at a time and sends back the results until it is told to stop.
+    Waits for the coordinator if it is not up yet.
+    """
+    if name == None:
+        name = socket.gethostname()+"-"+str(os.getpid())
+    os.makedirs(output_dir, exist_ok=True)
+    while True:
+        try:
+            connection = socket.create_connection((host, port))
+            break
+        except ConnectionRefusedError:
+            time.sleep(Retry_delay)
+
+    with connection, connection.makefile("r") as messages:
+        sendMessage(connection, {"type": "ready", "worker": name})
+        for line in messages:
+            message = json.loads(line)
+            if message["type"] == "stop":
+                break
+            elif message["type"] == "wait":
+                time.sleep(Retry_delay)
+                sendMessage(connection, {"type": "ready", "worker": name})
+            elif message["type"] == "job":
+                try:
+                    result = runJob(message["job"], output_dir)
+                except Exception:
+                    sendMessage(connection, {"type": "failed", "job": message["job"]["job"], "error": traceback.format_exc()})
+                    continue
+                result["worker"] = name
+                sendMessage(connection, {"type": "result", "result": result})
+
+class Coordinator:
+    """
+    Hands the jobs out to the workers which connect, and writes each result to the results file as it comes in (one JSON object per line).
+    A job whose worker disconnects before sending its result (or takes longer than the job timeout, or fails) is put back on the queue,
+    after Max_attempts it is recorded as failed instead.
+    Jobs which already have a result in the results file are not run again, so a sweep which was stopped carries on where it left off.
+    """
+    def __init__(self, jobs, results_path, host="", port=Default_port, job_timeout=None):
+        self.results_path = results_path
+        self.job_timeout = job_timeout
+        self.jobs = {job["job"]: job for job in jobs}
+
+        # the jobs which have a result
+        self.done = set()
+        if os.path.exists(results_path):
+            with open(results_path) as results_file:
+                for line in results_file:
+                    self.done.add(json.loads(line)["job"])
+        # the jobs waiting for a worker
+        self.queue = collections.deque(job["job"] for job in jobs if job["job"] not in self.done)
+        # the worker connection and start time of each job which has been handed out
+        self.running = {}
+        # the number of times each job has been handed out
+        self.attempts = collections.Counter()
+
+        self.server = socket.create_server((host, port))
+        self.server.setblocking(False)
+        self.port = self.server.getsockname()[1]
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.server, selectors.EVENT_READ)
+        # the unfinished line read from each worker, and the job it is on
+        self.buffers = {}
+        self.working_on = {}
+
+    def isFinished(self):
+        return len(self.done) == len(self.jobs)
+
+    def record(self, result):
+        """
+        Writes the result of a job, a job put back after a timeout may finish twice so only the first result is kept
+        """
+        if result["job"] in self.done:
+            return
+        self.done.add(result["job"])
+        with open(self.results_path, "a") as results_file:
+            results_file.write(json.dumps(result)+"\n")
+        if "error" in result:
+            print("job "+str(result["job"])+" failed "+str(Max_attempts)+" times ("+str(len(self.done))+"/"+str(len(self.jobs))+")")
+        else:
+            print("job "+str(result["job"])+" done by "+result["worker"]+" ("+str(len(self.done))+"/"+str(len(self.jobs))+")")
+
+    def requeue(self, job_id, reason):
+        """
+        Puts a job back at the front of the queue so it is the next one handed out, unless it has used up its attempts
+        """
+        del self.running[job_id]
+        if job_id in self.done:
+            return
+        if self.attempts[job_id] >= Max_attempts:
+            job = self.jobs[job_id]
+            self.record({"job": job_id, "parameters": job["parameters"], "seed": job["seed"], "error": reason})
+            return
+        self.queue.appendleft(job_id)
+        print("job "+str(job_id)+" was put back on the queue: "+reason.strip().splitlines()[-1])
+
+    def disconnect(self, connection):
+        self.selector.unregister(connection)
+        connection.close()
+        del self.buffers[connection]
+        job_id = self.working_on.pop(connection)
+        if job_id != None and job_id in self.running and self.running[job_id][0] is connection:
+            self.requeue(job_id, "the worker disconnected")
+
+    def handOut(self, connection):
+        """
+        Gives the worker the next job, or tells it to wait (jobs are still running and may be put back) or to stop
+        """
+        if len(self.queue) > 0:
+            job_id = self.queue.popleft()
+            self.running[job_id] = (connection, time.time())
+            self.attempts[job_id] += 1
+            self.working_on[connection] = job_id
+            sendMessage(connection, {"type": "job", "job": self.jobs[job_id]})
+        elif self.isFinished():
+            self.working_on[connection] = None
+            sendMessage(connection, {"type": "stop"})
+        else:
+            self.working_on[connection] = None
+            sendMessage(connection, {"type": "wait"})
+
+    def receive(self, connection, message):
+        if message["type"] == "result":
+            job_id = message["result"]["job"]
+            self.record(message["result"])
+            if job_id in self.running and self.running[job_id][0] is connection:
+                del self.running[job_id]
+        elif message["type"] == "failed":
+            job_id = message["job"]
+            if job_id in self.running and self.running[job_id][0] is connection:
+                self.requeue(job_id, message["error"])
+        self.handOut(connection)
+
+    def serve(self):
+        """
+        Runs until every job has a result, then tells the workers to stop as they ask for more
+        """
+        while not self.isFinished() or len(self.buffers) > 0:
+            for key, events in self.selector.select(timeout=Retry_delay):
+                if key.fileobj is self.server:
+                    connection, address = self.server.accept()
+                    self.selector.register(connection, selectors.EVENT_READ)
+                    self.buffers[connection] = b""
+                    self.working_on[connection] = None
+                    continue
+                connection = key.fileobj
+                try:
+                    data = connection.recv(65536)
+                except ConnectionError:
+                    data = b""
+                if data == b"":
+                    self.disconnect(connection)
+                    continue
+                self.buffers[connection] += data
+                while b"\n" in self.buffers[connection]:
+                    line, self.buffers[connection] = self.buffers[connection].split(b"\n", 1)
+                    self.receive(connection, json.loads(line))
+
+            if self.job_timeout != None:
+                now = time.time()
+                for job_id, (connection, start_time) in list(self.running.items()):
+                    if now - start_time > self.job_timeout:
+                        self.requeue(job_id, "the job took longer than "+str(self.job_timeout)+" seconds")
+
+            # once every job is done there is nothing to wait for, workers which have not asked again are let go
+            if self.isFinished() and all(job_id == None for job_id in self.working_on.values()):
+                for connection in list(self.buffers):
+                    self.selector.unregister(connection)
+                    connection.close()
+                    del self.buffers[connection]
+                    del self.working_on[connection]
+
+        self.selector.close()
+        self.server.close()
+
+def main():
+    """
+    Sweeps constants of the simulation over a grid of values, with the jobs run by workers on any number of hosts.
+    Start the coordinator with the parameters on one host, then start workers (from the Bots4 folder) pointing at it, eg.
+        python sweep.py coordinate --param bot.Eat_delay=5,7,9 --param bot.Chance_of_mutation=0.02,0.04 --repeats 3
+        python sweep.py work --host coordinator-host
+    --local-workers starts that many workers on this host as well.
+    """
+    parser = argparse.ArgumentParser(description="Runs a parameter sweep over simulations with workers connected over TCP")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    coordinate = commands.add_parser("coordinate", help="hand out the jobs and collect the results")
+    coordinate.add_argument("--param", action="append", default=[], help="module.Name=value1,value2,... a constant and the values to sweep it over, can be repeated")
+    coordinate.add_argument("--repeats", type=int, default=1, help="number of seeds each combination of values is run with")
+    coordinate.add_argument("--seed", type=int, default=0, help="seed of the first repeat, each following repeat uses the next seed")
+    coordinate.add_argument("--host", default="", help="address to listen on (all of them by default)")
+    coordinate.add_argument("--port", type=int, default=Default_port, help="port to listen on")
+    coordinate.add_argument("--results", default=Default_results_file, help="file the results are added to, one JSON object per line")
+    coordinate.add_argument("--job-timeout", type=float, default=None, help="real seconds after which a job is handed out again")
+    coordinate.add_argument("--local-workers", type=int, default=0, help="number of workers to start on this host")
+    coordinate.add_argument("--output-dir", default=Default_output_dir, help="folder the local workers write the jobs to")
+    coordinate.add_argument("--time-limit", type=float, default=1200, help="simulated seconds per simulation")
+    coordinate.add_argument("--generation-limit", type=int, default=None, help="stop a simulation once this many generations have been bred")
+    coordinate.add_argument("--time-step", type=float, default=engine.Time_step, help="simulated seconds per step")
+    coordinate.add_argument("--collisions", action="store_true", default=engine.EnableCollisions, help="bump apart bots which overlap")
+    coordinate.add_argument("--rewards", type=int, default=engine.Num_of_rewards, help="number of rewards in the world at once")
+    coordinate.add_argument("--world-width", type=float, default=engine.World_width, help="width of the world in units")
+    coordinate.add_argument("--world-height", type=float, default=engine.World_height, help="height of the world in units")
+
+    worker = commands.add_parser("work", help="run jobs from a coordinator")
+    worker.add_argument("--host", default="localhost", help="address of the coordinator")
+    worker.add_argument("--port", type=int, default=Default_port, help="port of the coordinator")
+    worker.add_argument("--output-dir", default=Default_output_dir, help="folder the jobs are written to")
+    args = parser.parse_args()
+
+    if args.command == "work":
+        work(args.host, args.port, args.output_dir)
+        return
+
+    settings = {"world_width": args.world_width,
+                "world_height": args.world_height,
+                "collisions": args.collisions,
+                "rewards": args.rewards,
+                "time_limit": args.time_limit,
+                "generation_limit": args.generation_limit,
+                "time_step": args.time_step}
+    jobs = makeJobs([parseParameter(text) for text in args.param], args.repeats, args.seed, settings)
+    coordinator = Coordinator(jobs, args.results, args.host, args.port, args.job_timeout)
+    print("coordinating "+str(len(jobs))+" jobs ("+str(len(coordinator.done))+" already done) on port "+str(coordinator.port))
+
+    local_workers = []
+    i = 0
+    while i < args.local_workers:
+        local_worker = multiprocessing.Process(target=work, args=("localhost", coordinator.port, args.output_dir, "local-"+str(i)))
+        local_worker.start()
+        local_workers.append(local_worker)
+        i+=1
+
+    coordinator.serve()
+    for local_worker in local_workers:
+        local_worker.join()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import json
+import os
+import queue
+import threading
+import numpy as np
+
+Sample_interval = 10.0 # simulated seconds between samples
+Queue_size = 256 # samples waiting to be written before new ones are dropped
+Colours = ("yellow", "blue")
+
+def writeSamples(samples, file_name):
+    """
+    Runs in the writer thread, writing each sample as a line of JSON until it is given None
+    """
+    with open(file_name, "a") as telemetry_file:
+        while True:
+            sample = samples.get()
+            if sample == None:
+                samples.task_done()
+                break
+            telemetry_file.write(json.dumps(sample)+"\n")
+            # the file is flushed whenever the writer catches up, so it can be followed while the simulation runs
+            if samples.empty():
+                telemetry_file.flush()
+            samples.task_done()
+
+class Telemetry:
+    """
+    Samples the population every sample interval (simulated seconds) and adds the samples to a file, one JSON object per line.
+    Each sample has the number of bots alive, their mean and max energy and how many there are of each generation (for each colour),
+    the births, deaths and meals since the last sample and the rewards collected (meals) per simulated minute.
+    The samples are written by a thread of their own, if the writer falls behind by more than the queue size
+    new samples are dropped (and counted) rather than holding up the simulation.
+    """
+    def __init__(self, file_name, sample_interval=Sample_interval, queue_size=Queue_size, start_time=0.0):
+        self.file_name = file_name
+        self.sample_interval = sample_interval
+        self.queue_size = queue_size
+        self.last_sample = start_time
+        self.next_sample = start_time + sample_interval
+        # counted by the simulation since the last sample
+        self.births = 0
+        self.deaths = 0
+        self.meals = 0
+        self.dropped = 0
+        self.samples = None
+        self.writer = None
+        self.start()
+
+    def __getstate__(self):
+        """
+        What is saved of the telemetry in a checkpoint (see checkpoint.py), the samples waiting are written first
+        """
+        self.samples.join()
+        state = dict(self.__dict__)
+        del state["samples"]
+        del state["writer"]
+        with open(self.file_name, "rb") as telemetry_file:
+            state["length"] = telemetry_file.seek(0, 2)
+        return state
+
+    def __setstate__(self, state):
+        # samples written after the checkpoint are dropped, the resumed run samples them again
+        length = state.pop("length")
+        self.__dict__.update(state)
+        # if the file has gone it is made again when the next samples are written, without the samples before the checkpoint
+        if os.path.exists(self.file_name):
+            with open(self.file_name, "r+b") as telemetry_file:
+                telemetry_file.truncate(length)
+        self.start()
+
+    def start(self):
+        self.samples = queue.Queue(self.queue_size)
+        self.writer = threading.Thread(target=writeSamples, args=(self.samples, self.file_name), daemon=True)
+        self.writer.start()
+
+    def tick(self, sim):
+        """
+        Called at the end of every step, takes a sample once the sample interval has passed
+        """
+        if sim.simulation_time < self.next_sample:
+            return
+        self.next_sample += self.sample_interval
+        sample = self.sample(sim)
+        try:
+            self.samples.put_nowait(sample)
+        except queue.Full:
+            self.dropped += 1
+
+    def sample(self, sim):
+        """
+        The state of the population now, as plain numbers so it can be written by the writer thread
+        """
+        alive_bots = sim.alive_bots
+        n = alive_bots.size
+        energy = alive_bots.energy_level[:n]
+        generation = alive_bots.generation[:n]
+        colours = np.array([alive_bot.colour for alive_bot in alive_bots])
+
+        species = {}
+        for colour in Colours:
+            is_colour = colours == colour
+            count = int(np.count_nonzero(is_colour))
+            generations, counts = np.unique(generation[is_colour], return_counts=True)
+            species[colour] = {"alive": count,
+                               "mean_energy": float(energy[is_colour].mean()) if count > 0 else None,
+                               "max_energy": float(energy[is_colour].max()) if count > 0 else None,
+                               "generations": dict(zip((str(g) for g in generations.tolist()), counts.tolist()))}
+
+        elapsed = sim.simulation_time - self.last_sample
+        sample = {"seed": sim.seed,
+                  "time": sim.simulation_time,
+                  "step": sim.number_of_steps,
+                  "alive": n,
+                  "species": species,
+                  "births": self.births,
+                  "deaths": self.deaths,
+                  "meals": self.meals,
+                  # every meal is a reward collected, as in Bot.total_rewards_collected
+                  "rewards_per_minute": self.meals/(elapsed/60.0) if elapsed > 0 else None,
+                  "dropped": self.dropped}
+        self.last_sample = sim.simulation_time
+        self.births = 0
+        self.deaths = 0
+        self.meals = 0
+        return sample
+
+    def close(self):
+        """
+        Writes the samples still waiting and stops the writer thread
+        """
+        self.samples.put(None)
+        self.writer.join()
+        if self.dropped > 0:
+            print(str(self.dropped)+" telemetry samples were dropped, the file could not keep up")
@@ -0,0 +1,30 @@
+import os
+import shutil
+import subprocess
+import sys
+import pytest
+
+Bots4 = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, Bots4)
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """
+    A copy of the Bots4 folder to run in (as the current folder), the runs overwrite the starter brains and attributes
+    """
+    folder = tmp_path / "Bots4"
+    shutil.copytree(Bots4, folder, ignore=shutil.ignore_patterns("tests", "__pycache__", "*.sqlite", "*.ndjson"))
+    monkeypatch.chdir(folder)
+    return folder
+
+@pytest.fixture
+def runScript(workspace):
+    """
+    Runs one of the scripts of the workspace with the given arguments, returns what it printed
+    """
+    def run(script, *args, timeout=300):
+        finished = subprocess.run([sys.executable, script] + [str(arg) for arg in args], cwd=workspace,
+                                  capture_output=True, text=True, timeout=timeout)
+        assert finished.returncode == 0, finished.stdout + finished.stderr
+        return finished.stdout
+    return run
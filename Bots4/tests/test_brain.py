@@ -0,0 +1,183 @@
+import json
+import numpy as np
+import brain
+import brain_batch
+import neuron
+
+Brain_file = "brains/starter_brain_yellow.txt"
+Steps = 10
+# one for each input of the starter brain, numbers with few decimal places whose child inputs are easily rounded the wrong way
+# (eg. 0.91 -> 0.1 -> 0.9999999999999964 when worked out one place at a time, as the brain always has)
+Decimal_inputs = [0.91, 0.29, 0.5, 1.0, -0.37, 0.0, 0.07]
+
+class ReferenceBrain:
+    """
+    The brain as it was before it was compiled into arrays, one neuron.Neuron3 per neuron and the values in a dictionary
+    """
+    def __init__(self, file_name, input_expansion_factor=brain.Input_expansion_factor):
+        self.input_expansion_factor = input_expansion_factor
+        with open(file_name) as brain_file:
+            self.num_of_inputs = int(brain_file.readline())
+            num_of_neurons = int(brain_file.readline())
+            self.neurons = []
+            i = 0
+            while i < num_of_neurons:
+                connections = json.loads(brain_file.readline())
+                weights = json.loads(brain_file.readline())
+                brain_file.readline()
+                self.neurons.append(neuron.Neuron3("n"+str(i), connections, weights))
+                i += 1
+        # the child inputs are worked out before the neurons read them, the parent inputs are assigned by setInputs
+        self.values = {reference_neuron.name: 0 for reference_neuron in self.neurons}
+
+    def calculateOutputs(self):
+        i = 0
+        while i < self.num_of_inputs:
+            input_value = self.values["i"+str(i)]
+            j = 0
+            while j < self.input_expansion_factor:
+                input_value = (input_value*10)-int(input_value*10)
+                self.values["i"+str(i)+"_"+str(j)] = input_value
+                j += 1
+            i += 1
+        for reference_neuron in self.neurons:
+            reference_neuron.getInputs(self.values)
+        for reference_neuron in self.neurons:
+            reference_neuron.calculateOutput()
+            self.values[reference_neuron.name] = reference_neuron.output
+
+def setInputs(all_values, inputs):
+    """
+    Assigns the parent inputs to each of the dictionaries of values
+    """
+    for values in all_values:
+        i = 0
+        while i < len(inputs):
+            values["i"+str(i)] = inputs[i]
+            i += 1
+
+def saveRandomBrain(file_name, rng):
+    """
+    Saves a copy of the starter brain with random weights
+    """
+    with open(Brain_file) as brain_file:
+        lines = brain_file.read().split("\n")
+    # the number of inputs and of neurons, then the connections, the weights and a "." for each neuron
+    i = 3
+    while i < len(lines) - 1:
+        lines[i] = json.dumps(rng.uniform(-1, 1, len(json.loads(lines[i]))).tolist())
+        i += 3
+    with open(file_name, "w") as random_file:
+        random_file.write("\n".join(lines))
+
+def assertSameValues(net, reference):
+    # the child inputs are worked out the same way as the reference, so they must match exactly
+    for name in net.input_names:
+        assert net.dict_all_values[name] == reference.values[name], name
+    for name in net.value_names:
+        assert abs(net.dict_all_values[name] - reference.values[name]) < 1e-9, name
+
+def test_brain_matches_reference(workspace):
+    net = brain.Brain(file_name=Brain_file)
+    reference = ReferenceBrain(Brain_file)
+    rng = np.random.default_rng(1)
+    step = 0
+    while step < Steps:
+        setInputs([net.dict_all_values, reference.values], rng.uniform(-1, 1, reference.num_of_inputs))
+        net.calculateOutputs()
+        reference.calculateOutputs()
+        assertSameValues(net, reference)
+        step += 1
+
+def test_decimal_inputs_match_reference(workspace):
+    net = brain.Brain(file_name=Brain_file)
+    batched = brain.Brain(file_name=Brain_file)
+    batch = brain_batch.BrainBatch()
+    batch.add(batched)
+    reference = ReferenceBrain(Brain_file)
+    step = 0
+    while step < Steps:
+        # each input is given each of the numbers in turn
+        setInputs([net.dict_all_values, batched.dict_all_values, reference.values], np.roll(Decimal_inputs, step))
+        net.calculateOutputs()
+        batch.calculateOutputs()
+        reference.calculateOutputs()
+        for name in net.input_names:
+            assert net.dict_all_values[name] == reference.values[name] == batched.dict_all_values[name], name
+        assertSameValues(net, reference)
+        assertSameValues(batched, reference)
+        step += 1
+
+def test_batch_matches_reference(workspace):
+    # brains with weights of their own, so a brain in the wrong row would be noticed
+    rng = np.random.default_rng(2)
+    file_names = []
+    for i in range(3):
+        file_names.append("brains/random_brain"+str(i)+".txt")
+        saveRandomBrain(file_names[-1], rng)
+    nets = [brain.Brain(file_name=file_name) for file_name in file_names]
+    references = [ReferenceBrain(file_name) for file_name in file_names]
+    batch = brain_batch.BrainBatch()
+    for net in nets:
+        batch.add(net)
+    step = 0
+    while step < Steps:
+        # the middle brain leaves part way through, the last brain is moved into its row and it carries on alone
+        if step == Steps//2:
+            batch.remove(nets[1])
+        # decimal inputs (a different order for each brain) and random ones in turn
+        for i, (net, reference) in enumerate(zip(nets, references)):
+            if step % 2 == 0:
+                inputs = np.roll(Decimal_inputs, step + i)
+            else:
+                inputs = rng.uniform(-1, 1, reference.num_of_inputs)
+            setInputs([net.dict_all_values, reference.values], inputs)
+        batch.calculateOutputs()
+        if step >= Steps//2:
+            nets[1].calculateOutputs()
+        for net, reference in zip(nets, references):
+            reference.calculateOutputs()
+            assertSameValues(net, reference)
+        step += 1
+
+def test_batch_steps_the_same_as_brain(workspace):
+    """
+    A brain in a batch and a copy of it stepped on its own share the input expansion and the folded weights,
+    so they give the same values bit for bit
+    """
+    rng = np.random.default_rng(3)
+    file_names = []
+    for i in range(3):
+        file_names.append("brains/random_brain"+str(i)+".txt")
+        saveRandomBrain(file_names[-1], rng)
+    nets = [brain.Brain(file_name=file_name) for file_name in file_names]
+    batched = [brain.Brain(file_name=file_name) for file_name in file_names]
+    batch = brain_batch.BrainBatch()
+    for net in batched:
+        batch.add(net)
+    step = 0
+    while step < Steps:
+        # a brain given new weights in the batch steps with them there
+        if step == Steps//2:
+            new_weights = rng.uniform(-1, 1, nets[0].weight_matrix.shape)
+            nets[0].setWeights(new_weights)
+            batched[0].setWeights(new_weights)
+        # decimal inputs and random ones in turn
+        inputs = np.roll(Decimal_inputs, step) if step % 2 == 0 else rng.uniform(-1, 1, len(Decimal_inputs))
+        for net, batched_net in zip(nets, batched):
+            setInputs([net.dict_all_values, batched_net.dict_all_values], inputs)
+            net.calculateOutputs()
+        batch.calculateOutputs()
+        for net, batched_net in zip(nets, batched):
+            assert np.array_equal(net.values, batched_net.values)
+        step += 1
+
+def test_set_weights_is_followed(workspace):
+    net = brain.Brain(file_name=Brain_file)
+    net.calculateOutputs()
+    before = net.values.copy()
+    net.values[:] = 0
+    net.values[-1] = 1
+    net.setWeights(-net.weight_matrix)
+    net.calculateOutputs()
+    assert not np.array_equal(net.values, before)
@@ -0,0 +1,73 @@
+import numpy as np
+import checkpoint
+import engine
+
+Time_limit = 40 # long enough for bots to be bred and to die
+
+def snapshot(sim):
+    """
+    The state of the simulation which a run with the same seed must repeat
+    """
+    n = sim.alive_bots.size
+    return {"time": sim.simulation_time,
+            "steps": sim.number_of_steps,
+            "total_number_of_bots": sim.total_number_of_bots,
+            "alive": [alive_bot.name for alive_bot in sim.alive_bots],
+            "dead": [dead_bot.name for dead_bot in sim.all_bots],
+            "floats": sim.alive_bots.floats[:, :n].copy(),
+            "ints": sim.alive_bots.ints[:, :n].copy(),
+            "rewards": sim.rewards.position[:, :sim.rewards.size].copy(),
+            "brains": sim.brains.values[:sim.brains.size].copy()}
+
+def assertSameSnapshot(snapshot1, snapshot2):
+    assert snapshot1.keys() == snapshot2.keys()
+    for key in snapshot1:
+        if isinstance(snapshot1[key], np.ndarray):
+            assert np.array_equal(snapshot1[key], snapshot2[key]), key
+        else:
+            assert snapshot1[key] == snapshot2[key], key
+
+def runSimulation(seed, time_limit=Time_limit):
+    sim = engine.Simulation(seed=seed, num_of_rewards=3)
+    sim.setup()
+    sim.run(time_limit)
+    return sim
+
+def test_same_seed_same_run(workspace):
+    sim = runSimulation(1)
+    first = snapshot(sim)
+    second = snapshot(runSimulation(1))
+    assertSameSnapshot(first, second)
+    assert first["steps"] == round(Time_limit/engine.Time_step)
+    # the run covered bots dying and being bred
+    assert len(first["dead"]) > 0
+    assert first["total_number_of_bots"] > sim.initial_number_of_bots
+
+def test_other_seed_other_run(workspace):
+    first = snapshot(runSimulation(1))
+    second = snapshot(runSimulation(2))
+    assert not np.array_equal(first["floats"], second["floats"])
+
+def test_dead_bots_keep_only_the_best_brain(workspace):
+    sim = runSimulation(1)
+    kept = [dead_bot for dead_bot in sim.all_bots if dead_bot._net is not None]
+    assert len(sim.all_bots) > len(kept)
+    assert kept == [dead_bot for dead_bot in sim.all_bots if dead_bot in sim.best_dead_bots.values()]
+    # finish chooses from the dead bots which kept their brains, and saves them
+    dead_bots = list(sim.all_bots)
+    for best_bot in sim.finish():
+        if best_bot in dead_bots:
+            assert best_bot in kept
+
+def test_resumed_checkpoint_carries_on_the_same(workspace):
+    sim = engine.Simulation(seed=3, num_of_rewards=3)
+    sim.setup()
+    sim.run(Time_limit/2)
+    checkpoint.save(sim, "test.ckpt")
+    sim.run(Time_limit)
+    finished = snapshot(sim)
+
+    resumed = checkpoint.load("test.ckpt")
+    assert resumed.simulation_time == Time_limit/2
+    resumed.run(Time_limit)
+    assertSameSnapshot(finished, snapshot(resumed))
@@ -0,0 +1,34 @@
+import numpy as np
+import environment
+import population
+import reward
+import streams
+
+def test_chunked_scent_spreads_as_unchunked():
+    """
+    The scent of a world split into many small chunks matches a world held in a single chunk
+    """
+    streams.seed(5)
+    world_size = 40
+    rewards = reward.RewardField(world_size, world_size)
+    i = 0
+    while i < 3:
+        reward.Reward(world_size, world_size, rewards)
+        i += 1
+    bots = population.Population()
+
+    chunked = environment.World(world_size, world_size, chunk_size=8)
+    unchunked = environment.World(world_size, world_size, chunk_size=world_size)
+    step = 0
+    while step < 200:
+        chunked.update(0.1, rewards, bots)
+        unchunked.update(0.1, rewards, bots)
+        step += 1
+
+    # the scent has reached chunks which hold no food
+    assert len(chunked) > 3
+    tile_x, tile_y = np.meshgrid(np.arange(world_size) + 0.5, np.arange(world_size) + 0.5)
+    chunked_scent = chunked.read("scent", tile_x.ravel(), tile_y.ravel())
+    unchunked_scent = unchunked.read("scent", tile_x.ravel(), tile_y.ravel())
+    assert np.allclose(chunked_scent, unchunked_scent, rtol=0, atol=1e-5)
+    assert abs(chunked_scent.sum() - unchunked_scent.sum()) < 1e-4
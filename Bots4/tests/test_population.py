@@ -0,0 +1,77 @@
+import gc
+import pickle
+import bot
+import population
+
+def makeBots(number):
+    """
+    Bots whose energy level is their number, so each can be told apart by its row
+    """
+    bots = []
+    i = 0
+    while i < number:
+        new_bot = bot.Bot(0, "bot"+str(i))
+        new_bot.energy_level = i
+        new_bot.generation = i
+        bots.append(new_bot)
+        i += 1
+    return bots
+
+def assertOwnState(bots):
+    for each_bot in bots:
+        assert each_bot.population[each_bot.row] is each_bot
+        assert each_bot.energy_level == int(each_bot.name[3:])
+        assert each_bot.generation == int(each_bot.name[3:])
+
+def test_remove_swaps_last_bot_in():
+    bots = makeBots(5)
+    bots_population = population.Population(2)
+    for each_bot in bots:
+        bots_population.add(each_bot)
+
+    removed = bots[1]
+    bots_population.remove(removed)
+
+    assert len(bots_population) == 4
+    # the last bot has taken the empty row, the others have not moved
+    assert bots[4].row == 1
+    assert [each_bot.row for each_bot in bots[0:1] + bots[2:4]] == [0, 2, 3]
+    assert list(bots_population) == [bots[0], bots[4], bots[2], bots[3]]
+    assertOwnState(bots)
+    # the removed bot keeps its state in the pool
+    assert removed.population is population.Unowned
+    assert removed.energy_level == 1
+
+def test_remove_last_bot():
+    bots = makeBots(3)
+    bots_population = population.Population()
+    for each_bot in bots:
+        bots_population.add(each_bot)
+    bots_population.remove(bots[2])
+    assert len(bots_population) == 2
+    assertOwnState(bots)
+
+def test_pool_frees_rows_of_dropped_bots():
+    gc.collect()
+    population.Unowned._sweep()
+    size = len(population.Unowned)
+    bots = makeBots(10)
+    assert len(population.Unowned) == size + 10
+    del bots[::2]
+    gc.collect()
+    # the rows are freed when the pool is next changed
+    kept = makeBots(1)
+    assert len(population.Unowned) == size + 6
+    # new bots start from a cleared row
+    assert kept[0].total_rewards_collected == 0
+    assertOwnState(bots)
+
+def test_population_survives_pickling():
+    bots = makeBots(4)
+    bots_population = population.Population()
+    for each_bot in bots[:3]:
+        bots_population.add(each_bot)
+    loaded_population, loaded_bots = pickle.loads(pickle.dumps((bots_population, bots)))
+    assert len(loaded_population) == 3
+    assertOwnState(loaded_bots)
+    assert loaded_bots[3].population is not loaded_population
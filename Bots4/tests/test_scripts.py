@@ -0,0 +1,65 @@
+import json
+import os
+import sqlite3
+import eventlog
+
+def test_engine(runScript):
+    printed = runScript("engine.py", "--runs", 2, "--time-limit", 10, "--seed", 1)
+    assert printed.count("End of simulation") == 2
+    assert "seed 1" in printed and "seed 2" in printed
+    # the settings of each run are saved with it, so it can be repeated
+    connection = sqlite3.connect("results.sqlite")
+    saved_parameters = [json.loads(row[0]) for row in connection.execute("SELECT parameters FROM runs")]
+    connection.close()
+    assert [(saved["run.time_limit"], saved["run.generation_limit"]) for saved in saved_parameters] == [(10, None)] * 2
+    assert saved_parameters[0]["run.time_step"] == saved_parameters[0]["engine.Time_step"]
+
+def test_engine_resume(runScript):
+    runScript("engine.py", "--runs", 1, "--time-limit", 10, "--seed", 1, "--checkpoint", "run.ckpt", "--checkpoint-interval", 6,
+              "--event-log", "events.log", "--telemetry", "telemetry.ndjson", "--telemetry-interval", 2)
+    with open("telemetry.ndjson") as telemetry_file:
+        samples = telemetry_file.readlines()
+    with open("events.log", "rb") as event_file:
+        events = event_file.read()
+    printed = runScript("engine.py", "--runs", 1, "--time-limit", 10, "--resume", "run.ckpt",
+                        "--event-log", "events.log", "--telemetry", "telemetry.ndjson")
+    assert "resumed at 6.0" in printed
+    # the resumed run carries on the same files, and samples the rest of the run the same as before
+    with open("telemetry.ndjson") as telemetry_file:
+        assert telemetry_file.readlines() == samples and len(samples) == 5
+    with open("events.log", "rb") as event_file:
+        assert event_file.read() == events
+
+def test_engine_resume_without_its_files(runScript):
+    runScript("engine.py", "--runs", 1, "--time-limit", 10, "--seed", 1, "--checkpoint", "run.ckpt", "--checkpoint-interval", 6,
+              "--event-log", "events.log", "--telemetry", "telemetry.ndjson", "--telemetry-interval", 2)
+    os.remove("events.log")
+    os.remove("telemetry.ndjson")
+    printed = runScript("engine.py", "--runs", 1, "--time-limit", 10, "--resume", "run.ckpt",
+                        "--event-log", "events.log", "--telemetry", "telemetry.ndjson")
+    assert "resumed at 6.0" in printed
+    # the files are started again with what happens after the checkpoint
+    with open("telemetry.ndjson") as telemetry_file:
+        assert len(telemetry_file.readlines()) == 2
+    description, events = eventlog.readEvents("events.log")
+    assert all(event["time"] >= 6.0 for event in events)
+
+def test_runner(runScript):
+    printed = runScript("runner.py", "--runs", 2, "--workers", 2, "--time-limit", 10, "--seed", 1, "--output-dir", "runs")
+    assert "run 0 (seed 1)" in printed and "run 1 (seed 2)" in printed
+    assert os.path.exists(os.path.join("runs", "run_0"))
+
+def test_islands(runScript):
+    printed = runScript("islands.py", "--islands", 2, "--time-limit", 20, "--migration-interval", 10, "--seed", 1, "--output-dir", "islands")
+    assert "island 0" in printed and "island 1" in printed
+
+def test_strips(runScript):
+    printed = runScript("strips.py", "--strips", 2, "--runs", 1, "--time-limit", 10, "--seed", 1)
+    assert "End of simulation" in printed
+
+def test_sweep(runScript):
+    runScript("sweep.py", "coordinate", "--param", "bot.Eat_delay=5,9", "--time-limit", 5, "--port", 0, "--local-workers", 1,
+              "--results", "sweep.ndjson", "--output-dir", "sweep")
+    with open("sweep.ndjson") as results_file:
+        sweep_results = [json.loads(line) for line in results_file]
+    assert sorted(result["job"] for result in sweep_results) == [0, 1]
@@ -0,0 +1,71 @@
+import math
+import numpy as np
+import spatial
+
+def nearestInViewBruteForce(points_x, points_y, x_positions, y_positions, directions, half_view_angles, view_distances):
+    """
+    The same as SpatialHash.nearestInView, checking every point for every looker
+    """
+    nearest_rows = []
+    looker = 0
+    while looker < len(x_positions):
+        best = None
+        row = 0
+        while row < len(points_x):
+            x_displacement = points_x[row] - x_positions[looker]
+            y_displacement = y_positions[looker] - points_y[row]
+            distance = math.sqrt(x_displacement**2 + y_displacement**2)
+            angle = math.atan2(y_displacement, x_displacement) - directions[looker]
+            if angle > math.pi:
+                angle -= 2*math.pi
+            elif angle < -math.pi:
+                angle += 2*math.pi
+            if distance <= view_distances[looker]:
+                rank = (abs(angle) >= half_view_angles[looker], distance, row)
+                if best == None or rank < best:
+                    best = rank
+            row += 1
+        nearest_rows.append(-1 if best == None else best[2])
+        looker += 1
+    return nearest_rows
+
+def test_nearest_in_view_matches_brute_force():
+    rng = np.random.default_rng(3)
+    points_x, points_y = rng.uniform(0, 60, 80), rng.uniform(0, 60, 80)
+    # some points share a position, so the lowest row must be chosen
+    points_x[40:45], points_y[40:45] = points_x[0], points_y[0]
+    lookers = 200
+    x_positions, y_positions = rng.uniform(-5, 65, lookers), rng.uniform(-5, 65, lookers)
+    directions = rng.uniform(0, 2*math.pi, lookers)
+    half_view_angles = rng.uniform(0.1, 1.5, lookers)
+    view_distances = rng.uniform(1, 20, lookers)
+
+    grid = spatial.SpatialHash(4.0)
+    grid.buildPositions(points_x, points_y)
+    nearest_rows = grid.nearestInView(x_positions, y_positions, directions, half_view_angles, view_distances)
+    expected = nearestInViewBruteForce(points_x, points_y, x_positions, y_positions, directions, half_view_angles, view_distances)
+    assert nearest_rows.tolist() == expected
+    # the case where nothing is in range is covered
+    assert -1 in expected
+
+def test_nearest_in_view_without_points():
+    grid = spatial.SpatialHash(4.0)
+    grid.buildPositions(np.zeros(0), np.zeros(0))
+    nearest_rows = grid.nearestInView(np.ones(3), np.ones(3), np.zeros(3), np.ones(3), np.ones(3)*10)
+    assert nearest_rows.tolist() == [-1, -1, -1]
+
+def test_any_near_matches_brute_force():
+    rng = np.random.default_rng(4)
+    points_x, points_y = rng.uniform(0, 40, 30), rng.uniform(0, 40, 30)
+    x_positions, y_positions = rng.uniform(0, 40, 100), rng.uniform(0, 40, 100)
+    grid = spatial.SpatialHash(2.0)
+    grid.buildPositions(points_x, points_y)
+    near = grid.anyNear(x_positions, y_positions, 3.0)
+    # any point in a cell which the square around the position overlaps
+    point_x, point_y = np.floor(points_x / 2.0)[:, None], np.floor(points_y / 2.0)[:, None]
+    in_square = ((point_x >= np.floor((x_positions - 3.0) / 2.0)) & (point_x <= np.floor((x_positions + 3.0) / 2.0))
+                 & (point_y >= np.floor((y_positions - 3.0) / 2.0)) & (point_y <= np.floor((y_positions + 3.0) / 2.0)))
+    assert near.tolist() == in_square.any(axis=0).tolist()
+    # so every position with a point within the radius is found
+    distances = np.hypot(points_x[:, None] - x_positions, points_y[:, None] - y_positions)
+    assert near[(distances <= 3.0).any(axis=0)].all()
@@ -0,0 +1,43 @@
+import math
+import bot
+import population
+import reward
+import vision
+
+def botsFacingCorner(number):
+    """
+    Bots a little way from 0,0 and facing it, so anything there would be seen
+    """
+    bots = population.Population()
+    i = 0
+    while i < number:
+        new_bot = bot.Bot(0, "bot"+str(i))
+        new_bot.position = [2.0 + i, 2.0 + i]
+        # up and to the left, the y of the world grows downwards
+        new_bot.direction = 3*math.pi/4
+        bots.add(new_bot)
+        i += 1
+    return bots
+
+def lookAtRewards(bots, rewards):
+    """
+    Every bot looks at the reward it can see, the same as Simulation.think
+    """
+    nearest_rewards = rewards.nearestVisible(bots)
+    vision.see(bots, reward.targetPositions(rewards.x, rewards.y, nearest_rewards), visible=nearest_rewards >= 0)
+    return nearest_rewards
+
+def test_nothing_is_seen_without_rewards():
+    bots = botsFacingCorner(3)
+    rewards = reward.RewardField(100, 100)
+    assert lookAtRewards(bots, rewards).tolist() == [-1, -1, -1]
+    n = bots.size
+    assert not bots.view_distance_percent[:n].any()
+    assert not bots.right_angle_percent[:n].any() and not bots.left_angle_percent[:n].any()
+
+    # a reward which is there is seen straight ahead
+    corner_reward = reward.Reward(100, 100, rewards)
+    corner_reward.position = [0.0, 0.0]
+    assert lookAtRewards(bots, rewards).tolist() == [0, 0, 0]
+    assert (bots.view_distance_percent[:n] > 0).all()
+    assert (bots.right_angle_percent[:n] > 0.99).all() and (bots.left_angle_percent[:n] > 0.99).all()
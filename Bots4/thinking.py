@@ -0,0 +1,59 @@
+import numpy as np
+import bot
+
+def updateClocks(population, simulation_time, rows=None):
+    """
+    Moves the clocks of every bot in the population on to the simulated time (same as Bot.calculateTimeInterval, for all of the bots at once)
+    rows limits which bots are updated (a slice of the population), by default every bot is.
+    """
+    if rows == None:
+        rows = slice(0, population.size)
+    time_since_birth = population.time_since_birth[rows]
+    time_interval = population.time_interval[rows]
+    time_last = population.time_last[rows]
+
+    # how long the bot has been alive
+    np.subtract(simulation_time, population.birth_time[rows], out=time_since_birth)
+    # the length of time since the clocks were last updated
+    np.subtract(time_since_birth, time_last, out=time_interval)
+    time_last[...] = time_since_birth
+
+    # updates internal clocks accordingly
+    population.time_since_last_child[rows] += time_interval
+    population.time_since_last_meal[rows] += time_interval
+
+def assignBrainInputs(population, brains, rows=None):
+    """
+    Gives every brain what its bot senses (same as Bot.assign_brain_inputs, for all of the bots at once).
+    The brains are a brain_batch.BrainBatch with the brain of each bot in the same row as the bot.
+    """
+    if rows == None:
+        rows = slice(0, population.size)
+    if brains.layout == None:
+        return
+    values = brains.values
+    value_index = brains.value_index
+
+    energy_percent = population.energy_percent[rows]
+    np.divide(population.energy_level[rows], population.max_energy[rows], out=energy_percent)
+    values[rows, value_index[bot.I_neuron_Energy]] = energy_percent
+    # the position inputs have never reached the brain, so they are left at 0 (see Bot.assign_brain_inputs)
+    values[rows, value_index[bot.I_neuron_SightCWA]] = population.right_angle_percent[rows]
+    values[rows, value_index[bot.I_neuron_SightACWA]] = population.left_angle_percent[rows]
+    values[rows, value_index[bot.I_neuron_SightDis]] = population.view_distance_percent[rows]
+    values[rows, value_index[bot.I_neuron_Clock]] = (population.time_since_birth[rows] % bot.internal_clock_range)/bot.internal_clock_range
+
+def readBrainOutputs(population, brains, rows=None):
+    """
+    Takes what every bot wants to do from its brain (same as Bot.read_brain_outputs, for all of the bots at once)
+    """
+    if rows == None:
+        rows = slice(0, population.size)
+    if brains.layout == None:
+        return
+    values = brains.values
+    value_index = brains.value_index
+
+    population.angular_velocity_factor[rows] = (values[rows, value_index[bot.O_neuron_RFactor]]*2) - 1
+    population.velocity_factor[rows] = (values[rows, value_index[bot.O_neuron_VFactor]]*2) - 1
+    population.eat_action[rows] = values[rows, value_index[bot.O_neuron_eat]]
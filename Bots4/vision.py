@@ -0,0 +1,49 @@
+import numpy as np
+
+def see(population, target_position, rows=None, visible=None):
+    """
+    Every bot in the population looks at the target (same as Bot.see, for all of the bots at once).
+    Fills the right_angle_percent, left_angle_percent and view_distance_percent columns.
+    The target position is an [x,y] pair, or an array of one x and one y for each bot.
+    rows limits which bots look (a slice of the population), by default every bot does.
+    visible marks which of the bots have a target at all (eg. reward.nearestVisible found one), the others see nothing,
+    by default every bot has a target.
+    """
+    if rows == None:
+        rows = slice(0, population.size)
+    x = population.x[rows]
+    y = population.y[rows]
+    right_angle_percent = population.right_angle_percent[rows]
+    left_angle_percent = population.left_angle_percent[rows]
+    view_distance_percent = population.view_distance_percent[rows]
+    half_view_angle = population.max_view_angle[rows]/2.0
+
+    #determine the angle to the reward
+    x_displacement = target_position[0] - x
+    y_displacement = y - target_position[1]
+    angle_to_obj = np.arctan2(y_displacement, x_displacement)
+
+    # find out where in the field of view it is
+    # (wrapped once into the range of -pi to pi)
+    angle_to_turn_to_reward = angle_to_obj - population.direction[rows]
+    angle_to_turn_to_reward = np.where(angle_to_turn_to_reward > np.pi, -2*np.pi + angle_to_turn_to_reward,
+                                       np.where(angle_to_turn_to_reward < -np.pi, 2*np.pi + angle_to_turn_to_reward, angle_to_turn_to_reward))
+
+    # only the side the target is on is updated, the other side keeps what it saw last
+    angle_percent = np.minimum(np.abs(angle_to_turn_to_reward / half_view_angle), 1)
+    np.copyto(right_angle_percent, 1.0 - angle_percent, where=angle_to_turn_to_reward <= 0)
+    np.copyto(left_angle_percent, 1.0 - angle_percent, where=angle_to_turn_to_reward >= 0)
+
+    #distance
+    # check if within view
+    in_view = (left_angle_percent > 0) & (right_angle_percent > 0)
+    distance_to_reward = np.sqrt(x_displacement**2 + y_displacement**2)
+    view_distance_percent[...] = np.where(in_view, 1.0 - distance_to_reward / population.max_view_distance[rows], 0)
+
+    # beyond the range it can not be seen at all, nor can a target which is not there
+    too_far = view_distance_percent < 0
+    if visible is not None:
+        too_far |= ~visible
+    view_distance_percent[too_far] = 0
+    left_angle_percent[too_far] = 0
+    right_angle_percent[too_far] = 0
@@ -4,6 +4,7 @@ import tkinter as tk
 
 # Global Variables
 Window_width_pixels = 500
+Min_line_spacing_pixels = 4 # lines closer together than this are not drawn
 
 class Display:
     def __init__(self, world_width, world_height):
@@ -21,11 +22,15 @@ class Display:
         self.canvas = tk.Canvas(self.window, bg='green3', width=self.window_width_pixels, height=self.window_height_pixels)
 
         # draw lines to indicate the units
+        # in a large world the units are too small to see, so the lines are spaced out by 10s until they can be
+        spacing = 1
+        while spacing*self.pixels_per_unit < Min_line_spacing_pixels:
+            spacing *= 10
         # individual units
-        self._generateUnitLines(1,world_width,world_height, "light grey")
+        self._generateUnitLines(spacing,world_width,world_height, "light grey")
         # 10s of units
         # these are done seperately so that they overlay the grey lines underneath
-        self._generateUnitLines(10,world_width,world_height, "orange red")
+        self._generateUnitLines(spacing*10,world_width,world_height, "orange red")
         
         self.canvas.pack()
 